@@ -1,84 +1,329 @@
 # api/fast.py - FastAPI Application (STRUCTURALLY SIMILAR, FUNCTIONALLY ROBUST)
+import itertools
+import os
 import pandas as pd
-import pickle
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.encoders import jsonable_encoder
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 import numpy as np
-
-app = FastAPI()
+from typing import List, Optional
+from pydantic import BaseModel
+from moneyballer.name_index import NameIndex
+from moneyballer.autocomplete import MAX_LIMIT as AUTOCOMPLETE_MAX_LIMIT, PrefixIndex
+from moneyballer.neighbor_table import (NEIGHBOR_FINGERPRINT_PATH, NEIGHBOR_IDS_PATH, NEIGHBOR_SIMS_PATH,
+                                        load_neighbor_table, normalize_rows)
+from moneyballer.player_filters import PlayerFilterArrays
+from moneyballer.json_rows import RESPONSE_SHAPES, JsonRows
+from moneyballer.ann_index import build_similarity_index
+from moneyballer.embedding_store import (EMBEDDINGS_PATH, embeddings_fingerprint, open_embeddings, open_unit_vectors,
+                                         stored_fingerprint)
+from moneyballer.player_table import PLAYER_CSV_PATH, PLAYER_TABLE_PATH, load_player_table
+from moneyballer.shared_data import attach_shared_data
+from moneyballer.model_loader import MODEL_ARTIFACTS, ModelLoader, ModelUnavailable
+from moneyballer.mlp_export import MLP_ARTIFACT_PATH, load_numpy_mlp
+from moneyballer.model_features import GOALKEEPER_VALUATION_FEATURES, OUTFIELD_VALUATION_FEATURES
+from moneyballer.forest_export import GK_FOREST_PATH, POSITION_BOOSTING_PATH, BoostedTreesClassifier, load_forest
+from moneyballer.micro_batch import MicroBatcher, batching_config
+from moneyballer.result_cache import MISSING, ResultCache, artifact_version
+from moneyballer.single_flight import SingleFlight
+from moneyballer.metrics import SIZE_BUCKETS, MetricsMiddleware, MetricsRegistry
+from moneyballer.profiling import ProfileStore, ProfilingMiddleware, profiled
+from concurrent.futures import ThreadPoolExecutor
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # start reading the model pickles as soon as the server starts
+    app.state.models.start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Prometheus metrics served on /metrics: latency and body sizes per endpoint (middleware below),
+# time spent in each stage of the handlers, and the stats of the loader, caches and batchers
+metrics = app.state.metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram("moneyballer_request_duration_seconds", "Request latency per endpoint",
+                                    ["endpoint", "method", "status"])
+REQUEST_BYTES = metrics.histogram("moneyballer_request_size_bytes", "Request body size per endpoint",
+                                  ["endpoint", "method"], SIZE_BUCKETS)
+RESPONSE_BYTES = metrics.histogram("moneyballer_response_size_bytes", "Response body size per endpoint",
+                                   ["endpoint", "method"], SIZE_BUCKETS)
+STAGE_SECONDS = metrics.histogram("moneyballer_stage_duration_seconds", "Time spent in each stage of a handler",
+                                  ["handler", "stage"])
+
+# Similarity search backend:
+#   table  precomputed top 100 table (knn_model.py), exact search for deeper queries (default)
+#   exact  brute-force cosine search over X_proj on every request
+#   ivf    approximate k-means cell index, for databases with millions of players
+SIMILARITY_INDEX = os.environ.get("SIMILARITY_INDEX", "table")
+IVF_N_PROBE = int(os.environ.get("IVF_N_PROBE", "16"))
+
+# Multi-worker serving (SHARED_DATA=1): the player table, name index, unit-norm embeddings and
+# filter arrays are memory-mapped from raw_data/shared (moneyballer/shared_data.py), built once
+# and shared by all worker processes instead of rebuilt and held by each of them
+SHARED_DATA = os.environ.get("SHARED_DATA", "0") == "1"
 
 # --- 1. SETUP & DATA LOADING (CRITICAL FIXES APPLIED) ---
-try:
-    # Load KNN model
-    with open("models/knn_model.pkl", "rb") as file:
-        app.state.knn_model = pickle.load(file)
-except Exception as e:
-    print(f"Error loading knn_model.pkl: {e}")
-    app.state.knn_model = None
-    raise HTTPException(status_code=500, detail="Model loading failed.")
+# Models load in a background thread pool (each pickle once) while the app starts serving;
+# /ready answers 503 until every artifact is loaded, /health only checks the process is up
+# (in shared mode the knn pickle, which holds its own copy of X_proj and only answers
+# when the neighbor table is missing, is loaded on first use)
+app.state.models = ModelLoader(MODEL_ARTIFACTS, lazy=['knn_model'] if SHARED_DATA else [])
 
 
-try:
-    # Load the saved outfield pipeline
-    with open("models/DeepL_valuation_model.pkl", "rb") as file:
-        app.state.outfield_model = pickle.load(file)
-except Exception as e:
-    print(f"Error loading outfield_model.pkl: {e}")
-    app.state.outfield_model = None
-    raise HTTPException(status_code=500, detail="Model loading failed.")
+# Outfield valuation MLP exported to plain NumPy arrays (tiny, loaded right away), None if not exported
+with STAGE_SECONDS.time('startup', 'outfield_mlp'):
+    app.state.outfield_mlp = load_numpy_mlp()
 
-try:
-    # Load position predictor model
-    with open("models/outfield_position_predictor.pkl", "rb") as file:
-        app.state.outfield_position_predictor = pickle.load(file)
-except Exception as e:
-    print(f"Error loading outfield_position_predictor.pkl: {e}")
-    app.state.outfield_position_predictor = None
-    raise HTTPException(status_code=500, detail="Model loading failed.")
-
-try:
-    # Load the saved goalkeeper pipeline
-    with open("models/gk_model.pkl", "rb") as file:
-        app.state.gk_model = pickle.load(file)
-except Exception as e:
-    print(f"Error loading gk_model.pkl: {e}")
-    app.state.gk_model = None
-    raise HTTPException(status_code=500, detail="Model loading failed.")
+# Goalkeeper valuation forest packed into flat node arrays (moneyballer/forest_export.py),
+# same predictions as the pickle; None if not exported
+with STAGE_SECONDS.time('startup', 'gk_forest'):
+    app.state.gk_forest = load_forest(GK_FOREST_PATH, GOALKEEPER_VALUATION_FEATURES)
+GK_FOREST_MAX_BATCH = 256
 
+POSITION_PREDICTOR_FEATURES = ['age',
+                'pace', 'dribbling', 'passing',
+                'defending', 'shooting', 'physic',
+                'skill_moves', 'weak_foot']
 
-try:
-    # Load KNN model
-    with open("models/outfield_position_predictor.pkl", "rb") as file:
-        app.state.outfield_position_predictor = pickle.load(file)
-except Exception as e:
-    print(f"Error loading outfield_position_predictor.pkl: {e}")
-    app.state.outfield_position_predictor = None
-    raise HTTPException(status_code=500, detail="Model loading failed.")
+# Position predictor's boosted trees as flat arrays, scoring every class at once; None if not exported
+with STAGE_SECONDS.time('startup', 'position_boosting'):
+    app.state.position_boosting = load_forest(POSITION_BOOSTING_PATH, POSITION_PREDICTOR_FEATURES, BoostedTreesClassifier)
+
+
+# Model by name, waiting for it if it is still loading
+def get_model(name):
+    try:
+        return app.state.models.get(name)
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+# Predictions for a float matrix of rows (features in the model's order),
+# exported arrays when available, the pickled pipelines otherwise
+def predict_outfield_log(X):
+    # log(value_eur), as y was log transformed during modeling
+    if app.state.outfield_mlp is not None:
+        with STAGE_SECONDS.time('outfield_valuation', 'predict'):
+            return app.state.outfield_mlp.predict(X).astype(float)
+    new_data = pd.DataFrame(X, columns=OUTFIELD_VALUATION_FEATURES)
+    outfield_model = get_model('outfield_model')
+    with STAGE_SECONDS.time('outfield_valuation', 'predict'):
+        return np.asarray(outfield_model.predict(new_data), dtype=float)
+
+
+def predict_goalkeeper_value(X):
+    # goalkeeper model predicts EUR directly (no log transform); the flat forest
+    # beats sklearn's compiled traversal up to a few hundred rows
+    if app.state.gk_forest is not None and len(X) <= GK_FOREST_MAX_BATCH:
+        with STAGE_SECONDS.time('goalkeeper_valuation', 'predict'):
+            return app.state.gk_forest.predict(X)
+    new_data = pd.DataFrame(X, columns=GOALKEEPER_VALUATION_FEATURES)
+    gk_model = get_model('gk_model')
+    with STAGE_SECONDS.time('goalkeeper_valuation', 'predict'):
+        return np.asarray(gk_model.predict(new_data), dtype=float)
+
+
+def predict_position_proba(X):
+    # class probabilities, columns in position_classes() order
+    if app.state.position_boosting is not None:
+        with STAGE_SECONDS.time('outfield_position_predictor', 'predict'):
+            return app.state.position_boosting.predict_proba(X)
+    new_data = pd.DataFrame(X, columns=POSITION_PREDICTOR_FEATURES)
+    position_predictor = get_model('outfield_position_predictor')
+    with STAGE_SECONDS.time('outfield_position_predictor', 'predict'):
+        return position_predictor.predict_proba(new_data)
+
+
+def position_classes():
+    if app.state.position_boosting is not None:
+        return app.state.position_boosting.classes
+    return get_model('outfield_position_predictor').classes_.tolist()
+
+
+# Micro-batching of concurrent single-row requests, per model: at most
+# max_batch_size rows, waiting at most max_wait_ms after the first one
+# (override with MICRO_BATCH_<MODEL>="rows,ms", MICRO_BATCHING=0 to disable)
+MICRO_BATCH_DEFAULTS = {
+    'outfield_valuation': (64, 2.0),
+    'goalkeeper_valuation': (64, 2.0),
+    'outfield_position_predictor': (64, 2.0),
+}
+MICRO_BATCH_PREDICT_FNS = {
+    'outfield_valuation': predict_outfield_log,
+    'goalkeeper_valuation': predict_goalkeeper_value,
+    'outfield_position_predictor': predict_position_proba,
+}
+inference_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="inference")
+app.state.batchers = {
+    name: MicroBatcher(MICRO_BATCH_PREDICT_FNS[name], max_batch_size, max_wait_ms, executor=inference_pool)
+    for name, (max_batch_size, max_wait_ms) in batching_config(MICRO_BATCH_DEFAULTS, os.environ).items()
+}
 
 
 try:
-    # Load main player data, setting low_memory=False for robustness
-    df = pd.read_csv("raw_data/FC26_20250921.csv", low_memory=False)
-
-    # CRITICAL FIX 1: Ensure player_id is the index for similarity lookups
-    if 'player_id' in df.columns:
-        df['player_id'] = df['player_id'].astype(int)
-        df = df.set_index('player_id')
-
-    app.state.df = df
-
-    # Load projection data (ensure index is type-matched)
-    app.state.X_proj = pd.read_csv("raw_data/X_proj.csv", index_col=[0])
-    app.state.X_proj.index = app.state.X_proj.index.astype(int)
+    if SHARED_DATA:
+        # attach the memory-mapped data, building it first if no worker did yet
+        with STAGE_SECONDS.time('startup', 'shared_data'):
+            shared = attach_shared_data()
+        df = app.state.df = shared.df
+        app.state.name_index = shared.name_index
+        app.state.autocomplete = shared.autocomplete
+        app.state.X_index, app.state.X_vectors, app.state.X_metadata = shared.X_index, shared.X_vectors, shared.X_metadata
+        app.state.X_unit = shared.X_unit
+        app.state.player_filters = shared.player_filters
+        app.state.json_rows = shared.json_rows
+    else:
+        # Load main player data: only the served columns, downcast, indexed by player_id
+        # (Feather cache from moneyballer/player_table.py, the csv when it is missing)
+        with STAGE_SECONDS.time('startup', 'player_table'):
+            df = load_player_table()
+
+        app.state.df = df
+
+        # Accent-folded substring index over long/short names for /get_player_id
+        with STAGE_SECONDS.time('startup', 'name_index'):
+            app.state.name_index = NameIndex(df['long_name'], df['short_name'])
+
+        # Sorted word-prefix keys ranked by overall for /autocomplete
+        with STAGE_SECONDS.time('startup', 'autocomplete_index'):
+            app.state.autocomplete = PrefixIndex(df['long_name'], df['short_name'], df['overall'])
+
+        # Load projection data: player_id per row (X_index) and PCA vectors (X_vectors)
+        if os.path.exists(EMBEDDINGS_PATH):
+            # binary store written by preprocessor.py, memory-mapped (no parsing, pages shared by workers)
+            X_ids, app.state.X_vectors, app.state.X_metadata = open_embeddings(EMBEDDINGS_PATH)
+            app.state.X_index = pd.Index(np.asarray(X_ids))
+            # unit-norm float32 embeddings searched by the similarity index, mapped from the same file
+            app.state.X_unit = open_unit_vectors(EMBEDDINGS_PATH)
+        else:
+            # older deployments only ship the csv
+            X_proj = pd.read_csv("raw_data/X_proj.csv", index_col=[0])
+            app.state.X_index = X_proj.index.astype(int)
+            app.state.X_vectors = X_proj.to_numpy(dtype=np.float32)
+            app.state.X_metadata = {}
+            app.state.X_unit = None
+
+        if app.state.X_unit is None:
+            # csv or a store written before the unit block: a private copy per worker
+            print(f"[WARNING] No unit vectors in {EMBEDDINGS_PATH} (run make rewrite_embeddings), "
+                  "normalizing in this worker.")
+            app.state.X_unit = normalize_rows(app.state.X_vectors)
+
+        # League / nationality / position / foot / value / age per X_proj row, for similarity filters
+        app.state.player_filters = PlayerFilterArrays(df, app.state.X_index)
+
+        # JSON object of every player per response shape, so responses skip the DataFrame -> JSON conversion
+        with STAGE_SECONDS.time('startup', 'json_rows'):
+            app.state.json_rows = {shape: JsonRows(df, columns) for shape, columns in RESPONSE_SHAPES.items()}
+
+    # player table row of each X_proj row (-1 when the player is not in the table)
+    app.state.X_rows = df.index.get_indexer(app.state.X_index)
+
+    # Precomputed 100 nearest neighbors per player (moneyballer/neighbor_table.py), memory-mapped;
+    # matched to the embeddings by the fingerprint in the store header (the csv is hashed, it is parsed anyway)
+    X_fingerprint = (stored_fingerprint(EMBEDDINGS_PATH) if os.path.exists(EMBEDDINGS_PATH)
+                     else embeddings_fingerprint(app.state.X_vectors))
+    app.state.neighbor_ids, app.state.neighbor_sims = load_neighbor_table(len(app.state.X_index), X_fingerprint)
+
+    # The configured search index over the unit-norm embeddings
+    with STAGE_SECONDS.time('startup', 'similarity_index'):
+        if SIMILARITY_INDEX == "ivf":
+            app.state.similarity_index = build_similarity_index("ivf", app.state.X_unit, n_probe=IVF_N_PROBE)
+        else:
+            app.state.similarity_index = build_similarity_index("exact", app.state.X_unit)
 
     print("\n[INFO] DataFrames loaded and indexed successfully.")
 except Exception as e:
     print(f"Error loading data files: {e}")
-    app.state.df = pd.DataFrame()
-    app.state.X_proj = pd.DataFrame()
-    raise HTTPException(status_code=500, detail="Data loading failed.")
+    raise RuntimeError(f"Data loading failed: {e}") from e
+
+
+# Result caches per endpoint (max entries, RESULT_CACHE=0 disables them), keyed by
+# normalized inputs and a version hash of the artifacts behind each endpoint.
+# Like the models, the version is fixed at startup: new artifacts need a restart.
+RESULT_CACHE_SIZES = {
+    'find_similar_players': 1024,
+    'outfield_valuation': 50_000,
+    'goalkeeper_valuation': 50_000,
+    'outfield_position_predictor': 50_000,
+}
+DATA_FILES = [PLAYER_TABLE_PATH, PLAYER_CSV_PATH, EMBEDDINGS_PATH, "raw_data/X_proj.csv"]
+RESULT_CACHE_ARTIFACTS = {
+    'find_similar_players': DATA_FILES + [NEIGHBOR_IDS_PATH, NEIGHBOR_SIMS_PATH, NEIGHBOR_FINGERPRINT_PATH,
+                                          MODEL_ARTIFACTS['knn_model']],
+    'outfield_valuation': [MODEL_ARTIFACTS['outfield_model'], MLP_ARTIFACT_PATH],
+    'goalkeeper_valuation': [MODEL_ARTIFACTS['gk_model'], GK_FOREST_PATH],
+    'outfield_position_predictor': [MODEL_ARTIFACTS['outfield_position_predictor'], POSITION_BOOSTING_PATH],
+}
+cache_enabled = os.environ.get("RESULT_CACHE", "1") != "0"
+app.state.result_caches = {
+    name: ResultCache(max_entries if cache_enabled else 0,
+                      artifact_version(RESULT_CACHE_ARTIFACTS[name], settings=[SIMILARITY_INDEX, IVF_N_PROBE]))
+    for name, max_entries in RESULT_CACHE_SIZES.items()
+}
+
+
+# Identical requests in flight at the same time share one computation (SINGLE_FLIGHT=0 disables it)
+single_flight_enabled = os.environ.get("SINGLE_FLIGHT", "1") != "0"
+app.state.single_flights = {
+    name: SingleFlight(single_flight_enabled)
+    for name in ['get_player_id', 'find_similar_players', 'outfield_valuation',
+                 'goalkeeper_valuation', 'outfield_position_predictor']
+}
+
+
+# Opt-in profiling of single requests (PROFILING=1): "X-Profile: 1" or ?profile=1 returns a
+# Server-Timing header with the handler stages, "cprofile" also keeps a cProfile call summary
+PROFILING = os.environ.get("PROFILING", "0") == "1"
+app.state.profiles = ProfileStore()
+app.add_middleware(ProfilingMiddleware, store=app.state.profiles, enabled=PROFILING)
+
+# Latency and body sizes per endpoint
+app.add_middleware(MetricsMiddleware, request_seconds=REQUEST_SECONDS,
+                   request_bytes=REQUEST_BYTES, response_bytes=RESPONSE_BYTES)
+
+
+# Stats kept by the loader, caches, coalescing and batchers, read on each scrape
+@metrics.collector
+def collect_component_stats():
+    artifacts = app.state.models.report()
+    caches = {name: cache.stats() for name, cache in app.state.result_caches.items()}
+    flights = {name: flight.stats() for name, flight in app.state.single_flights.items()}
+    batchers = app.state.batchers
+    return [
+        ("moneyballer_artifact_load_seconds", "gauge", "Time to load each model artifact",
+         [({'artifact': path}, stats['load_seconds']) for path, stats in artifacts.items()]),
+        ("moneyballer_artifact_size_bytes", "gauge", "Size of each model artifact",
+         [({'artifact': path}, stats['size_bytes']) for path, stats in artifacts.items()]),
+        ("moneyballer_artifact_loaded", "gauge", "1 once the artifact is loaded",
+         [({'artifact': path}, int(stats['status'] == 'loaded')) for path, stats in artifacts.items()]),
+        ("moneyballer_result_cache_hits_total", "counter", "Result cache hits",
+         [({'endpoint': name}, stats['hits']) for name, stats in caches.items()]),
+        ("moneyballer_result_cache_misses_total", "counter", "Result cache misses",
+         [({'endpoint': name}, stats['misses']) for name, stats in caches.items()]),
+        ("moneyballer_result_cache_evictions_total", "counter", "Result cache evictions",
+         [({'endpoint': name}, stats['evictions']) for name, stats in caches.items()]),
+        ("moneyballer_result_cache_entries", "gauge", "Results currently cached",
+         [({'endpoint': name}, stats['entries']) for name, stats in caches.items()]),
+        ("moneyballer_single_flight_executions_total", "counter", "Computations run by request leaders",
+         [({'endpoint': name}, stats['executions']) for name, stats in flights.items()]),
+        ("moneyballer_single_flight_coalesced_total", "counter", "Requests that waited for an identical one",
+         [({'endpoint': name}, stats['coalesced']) for name, stats in flights.items()]),
+        ("moneyballer_micro_batch_requests_total", "counter", "Rows submitted to the micro-batcher",
+         [({'model': name}, batcher.requests) for name, batcher in batchers.items()]),
+        ("moneyballer_micro_batch_batches_total", "counter", "Batches predicted by the micro-batcher",
+         [({'model': name}, batcher.batches) for name, batcher in batchers.items()]),
+        ("moneyballer_micro_batch_size_total", "counter", "Batches per batch size",
+         [({'model': name, 'size': size}, count)
+          for name, batcher in batchers.items() for size, count in sorted(batcher.batch_sizes.items())]),
+        ("moneyballer_micro_batch_queue_wait_seconds_total", "counter", "Time rows waited for their batch",
+         [({'model': name}, batcher.queue_wait_seconds_total) for name, batcher in batchers.items()]),
+        ("moneyballer_micro_batch_queue_wait_seconds_max", "gauge", "Longest wait of a row for its batch",
+         [({'model': name}, batcher.queue_wait_seconds_max) for name, batcher in batchers.items()]),
+    ]
 
 
 # Allowing all middleware
@@ -90,111 +335,172 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Players whose long or short name contains `name` (case and accent insensitive), in data
+# order, `limit` per page; a full page has an X-Next-Cursor header to pass as `cursor` for the next one
 @app.get("/get_player_id")
-def get_player_id(name: str):
-    # Reset index temporarily for search, and include 'overall'
-    df = app.state.df.reset_index()
-
-    player_details = df[[
-        'player_id', 'long_name', 'short_name', 'nationality_name',
-        'club_name', 'player_positions', 'overall', 'player_face_url',
-        'pace', 'shooting', 'passing', 'dribbling', 'defending',
-        'physic', 'value_eur', 'preferred_foot', 'age', 'league_name', 'club_contract_valid_until_year',
-
-        'goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking',
-        'goalkeeping_positioning', 'goalkeeping_reflexes', 'goalkeeping_speed'
-    ]]
-
-    results = player_details[
-        player_details['long_name'].str.contains(name, case=False, na=False) |
-        player_details['short_name'].str.contains(name, case=False, na=False)
-    ]
-
-    # Enforce hard limit
-    limited_df = results.head(50)
+@profiled
+def get_player_id(name: str,
+                  limit: int = Query(50, ge=1, le=1000),
+                  cursor: Optional[int] = Query(None, ge=0)):
+    # Concurrent searches for the same page share one lookup and serialization
+    body, next_cursor = app.state.single_flights['get_player_id'].do(
+        (name, limit, cursor), lambda: player_search_page(name, limit, cursor))
+    headers = {'X-Next-Cursor': str(next_cursor)} if next_cursor is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Serialized page of search results for `name` and the cursor of the next page (None on the last one)
+def player_search_page(name, limit, cursor):
+    # Row positions of the matches after the cursor (the last row of the previous page),
+    # one more than the page to know whether another page follows
+    with STAGE_SECONDS.time('get_player_id', 'name_search'):
+        positions = app.state.name_index.search(name, limit=limit + 1, after=-1 if cursor is None else cursor)
+    next_cursor = int(positions[limit - 1]) if len(positions) > limit else None
+
+    # JSON objects of the matched rows, encoded at startup, joined into the response
+    with STAGE_SECONDS.time('get_player_id', 'json_rows'):
+        return app.state.json_rows['player_search'].array(positions[:limit]), next_cursor
+
+
+# Same search as NDJSON (one player per line), sent while the name index is walked,
+# all matches unless `limit` is given
+@app.get("/get_player_id/stream")
+def get_player_id_stream(name: str,
+                         limit: Optional[int] = Query(None, ge=1),
+                         cursor: Optional[int] = Query(None, ge=0)):
+    return StreamingResponse(player_search_lines(name, limit, cursor), media_type="application/x-ndjson")
+
+
+# rows are encoded a chunk at a time, so the first players go out right away and
+# a broad query ("silva") never holds more than one chunk
+STREAM_CHUNK_ROWS = 50
+
+
+def player_search_lines(name, limit, cursor):
+    matches = app.state.name_index.iter_matches(name, after=-1 if cursor is None else cursor)
+    if limit is not None:
+        matches = itertools.islice(matches, limit)
+    json_rows = app.state.json_rows['player_search']
+    while rows := list(itertools.islice(matches, STREAM_CHUNK_ROWS)):
+        yield json_rows.lines(rows)
+
+
+# Search box suggestions: id, names, club and overall of the best players (by overall)
+# with a word of their long or short name starting with `q`
+@app.get("/autocomplete")
+def autocomplete(q: str, limit: int = Query(10, ge=1, le=AUTOCOMPLETE_MAX_LIMIT)):
+    rows = app.state.autocomplete.complete(q, limit)
+    return Response(content=app.state.json_rows['autocomplete'].array(rows), media_type="application/json")
+
+
+# 100 nearest neighbors of the player at X_proj row `player_pos`, as (row positions, cosine similarities)
+def table_neighbors(player_pos):
+    if app.state.neighbor_ids is not None:
+        # Precomputed table: the player's row already holds its 100 nearest neighbors
+        return app.state.neighbor_ids[player_pos], app.state.neighbor_sims[player_pos].astype(np.float64)
 
-    # Make JSON-safe: replace +/-inf and convert NaN -> None
-    limited_df = limited_df.replace([np.inf, -np.inf], np.nan)
-    records = limited_df.where(pd.notnull(limited_df), None).to_dict(orient='records')
-
-    # Return only the items list
-    return ORJSONResponse(jsonable_encoder(records))
+    # Find 100 nearest neighbors (ignoring the player itself)
+    x = np.asarray(app.state.X_vectors[player_pos]).reshape(1, -1)
+    distances, indices = get_model('knn_model').kneighbors(x)
+    return indices[0][1:101], 1 - distances[0][1:101]
 
 
-# give a player ID, give 5 similar alternatives
+# give a player ID, give similar alternatives (optionally filtered, top k)
 @app.get("/find_similar_players")
-def find_similar_players(player_id: int):
-    knn_model = app.state.knn_model
+@profiled
+def find_similar_players(player_id: int,
+                         k: int = Query(100, ge=1, le=1000),
+                         leagues: Optional[List[str]] = Query(None),
+                         nationalities: Optional[List[str]] = Query(None),
+                         positions: Optional[List[str]] = Query(None),
+                         feet: Optional[List[str]] = Query(None),
+                         min_value: Optional[float] = None,
+                         max_value: Optional[float] = None,
+                         min_age: Optional[float] = None,
+                         max_age: Optional[float] = None):
+    # Same player and filters: the serialized response is reused as is
+    cache = app.state.result_caches['find_similar_players']
+    cache_key = cache.key(player_id, k, leagues, nationalities, positions, feet,
+                          min_value, max_value, min_age, max_age)
+    body = cache.get(cache_key)
+
+    if body is MISSING:
+        # identical requests already running share that computation
+        body = app.state.single_flights['find_similar_players'].do(cache_key, lambda: similar_players_body(
+            player_id, k, leagues, nationalities, positions, feet, min_value, max_value, min_age, max_age))
+        cache.put(cache_key, body)
+
+    return Response(content=body, media_type="application/json")
+
+
+# Serialized similar players of `player_id` passing the filters
+def similar_players_body(player_id, k, leagues, nationalities, positions, feet,
+                         min_value, max_value, min_age, max_age):
     df = app.state.df # This DF is indexed by player_id
-    X_proj = app.state.X_proj
+    X_index = app.state.X_index # player_id of each X_proj row
 
-    if player_id not in X_proj.index:
+    if player_id not in X_index:
          raise HTTPException(status_code=404, detail=f"Player ID {player_id} not found in projection data.")
 
     # Check whether player is goalkeeper
     player_is_goalkeeper = df.loc[player_id, 'player_positions'] == 'GK'
 
-    # Get embedding for the selected player
-    x = X_proj.loc[player_id].values.reshape(1, -1)
+    # Filters run on compact per-player arrays, before any row is materialized
+    def keep_fn(rows):
+        return app.state.player_filters.mask(
+            rows, leagues=leagues, nationalities=nationalities, positions=positions, feet=feet,
+            min_value=min_value, max_value=max_value, min_age=min_age, max_age=max_age)
 
-    # Find 100 nearest neighbors (ignoring the player itself)
-    distances, indices = knn_model.kneighbors(x)
-    similar_indices_pos = indices[0][1:101] # Indices for X_proj positions
-    similar_distances = distances[0][1:101]
+    player_pos = X_index.get_loc(player_id)
+    similar_indices_pos, similarities = np.empty(0, dtype=np.int64), np.empty(0) # Indices for X_proj positions
 
-    # Map positional indices back to player_ids using X_proj index
-    similar_player_ids = X_proj.iloc[similar_indices_pos].index.tolist()
+    with STAGE_SECONDS.time('find_similar_players', 'kneighbors'):
+        if SIMILARITY_INDEX == "table":
+            similar_indices_pos, similarities = table_neighbors(player_pos)
+            keep = keep_fn(similar_indices_pos)
+            similar_indices_pos, similarities = similar_indices_pos[keep][:k], similarities[keep][:k]
 
-    if player_is_goalkeeper:
+        # Search index (exact or approximate) among players passing the filters,
+        # also used when filters are too selective (or k > 100) for the table
+        if len(similar_indices_pos) < k:
+            x = app.state.X_unit[player_pos]
+            similar_indices_pos, similarities = app.state.similarity_index.query(x, k, exclude=player_pos, keep_fn=keep_fn)
 
-        # Get player details from the main DF using player_ids (which are the index)
-        results = df.loc[similar_player_ids][[
-            'short_name', 'long_name', 'player_positions', 'overall', 'goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking',
-       'goalkeeping_positioning', 'goalkeeping_reflexes', 'goalkeeping_speed', 'value_eur', 'player_face_url',
-       'nationality_name','preferred_foot', 'age', 'league_name', 'club_contract_valid_until_year', 'club_name'
-        ]]
+    with STAGE_SECONDS.time('find_similar_players', 'json_rows'):
+        # Map X_proj positions to player table rows (players missing from the table are skipped)
+        rows = app.state.X_rows[similar_indices_pos]
+        found = rows >= 0
 
-    else:
+        # JSON objects of the players, encoded at startup, with the similarity (1 - cosine distance) appended
+        shape = 'similar_goalkeepers' if player_is_goalkeeper else 'similar_outfield'
+        return app.state.json_rows[shape].array(rows[found], similarity=np.round(similarities[found], 4).tolist())
 
-        # Get player details from the main DF using player_ids (which are the index)
-        results = df.loc[similar_player_ids][[
-            'short_name', 'long_name', 'player_positions', 'overall', 'pace', 'shooting',
-            'passing', 'dribbling', 'defending', 'physic', 'value_eur', 'player_face_url',
-            'nationality_name','preferred_foot', 'age', 'league_name', 'club_contract_valid_until_year', 'club_name'
-        ]]
 
-
-    # Calculate similarity
-    results['similarity'] = (1 - similar_distances).round(4)
-
-    # Make JSON-safe before returning
-    clean = results.replace([np.inf, -np.inf], np.nan)
-    clean = clean.where(pd.notnull(clean), None)
-    records = clean.reset_index(names='player_id').to_dict(orient='records')
-    return ORJSONResponse(jsonable_encoder(records))
+# Values accepted by the find_similar_players filters
+@app.get("/similar_players_filter_options")
+def similar_players_filter_options():
+    return app.state.player_filters.options()
 
 
 # Outfield player vaulation endpoint
 @app.get("/outfield_valuation")
-def outfield_valuation(age, pace, shooting, passing,
-       dribbling, defending, physic, skill_moves, weak_foot):
+@profiled
+async def outfield_valuation(age: float, pace: float, shooting: float, passing: float,
+       dribbling: float, defending: float, physic: float, skill_moves: float, weak_foot: float):
 
     # skill_moves and weeak_foot are just [1, 2, 3, 4, 5]
 
-    # assign model
-    outfield_model = app.state.outfield_model
-
-    columns = ['age', 'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
-        'skill_moves', 'weak_foot']
-
-    new_data = pd.DataFrame([{'age': age, 'pace': pace , 'shooting': shooting, 'passing': passing, 'dribbling': dribbling, 'defending': defending, 'physic': physic,
-        'skill_moves': skill_moves, 'weak_foot': weak_foot}], columns=columns)
+    # same order as OUTFIELD_VALUATION_FEATURES, predicted with concurrent requests
+    x = [age, pace, shooting, passing, dribbling, defending, physic, skill_moves, weak_foot]
 
     #prediction in log scale as we have y log transformed during modeling
-    prediction_log = outfield_model.predict(new_data)
-
-    # Convert prediction to a native Python type (float)
-    prediction_log = float(prediction_log[0]) if isinstance(prediction_log, (np.ndarray, list)) else float(prediction_log)
+    cache = app.state.result_caches['outfield_valuation']
+    cache_key = cache.key(*x)
+    prediction_log = cache.get(cache_key)
+    if prediction_log is MISSING:
+        prediction_log = float(await app.state.single_flights['outfield_valuation'].do_async(
+            cache_key, lambda: app.state.batchers['outfield_valuation'].predict(x)))
+        cache.put(cache_key, prediction_log)
 
     # Exponentiate to get EUR value
     prediction_value = round(np.exp(prediction_log), 0)
@@ -203,62 +509,169 @@ def outfield_valuation(age, pace, shooting, passing,
     return {'Predicted player value (EUR):': prediction_value}
 
 
-# Goalkeeper player vaulation endpoint
-@app.get("/goalkeeper_valuation")
-def goalkeeper_valuation(goalkeeping_diving, goalkeeping_handling, goalkeeping_kicking,
-       goalkeeping_positioning, goalkeeping_reflexes, goalkeeping_speed,
-       mentality_penalties, mentality_composure, age):
+# One outfield player for the batch valuation, missing values are imputed by the pipeline
+class OutfieldAttributes(BaseModel):
+    age: Optional[float] = None
+    pace: Optional[float] = None
+    shooting: Optional[float] = None
+    passing: Optional[float] = None
+    dribbling: Optional[float] = None
+    defending: Optional[float] = None
+    physic: Optional[float] = None
+    skill_moves: Optional[float] = None
+    weak_foot: Optional[float] = None
+
+
+# Outfield batch valuation: one predict call for the whole list, values in input order
+@app.post("/outfield_valuation/batch")
+@profiled
+def outfield_valuation_batch(players: List[OutfieldAttributes]):
+
+    if not players:
+        return {'Predicted player values (EUR):': []}
 
-    goalkeeper_model = app.state.gk_model
+    # missing values become NaN, imputed with the training medians
+    new_data = pd.DataFrame([player.model_dump() for player in players],
+                            columns=OUTFIELD_VALUATION_FEATURES, dtype=float)
 
-    columns = ['goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking',
-       'goalkeeping_positioning', 'goalkeeping_reflexes', 'goalkeeping_speed',
-       'mentality_penalties', 'mentality_composure', 'age']
+    # log scale predictions for all rows, exponentiated at once
+    prediction_log = predict_outfield_log(new_data.to_numpy())
+    prediction_values = np.round(np.exp(prediction_log), 0)
 
-    new_data = pd.DataFrame([{'goalkeeping_diving' : goalkeeping_diving,
-                             'goalkeeping_handling' : goalkeeping_handling,
-                             'goalkeeping_kicking' : goalkeeping_kicking,
-                             'goalkeeping_positioning' : goalkeeping_positioning,
-       'goalkeeping_reflexes' : goalkeeping_reflexes, 'goalkeeping_speed' : goalkeeping_speed, 'mentality_penalties' : mentality_penalties,
-       'mentality_composure' : mentality_composure, 'age' : age}], columns=columns)
+    return {'Predicted player values (EUR):': prediction_values.tolist()}
 
-    prediction = goalkeeper_model.predict(new_data)
 
-    # Convert prediction to a native Python type (float)
-    prediction_value = float(prediction[0]) if isinstance(prediction, (np.ndarray, list)) else float(prediction)
+# Goalkeeper player vaulation endpoint
+@app.get("/goalkeeper_valuation")
+@profiled
+async def goalkeeper_valuation(goalkeeping_diving: float, goalkeeping_handling: float, goalkeeping_kicking: float,
+       goalkeeping_positioning: float, goalkeeping_reflexes: float, goalkeeping_speed: float,
+       mentality_penalties: float, mentality_composure: float, age: float):
+
+    # same order as GOALKEEPER_VALUATION_FEATURES, predicted with concurrent requests
+    x = [goalkeeping_diving, goalkeeping_handling, goalkeeping_kicking,
+         goalkeeping_positioning, goalkeeping_reflexes, goalkeeping_speed,
+         mentality_penalties, mentality_composure, age]
+
+    cache = app.state.result_caches['goalkeeper_valuation']
+    cache_key = cache.key(*x)
+    prediction_value = cache.get(cache_key)
+    if prediction_value is MISSING:
+        # Convert prediction to a native Python type (float)
+        prediction_value = float(await app.state.single_flights['goalkeeper_valuation'].do_async(
+            cache_key, lambda: app.state.batchers['goalkeeper_valuation'].predict(x)))
+        cache.put(cache_key, prediction_value)
 
     # return as dictionary/json format
     return {'Predicted player value (EUR):': prediction_value}
 
+
+# One goalkeeper for the batch valuation
+class GoalkeeperAttributes(BaseModel):
+    goalkeeping_diving: float
+    goalkeeping_handling: float
+    goalkeeping_kicking: float
+    goalkeeping_positioning: float
+    goalkeeping_reflexes: float
+    goalkeeping_speed: float
+    mentality_penalties: float
+    mentality_composure: float
+    age: float
+
+
+# Goalkeeper batch valuation: one predict call for the whole list, values in input order
+@app.post("/goalkeeper_valuation/batch")
+@profiled
+def goalkeeper_valuation_batch(players: List[GoalkeeperAttributes]):
+
+    if not players:
+        return {'Predicted player values (EUR):': []}
+
+    new_data = pd.DataFrame([player.model_dump() for player in players],
+                            columns=GOALKEEPER_VALUATION_FEATURES, dtype=float)
+
+    prediction_values = predict_goalkeeper_value(new_data.to_numpy())
+
+    return {'Predicted player values (EUR):': prediction_values.tolist()}
+
 # Player position predictor endpoint
 @app.get("/outfield_position_predictor")
-def outfield_position_predictor(age,
-                                pace, dribbling, passing,
-                                defending, shooting, physic,
-                                skill_moves, weak_foot):
+@profiled
+async def outfield_position_predictor(age: float,
+                                pace: float, dribbling: float, passing: float,
+                                defending: float, shooting: float, physic: float,
+                                skill_moves: float, weak_foot: float,
+                                top_k: int = Query(3, ge=1, le=5)):
+
+    # same order as POSITION_PREDICTOR_FEATURES, predicted with concurrent requests
+    x = [age,
+         pace, dribbling, passing,
+         defending, shooting, physic,
+         skill_moves, weak_foot]
+
+    # probabilities of every position are cached, top_k is applied per request
+    cache = app.state.result_caches['outfield_position_predictor']
+    cache_key = cache.key(*x)
+    probabilities = cache.get(cache_key)
+    if probabilities is MISSING:
+        probabilities = await app.state.single_flights['outfield_position_predictor'].do_async(
+            cache_key, lambda: app.state.batchers['outfield_position_predictor'].predict(x))
+        cache.put(cache_key, probabilities)
+    classes = position_classes()
+
+    # most likely positions first (argmax first, like predict)
+    ranked = np.argsort(-probabilities, kind='stable')[:top_k]
+    top_positions = [{'position': classes[i], 'probability': round(float(probabilities[i]), 4)} for i in ranked]
 
-    position_predictor = app.state.outfield_position_predictor
+    # return as dictionary/json format
+    return {'Suggested Position': top_positions[0]['position'], 'Top positions': top_positions}
 
 
-    features = ['age',
-                'pace', 'dribbling', 'passing',
-                'defending', 'shooting', 'physic',
-                'skill_moves', 'weak_foot']
+# batch sizes and queue waits of the micro-batching, per model
+@app.get("/micro_batching")
+def micro_batching():
+    return {name: batcher.stats() for name, batcher in app.state.batchers.items()}
 
-    new_data = pd.DataFrame([{'age' : age,
-                            'pace' : pace, 'dribbling' : dribbling,
-                            'passing' : passing, 'defending' : defending,
-                            'shooting' : shooting, 'physic' : physic,
-                            'skill_moves' : skill_moves, 'weak_foot' : weak_foot}],
-                            columns=features)
 
-    prediction = position_predictor.predict(new_data)
+# entries, hits, misses and evictions of the result caches, per endpoint
+@app.get("/result_cache")
+def result_cache():
+    return {name: cache.stats() for name, cache in app.state.result_caches.items()}
+
+
+# computations run and requests that shared one, per endpoint
+@app.get("/single_flight")
+def single_flight():
+    return {name: flight.stats() for name, flight in app.state.single_flights.items()}
+
+
+# Prometheus text format scrape endpoint
+@app.get("/metrics")
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# cProfile summary of a request profiled with "X-Profile: cprofile"
+@app.get("/profiles/{profile_id}")
+def request_profile(profile_id: str):
+    summary = app.state.profiles.get(profile_id) if PROFILING else None
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    return PlainTextResponse(summary)
 
-    # return as dictionary/json format
-    return {'Suggested Position': prediction[0]}
 
+# liveness: the process is up and serving
+@app.get("/health")
+def health():
+    return {'status': 'ok'}
 
 
+# readiness: every model artifact is loaded, with per-artifact load time and size
+@app.get("/ready")
+def ready():
+    models = app.state.models
+    body = {'ready': models.ready(), 'artifacts': models.report()}
+    return JSONResponse(body, status_code=200 if body['ready'] else 503)
 
 
 # greeting
@@ -0,0 +1,74 @@
+# Recall@100 and query latency of the IVF similarity index against exact search
+#
+# run from the project root:  python -m benchmarks.bench_ann [n_players ...]
+# uses raw_data/X_proj.emb when present, plus synthetic clustered embeddings
+import os
+import sys
+import time
+import numpy as np
+from moneyballer.ann_index import ExactCosineIndex, IVFCosineIndex
+from moneyballer.embedding_store import EMBEDDINGS_PATH, open_embeddings
+from moneyballer.neighbor_table import normalize_rows
+
+SIZES = [20_000, 200_000, 1_000_000]
+N_PROBES = [4, 8, 16, 32]
+N_QUERIES = 200
+K = 100
+DIMENSIONS = 16
+
+
+def synthetic_embeddings(n, d=DIMENSIONS, n_archetypes=60, seed=0):
+    # players cluster around archetypes (target men, ball-playing CBs, ...)
+    rng = np.random.default_rng(seed)
+    archetypes = rng.normal(size=(n_archetypes, d))
+    scales = np.linspace(1.0, 0.1, d)  # PCA components with decreasing variance
+    X = archetypes[rng.integers(0, n_archetypes, n)] + rng.normal(scale=0.6, size=(n, d))
+    return (X * scales).astype(np.float32)
+
+
+def run_queries(index, X_unit, queries):
+    results, timings = [], []
+    for q in queries:
+        start = time.perf_counter()
+        rows, _ = index.query(X_unit[q], K, exclude=q)
+        timings.append(time.perf_counter() - start)
+        results.append(rows)
+    return results, 1000 * np.array(timings)
+
+
+def recall(approx, exact):
+    return np.mean([len(np.intersect1d(a, e)) / len(e) for a, e in zip(approx, exact)])
+
+
+def bench(name, X):
+    X_unit = normalize_rows(X)
+    queries = np.random.default_rng(1).choice(len(X_unit), min(N_QUERIES, len(X_unit)), replace=False)
+
+    exact_index = ExactCosineIndex(X_unit)
+    exact, exact_ms = run_queries(exact_index, X_unit, queries)
+
+    start = time.perf_counter()
+    ivf_index = IVFCosineIndex(X_unit)
+    build_s = time.perf_counter() - start
+
+    print(f"\n{name}: {len(X):,} players x {X.shape[1]} dims, "
+          f"IVF {ivf_index.n_cells} cells built in {build_s:.1f}s")
+    print(f"{'index':<16}{'recall@100':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"{'exact':<16}{1.0:>12.3f}{np.percentile(exact_ms, 50):>10.2f}{np.percentile(exact_ms, 99):>10.2f}")
+
+    for n_probe in N_PROBES:
+        ivf_index.n_probe = n_probe
+        approx, ivf_ms = run_queries(ivf_index, X_unit, queries)
+        print(f"{f'ivf n_probe={n_probe}':<16}{recall(approx, exact):>12.3f}"
+              f"{np.percentile(ivf_ms, 50):>10.2f}{np.percentile(ivf_ms, 99):>10.2f}")
+
+
+def main(sizes):
+    if os.path.exists(EMBEDDINGS_PATH):
+        bench("X_proj.emb", np.asarray(open_embeddings()[1]))
+    for n in sizes:
+        bench("synthetic", synthetic_embeddings(n))
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or SIZES)
@@ -0,0 +1,72 @@
+# Latency of /autocomplete: prefix lookup and response body, against a 1 ms target
+#
+# run from the project root:  python -m benchmarks.bench_autocomplete [n_players ...]
+# synthetic players (moneyballer/synthetic_data.py); queries are prefixes of 1 to 8
+# characters of random player names, the memoized short prefixes are warmed first
+import sys
+import time
+import numpy as np
+from moneyballer.autocomplete import MAX_KEY_BYTES, PrefixIndex, prefix_keys
+from moneyballer.json_rows import AUTOCOMPLETE_COLUMNS, JsonRows
+from moneyballer.name_index import normalize_name
+from moneyballer.player_table import prepare_player_table
+from moneyballer.synthetic_data import generate_players
+
+SIZES = [20_000, 1_000_000]
+PREFIX_LENGTHS = [1, 2, 3, 5, 8]
+N_QUERIES = 500
+LIMIT = 10
+TARGET_MS = 1.0
+
+
+def brute_force(df, prefix, limit):
+    # players having a key starting with the prefix, best overall first
+    query = ' '.join(normalize_name(prefix).split()).encode()[:MAX_KEY_BYTES]
+    rows = [row for row, (long_name, short_name) in enumerate(zip(df['long_name'], df['short_name']))
+            if any(key.startswith(query) for key in prefix_keys(long_name) | prefix_keys(short_name))]
+    return sorted(rows, key=lambda row: -df['overall'].iat[row])[:limit]
+
+
+def main(sizes):
+    for n in sizes:
+        df = prepare_player_table(generate_players(n)).set_index('player_id')
+
+        start = time.perf_counter()
+        index = PrefixIndex(df['long_name'], df['short_name'], df['overall'])
+        json_rows = JsonRows(df, AUTOCOMPLETE_COLUMNS)
+        build_s = time.perf_counter() - start
+        text, arrays = index.arrays()
+        size_mb = (len(text) + sum(array.nbytes for array in arrays.values())) / 1e6
+        print(f"\n{n:,} players - index built in {build_s:.2f}s ({size_mb:.1f} MB)")
+
+        rng = np.random.default_rng(0)
+        names = df['long_name'].to_numpy()[rng.integers(0, n, N_QUERIES)]
+        if n <= 20_000:
+            for name in names[:10]:
+                for length in PREFIX_LENGTHS:
+                    ranked = index.complete(name[:length], LIMIT).tolist()
+                    expected = brute_force(df, name[:length], LIMIT)
+                    # same players, ties on overall may come in another order
+                    assert sorted(df['overall'].iloc[ranked]) == sorted(df['overall'].iloc[expected]), name[:length]
+
+        print(f"{'prefix':>7}{'lookup p50 ms':>15}{'p99 ms':>10}{'+ body p50 ms':>15}{'p99 ms':>10}{'target':>8}")
+        for length in PREFIX_LENGTHS:
+            queries = [name[:length] for name in names]
+            for query in queries:
+                index.complete(query, LIMIT)
+
+            lookup, total = [], []
+            for query in queries:
+                start = time.perf_counter()
+                rows = index.complete(query, LIMIT)
+                lookup.append(time.perf_counter() - start)
+                json_rows.array(rows)
+                total.append(time.perf_counter() - start)
+            lookup, total = 1000 * np.array(lookup), 1000 * np.array(total)
+            p99 = np.percentile(total, 99)
+            print(f"{length:>7}{np.median(lookup):>15.4f}{np.percentile(lookup, 99):>10.4f}"
+                  f"{np.median(total):>15.4f}{p99:>10.4f}{'ok' if p99 < TARGET_MS else 'MISS':>8}")
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or SIZES)
@@ -0,0 +1,93 @@
+# Goalkeeper valuation: pickled sklearn forest vs the flattened node arrays
+#
+# run from the project root:  python -m benchmarks.bench_forest
+# uses models/gk_model.pkl when present, otherwise fits the same pipeline on
+# synthetic goalkeepers; reports artifact size, load time, latency and checks
+# that every prediction is identical to sklearn
+import os
+import pickle
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+from moneyballer.forest_export import ForestPredictor, export_forest_pipeline
+from moneyballer.model_features import GOALKEEPER_VALUATION_FEATURES
+
+N_GOALKEEPERS = 2_000
+N_PARITY = 10_000
+N_TIMED = 200
+BATCH_SIZES = [1, 64, 1024]
+
+
+def synthetic_goalkeepers(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(20, 92, (n, len(GOALKEEPER_VALUATION_FEATURES))).astype(float),
+                     columns=GOALKEEPER_VALUATION_FEATURES)
+    X['age'] = rng.integers(16, 41, n)
+    y = np.exp(8 + X.iloc[:, :5].mean(axis=1) / 12 + rng.normal(scale=0.3, size=n)).round(-3)
+    return X, y
+
+
+def load_pipeline():
+    path = "models/gk_model.pkl"
+    if os.path.exists(path):
+        with open(path, "rb") as file:
+            return path, pickle.load(file)
+
+    X, y = synthetic_goalkeepers(N_GOALKEEPERS)
+    pipe = Pipeline([
+        ('preproc', Pipeline([('mm_scaler', MinMaxScaler())])),
+        ('value_model', RandomForestRegressor(n_estimators=200, random_state=0)),
+    ])
+    return "synthetic fit", pipe.fit(X, y)
+
+
+def timed(fn, n_calls):
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        result = fn()
+    return (time.perf_counter() - start) / n_calls, result
+
+
+def main():
+    source, pipe = load_pipeline()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, 'gk_model.pkl')
+        with open(pickle_path, "wb") as file:
+            pickle.dump(pipe, file)
+        forest_path = os.path.join(tmp, 'gk_model.npz')
+        export_forest_pipeline(pipe, forest_path)
+
+        pickle_load_s, _ = timed(lambda: pickle.load(open(pickle_path, "rb")), 5)
+        forest_load_s, predictor = timed(lambda: ForestPredictor.load(forest_path), 5)
+        pickle_mb, forest_mb = os.path.getsize(pickle_path) / 1e6, os.path.getsize(forest_path) / 1e6
+
+    n_nodes = len(predictor.trees.value)
+    print(f"{source}: {len(predictor.trees.roots)} trees, {n_nodes:,} nodes")
+    print(f"{'artifact':<12}{'MB':>8}{'load ms':>10}")
+    print(f"{'pickle':<12}{pickle_mb:>8.2f}{1000 * pickle_load_s:>10.1f}")
+    print(f"{'flat arrays':<12}{forest_mb:>8.2f}{1000 * forest_load_s:>10.1f}")
+
+    X, _ = synthetic_goalkeepers(N_PARITY, seed=1)
+    X.iloc[::50, 5] = np.nan  # goalkeeping_speed is sometimes missing
+    expected = pipe.predict(X)
+    actual = predictor.predict(X.to_numpy())
+    assert np.array_equal(actual, expected), "flattened forest predictions differ from sklearn"
+    print(f"\n{N_PARITY:,} / {N_PARITY:,} predictions identical to sklearn")
+
+    print(f"\n{'rows':>6}{'sklearn ms':>12}{'flat ms':>10}{'speedup':>10}")
+    for batch_size in BATCH_SIZES:
+        frame = X.iloc[:batch_size]
+        values = frame.to_numpy()
+        n_calls = max(N_TIMED // batch_size, 5)
+        sklearn_s, _ = timed(lambda: pipe.predict(frame), n_calls)
+        flat_s, _ = timed(lambda: predictor.predict(values), n_calls)
+        print(f"{batch_size:>6}{1000 * sklearn_s:>12.2f}{1000 * flat_s:>10.2f}{sklearn_s / flat_s:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# Face images of a 50-player result grid: direct download + base64 vs FaceImageCache
+#
+# run from the project root:  python -m benchmarks.bench_image_cache [delay_ms]
+# faces come from the local stub server (benchmarks/face_stub_server.py), which
+# waits delay_ms per request like the CDN; the cache lives in a temp directory
+import base64
+import sys
+import tempfile
+import time
+import requests
+from benchmarks.face_stub_server import FaceHandler, start_stub_server
+from moneyballer.image_cache import FaceImageCache
+
+N_FACES = 50
+DELAY_MS = 30
+
+
+def direct_data_uri(url):
+    # the app's former get_image_base64
+    response = requests.get(url, timeout=5)
+    return f"data:{response.headers['content-type']};base64,{base64.b64encode(response.content).decode('utf-8')}"
+
+
+def grid_ms(fn, urls):
+    start = time.perf_counter()
+    uris = [fn(url) for url in urls]
+    return 1000 * (time.perf_counter() - start), uris
+
+
+def main(delay_ms):
+    server, base_url = start_stub_server(delay_ms=delay_ms)
+    urls = [f"{base_url}/faces/{player_id}.png" for player_id in range(N_FACES)]
+    cache_dir = tempfile.mkdtemp(prefix="moneyballer_faces_")
+
+    runs = []
+    direct_ms, expected = grid_ms(direct_data_uri, urls)
+    runs.append(('direct download (every rerun)', direct_ms, N_FACES))
+
+    cache = FaceImageCache(cache_dir)
+    for name, fn in [('cache: first view', cache.data_uri),
+                     ('cache: rerun (memory)', cache.data_uri),
+                     ('cache: new process (disk)', FaceImageCache(cache_dir).data_uri),
+                     ('cache: expired (304)', FaceImageCache(cache_dir, max_age_seconds=0).data_uri)]:
+        requests_before = FaceHandler.requests
+        ms, uris = grid_ms(fn, urls)
+        assert uris == expected, name
+        runs.append((name, ms, FaceHandler.requests - requests_before))
+    server.shutdown()
+
+    print(f"{N_FACES} faces, {delay_ms} ms per request to the stub CDN")
+    print(f"{'':<32}{'grid ms':>10}{'requests':>10}")
+    for name, ms, n_requests in runs:
+        print(f"{name:<32}{ms:>10.1f}{n_requests:>10}")
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else DELAY_MS)
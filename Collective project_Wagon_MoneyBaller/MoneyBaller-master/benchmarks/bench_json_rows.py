@@ -0,0 +1,72 @@
+# Serialization time of a 100-row response: per-request DataFrame -> JSON vs pre-serialized rows
+#
+# run from the project root:  python -m benchmarks.bench_json_rows [n_players]
+# synthetic players (moneyballer/synthetic_data.py) through the api's player
+# table preparation; both paths must produce the same bytes
+import sys
+import time
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from moneyballer.json_rows import RESPONSE_SHAPES, JsonRows
+from moneyballer.player_table import prepare_player_table
+from moneyballer.synthetic_data import generate_players
+
+N_PLAYERS = 20_000
+RESPONSE_ROWS = 100
+N_RESPONSES = 200
+
+
+def dataframe_body(df, rows, similarities=None):
+    # the former endpoint code, from the row positions to the response bytes
+    results = df.iloc[rows]
+    if similarities is not None:
+        results = results.assign(similarity=np.round(similarities, 4))
+    clean = results.replace([np.inf, -np.inf], np.nan)
+    records = clean.where(pd.notnull(clean), None).reset_index(names='player_id').to_dict(orient='records')
+    return ORJSONResponse(jsonable_encoder(records)).body
+
+
+def json_rows_body(json_rows, rows, similarities=None):
+    if similarities is None:
+        return json_rows.array(rows)
+    return json_rows.array(rows, similarity=np.round(similarities, 4).tolist())
+
+
+def main(n_players):
+    df = prepare_player_table(generate_players(n_players)).set_index('player_id')
+    rng = np.random.default_rng(0)
+    requests = [(rng.choice(len(df), RESPONSE_ROWS, replace=False), np.sort(rng.random(RESPONSE_ROWS))[::-1])
+                for _ in range(N_RESPONSES)]
+
+    print(f"{n_players:,} players, {RESPONSE_ROWS} rows per response")
+    print(f"{'shape':<22}{'build s':>9}{'MB':>8}{'dataframe ms':>15}{'json rows ms':>15}{'speedup':>10}")
+    for shape, columns in RESPONSE_SHAPES.items():
+        start = time.perf_counter()
+        json_rows = JsonRows(df, columns)
+        build_s = time.perf_counter() - start
+        text, arrays = json_rows.arrays()
+        size_mb = (len(text) + arrays['starts'].nbytes) / 1e6
+
+        # the player search has no per-request field, similar players get their similarity
+        with_similarity = shape != 'player_search'
+        frame = df[columns]
+        timings = {}
+        for name, body in [('dataframe', lambda r, s: dataframe_body(frame, r, s)),
+                           ('json_rows', lambda r, s: json_rows_body(json_rows, r, s))]:
+            start = time.perf_counter()
+            for rows, similarities in requests:
+                body(rows, similarities if with_similarity else None)
+            timings[name] = 1000 * (time.perf_counter() - start) / len(requests)
+
+        for rows, similarities in requests[:20]:
+            similarities = similarities if with_similarity else None
+            assert dataframe_body(frame, rows, similarities) == json_rows_body(json_rows, rows, similarities), shape
+
+        print(f"{shape:<22}{build_s:>9.2f}{size_mb:>8.1f}{timings['dataframe']:>15.3f}{timings['json_rows']:>15.3f}"
+              f"{timings['dataframe'] / timings['json_rows']:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_PLAYERS)
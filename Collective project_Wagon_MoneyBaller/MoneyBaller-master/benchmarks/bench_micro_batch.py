@@ -0,0 +1,66 @@
+# Concurrent single-row valuations with and without micro-batching
+#
+# run from the project root:  python -m benchmarks.bench_micro_batch [n_concurrent]
+# predicts with the sklearn outfield pipeline (models/DeepL_valuation_model.pkl,
+# or the synthetic fit of bench_mlp), where one-row calls are overhead bound
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from benchmarks.bench_mlp import load_pipeline, synthetic_players
+from moneyballer.micro_batch import MicroBatcher
+from moneyballer.model_features import OUTFIELD_VALUATION_FEATURES
+
+N_CONCURRENT = 256
+N_WAVES = 4
+CONFIGS = {
+    'no batching': (1, 0.0),
+    '16 rows / 1 ms': (16, 1.0),
+    '64 rows / 2 ms': (64, 2.0),
+}
+
+
+async def run(batcher, rows):
+    # N_WAVES bursts of concurrent requests, each timed from submit to result
+    latencies, results = [], []
+
+    async def request(row):
+        start = time.perf_counter()
+        result = await batcher.predict(row)
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    start = time.perf_counter()
+    for _ in range(N_WAVES):
+        results = await asyncio.gather(*[request(row) for row in rows])
+    elapsed = time.perf_counter() - start
+    return np.array(results), 1000 * np.array(latencies), N_WAVES * len(rows) / elapsed
+
+
+def main(n_concurrent):
+    source, pipe = load_pipeline()
+    X, _ = synthetic_players(n_concurrent, seed=2)
+    rows = X.fillna(50).to_numpy().tolist()
+    expected = pipe.predict(pd.DataFrame(rows, columns=OUTFIELD_VALUATION_FEATURES))
+
+    def predict(X):
+        return pipe.predict(pd.DataFrame(X, columns=OUTFIELD_VALUATION_FEATURES))
+
+    print(f"{source}: {n_concurrent} concurrent requests x {N_WAVES} waves")
+    print(f"{'config':<16}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'batches':>9}{'mean rows':>11}{'mean wait ms':>14}")
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        for name, (max_batch_size, max_wait_ms) in CONFIGS.items():
+            batcher = MicroBatcher(predict, max_batch_size, max_wait_ms, executor=executor)
+            results, latencies, throughput = asyncio.run(run(batcher, rows))
+            assert np.allclose(results, expected), "batched predictions differ from one-row predictions"
+
+            stats = batcher.stats()
+            print(f"{name:<16}{throughput:>10.0f}{np.percentile(latencies, 50):>10.1f}"
+                  f"{np.percentile(latencies, 99):>10.1f}{stats['batches']:>9}"
+                  f"{stats['mean_batch_size']:>11.1f}{stats['mean_queue_wait_ms']:>14.2f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_CONCURRENT)
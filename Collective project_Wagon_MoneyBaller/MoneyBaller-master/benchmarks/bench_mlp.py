@@ -0,0 +1,94 @@
+# Outfield valuation: sklearn pipeline vs the exported NumPy forward pass
+#
+# run from the project root:  python -m benchmarks.bench_mlp
+# uses models/DeepL_valuation_model.pkl when present, otherwise fits the same
+# architecture on synthetic players
+import os
+import pickle
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.impute import SimpleImputer
+from sklearn.neural_network import MLPRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+from moneyballer.mlp_export import MAX_LOG_DIFF, NumpyMLPPredictor, export_mlp_pipeline
+from moneyballer.model_features import OUTFIELD_VALUATION_FEATURES
+
+N_PARITY = 10_000
+N_TIMED = 2_000
+BATCH_SIZES = [1, 64, 1024]
+
+
+def synthetic_players(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(20, 99, (n, len(OUTFIELD_VALUATION_FEATURES))).astype(float),
+                     columns=OUTFIELD_VALUATION_FEATURES)
+    X['age'] = rng.integers(16, 41, n)
+    X['skill_moves'] = rng.integers(1, 6, n)
+    X['weak_foot'] = rng.integers(1, 6, n)
+    # a few missing values so the median imputation is exercised
+    X = X.mask(rng.random(X.shape) < 0.01)
+    y = 10 + X[['pace', 'shooting', 'passing', 'dribbling']].fillna(60).mean(axis=1) / 15 - X['age'].fillna(25) / 20
+    return X, y.to_numpy()
+
+
+def load_pipeline():
+    path = "models/DeepL_valuation_model.pkl"
+    if os.path.exists(path):
+        with open(path, "rb") as file:
+            return path, pickle.load(file)
+
+    X, y = synthetic_players(20_000)
+    pipe = Pipeline([
+        ("prep", Pipeline([("imputer", SimpleImputer(strategy="median")), ("scaler", MinMaxScaler())])),
+        ("mlp", MLPRegressor(hidden_layer_sizes=(128, 64, 32), max_iter=50, random_state=42)),
+    ])
+    return "synthetic fit", pipe.fit(X, y)
+
+
+def per_call_us(fn, n_calls):
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        fn()
+    return 1e6 * (time.perf_counter() - start) / n_calls
+
+
+def main():
+    source, pipe = load_pipeline()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'mlp.npy')
+        export_mlp_pipeline(pipe, path)
+        predictor = NumpyMLPPredictor.load(path)
+        artifact_kb = os.path.getsize(path) / 1e3
+
+    X, _ = synthetic_players(N_PARITY, seed=1)
+    diff = np.abs(predictor.predict(X.to_numpy(np.float32)) - pipe.predict(X))
+    print(f"{source}: {artifact_kb:.1f} kB exported, max |log value| diff {diff.max():.2e} over {N_PARITY:,} rows")
+    assert diff.max() < MAX_LOG_DIFF, "NumPy predictions diverge from the sklearn pipeline"
+
+    # micro-batched requests must get the EUR value of the same player predicted alone
+    batched = np.round(np.exp(predictor.predict(X.to_numpy()[:1000])), 0)
+    alone = np.round(np.exp([predictor.predict(row)[0] for row in X.to_numpy()[:1000]]), 0)
+    assert (batched == alone).all(), "predictions depend on the batch size"
+
+    # single request: the api builds a one-row DataFrame for sklearn, a float32 array for NumPy
+    row = X.iloc[0].to_dict()
+    sklearn_us = per_call_us(lambda: pipe.predict(pd.DataFrame([row], columns=OUTFIELD_VALUATION_FEATURES)), N_TIMED)
+    numpy_us = per_call_us(lambda: predictor.predict(
+        np.array([[row[f] for f in OUTFIELD_VALUATION_FEATURES]], dtype=np.float32)), N_TIMED)
+
+    print(f"{'rows':>6}{'sklearn us':>14}{'numpy us':>12}{'speedup':>10}")
+    print(f"{1:>6}{sklearn_us:>14.1f}{numpy_us:>12.1f}{sklearn_us / numpy_us:>9.1f}x")
+
+    # batch endpoint: both start from the validated DataFrame
+    for batch_size in BATCH_SIZES[1:]:
+        frame = X.iloc[:batch_size]
+        n_calls = max(N_TIMED // batch_size, 20)
+        sklearn_us = per_call_us(lambda: pipe.predict(frame), n_calls)
+        numpy_us = per_call_us(lambda: predictor.predict(frame.to_numpy(np.float32)), n_calls)
+        print(f"{batch_size:>6}{sklearn_us:>14.1f}{numpy_us:>12.1f}{sklearn_us / numpy_us:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Latency of /get_player_id search: full-table str.contains scan vs NameIndex
+#
+# run from the project root:  python -m benchmarks.bench_name_search
+import sys
+import time
+import numpy as np
+import pandas as pd
+from moneyballer.name_index import NameIndex
+
+SIZES = [20_000, 1_000_000]
+# plain queries must return exactly the rows of the original scan
+EXACT_QUERIES = ['silva', 'ronaldo', 'de', 'van dijk', 'zzzq']
+# accent-folded queries also match names the case-only scan misses
+FOLDED_QUERIES = ['mbappe', 'mbappé', 'joão félix']
+REPEATS = 5
+
+FIRST_NAMES = ['Kylian', 'Lionel', 'João', 'Erling', 'Ederson', 'Thiago', 'André', 'Thomas',
+               'Cristiano', 'Mohamed', 'Kevin', 'Virgil', 'Luka', 'Jude', 'Bruno', 'Rúben',
+               'Sergio', 'Antoine', 'Raphaël', 'Ángel', 'Gianluigi', 'Marc-André', 'Son', 'Achraf']
+LAST_NAMES = ['Mbappé', 'Messi', 'Félix', 'Haaland', 'Moraes', 'Silva', 'Gomes', 'Müller',
+              'Ronaldo', 'Salah', 'De Bruyne', 'van Dijk', 'Modrić', 'Bellingham', 'Fernandes',
+              'Dias', 'Ramos', 'Griezmann', 'Varane', 'Di María', 'Donnarumma', 'ter Stegen',
+              'Heung-min', 'Hakimi', 'Núñez', 'Çalhanoğlu', 'Szczęsny', 'Ødegaard']
+
+SEARCH_COLUMNS = ['player_id', 'long_name', 'short_name', 'nationality_name',
+                  'club_name', 'player_positions', 'overall', 'player_face_url',
+                  'pace', 'shooting', 'passing', 'dribbling', 'defending',
+                  'physic', 'value_eur', 'preferred_foot', 'age', 'league_name',
+                  'club_contract_valid_until_year', 'goalkeeping_diving', 'goalkeeping_handling',
+                  'goalkeeping_kicking', 'goalkeeping_positioning', 'goalkeeping_reflexes',
+                  'goalkeeping_speed']
+
+
+def make_players(n, seed=0):
+    rng = np.random.default_rng(seed)
+    first = rng.choice(FIRST_NAMES, n)
+    last = rng.choice(LAST_NAMES, n)
+    middle = rng.choice(['', 'dos Santos ', 'Alves ', 'de Jesus ', 'Lopes '], n, p=[0.8, 0.05, 0.05, 0.05, 0.05])
+    df = pd.DataFrame({
+        'player_id': np.arange(n) + 100_000,
+        'long_name': [f'{f} {m}{l}' for f, m, l in zip(first, middle, last)],
+        'short_name': [f'{f[0]}. {l}' for f, l in zip(first, last)],
+    })
+    for col in SEARCH_COLUMNS[3:]:
+        df[col] = rng.integers(1, 99, n)
+    return df.set_index('player_id')
+
+
+def baseline_search(df, name):
+    # the original endpoint body
+    df = df.reset_index()
+    player_details = df[SEARCH_COLUMNS]
+    results = player_details[
+        player_details['long_name'].str.contains(name, case=False, na=False) |
+        player_details['short_name'].str.contains(name, case=False, na=False)
+    ]
+    return results.head(50)
+
+
+def indexed_search(df, index, name):
+    positions = index.search(name, limit=50)
+    return df.iloc[positions][SEARCH_COLUMNS[1:]].reset_index(names='player_id')
+
+
+def paged_search(index, name, page_size, max_rows):
+    # the first max_rows matches, fetched page by page with the last row as cursor
+    rows, after = [], -1
+    while len(rows) < max_rows and len(page := index.search(name, limit=page_size, after=after)):
+        rows.extend(page.tolist())
+        after = rows[-1]
+    return rows
+
+
+def best_ms(fn, *args):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return 1000 * min(timings)
+
+
+def main(sizes):
+    for n in sizes:
+        df = make_players(n)
+
+        start = time.perf_counter()
+        index = NameIndex(df['long_name'], df['short_name'])
+        build_s = time.perf_counter() - start
+        print(f'\n{n:,} players - index built in {build_s:.2f}s '
+              f'({(index._rows.nbytes + index._grams.nbytes + index._offsets.nbytes) / 1e6:.1f} MB postings)')
+        print(f"{'query':<14}{'hits':>6}{'scan ms':>12}{'index ms':>12}{'speedup':>10}")
+
+        for query in EXACT_QUERIES + FOLDED_QUERIES:
+            indexed = indexed_search(df, index, query)
+            if query in EXACT_QUERIES:
+                baseline = baseline_search(df, query)
+                assert indexed['player_id'].tolist() == baseline['player_id'].tolist(), query
+            # pages resume exactly where the previous one ended
+            assert paged_search(index, query, 37, 500)[:500] == index.search(query, limit=500).tolist(), query
+            scan_ms = best_ms(baseline_search, df, query)
+            index_ms = best_ms(indexed_search, df, index, query)
+            print(f'{query:<14}{len(indexed):>6}{scan_ms:>12.2f}{index_ms:>12.3f}{scan_ms / index_ms:>9.0f}x')
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or SIZES)
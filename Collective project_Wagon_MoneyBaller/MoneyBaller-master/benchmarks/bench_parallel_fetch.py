@@ -0,0 +1,54 @@
+# Time to fetch the faces of a 50-card result grid: one after the other vs fetch_all
+#
+# run from the project root:  python -m benchmarks.bench_parallel_fetch [delay_ms] [jitter_ms]
+# faces come from the local stub server (benchmarks/face_stub_server.py), each
+# answer taking delay_ms plus up to jitter_ms; every run starts from an empty
+# image cache. The concurrent grid should take about its slowest single fetch.
+import sys
+import tempfile
+import time
+from benchmarks.face_stub_server import start_stub_server
+from moneyballer.image_cache import FaceImageCache
+from moneyballer.parallel_fetch import fetch_all
+
+N_FACES = 50
+DELAY_MS = 30
+JITTER_MS = 40
+
+
+def timed(fn, url):
+    # (data uri, seconds) of one fetch
+    def call():
+        start = time.perf_counter()
+        data_uri = fn(url)
+        return data_uri, time.perf_counter() - start
+    return call
+
+
+def main(delay_ms, jitter_ms):
+    server, base_url = start_stub_server(delay_ms=delay_ms, jitter_ms=jitter_ms)
+    urls = [f"{base_url}/faces/{player_id}.png" for player_id in range(N_FACES)]
+
+    cache = FaceImageCache(tempfile.mkdtemp(prefix="moneyballer_faces_"))
+    start = time.perf_counter()
+    sequential = [timed(cache.data_uri, url)() for url in urls]
+    sequential_ms = 1000 * (time.perf_counter() - start)
+
+    cache = FaceImageCache(tempfile.mkdtemp(prefix="moneyballer_faces_"))
+    start = time.perf_counter()
+    concurrent = fetch_all([timed(cache.data_uri, url) for url in urls])
+    concurrent_ms = 1000 * (time.perf_counter() - start)
+    server.shutdown()
+
+    assert [uri for uri, _ in sequential] == [uri for uri, _ in concurrent]
+    sum_ms = 1000 * sum(seconds for _, seconds in sequential)
+    slowest_ms = 1000 * max(seconds for _, seconds in concurrent)
+
+    print(f"{N_FACES} faces, {delay_ms} ms + up to {jitter_ms} ms per request to the stub CDN")
+    print(f"one after the other   {sequential_ms:>8.1f} ms  (sum of fetches {sum_ms:.1f} ms)")
+    print(f"fetch_all             {concurrent_ms:>8.1f} ms  (slowest fetch {slowest_ms:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else DELAY_MS,
+         float(sys.argv[2]) if len(sys.argv) > 2 else JITTER_MS)
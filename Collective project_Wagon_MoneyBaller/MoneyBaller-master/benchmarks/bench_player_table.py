@@ -0,0 +1,89 @@
+# Load time and memory of the api player table: full FC26 csv vs the pruned Feather cache
+#
+# run from the project root:  python -m benchmarks.bench_player_table [n_players]
+# uses raw_data/FC26_20250921.csv when present, otherwise a synthetic csv of the same width
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from moneyballer.player_table import API_COLUMNS, build_player_table
+
+N_PLAYERS = 20_000
+
+# each measurement runs in a fresh interpreter so RSS is not shared between them
+LOADERS = {
+    'csv (all columns)': "df = pd.read_csv(CSV, low_memory=False).set_index('player_id')",
+    'feather cache': "from moneyballer.player_table import load_player_table\n"
+                     "df = load_player_table(TABLE, CSV)",
+}
+
+MEASURE = """
+import json, time, psutil, pandas as pd
+CSV, TABLE = {csv!r}, {table!r}
+process = psutil.Process()
+rss_before = process.memory_info().rss
+start = time.perf_counter()
+{loader}
+load_s = time.perf_counter() - start
+print(json.dumps({{
+    'load_s': load_s,
+    'rss_mb': (process.memory_info().rss - rss_before) / 1e6,
+    'frame_mb': df.memory_usage(deep=True).sum() / 1e6,
+    'columns': df.shape[1],
+}}))
+"""
+
+
+def synthetic_csv(path, n, seed=0):
+    # FC26 is about 110 columns wide: the api columns plus stats, urls, dates and tags
+    rng = np.random.default_rng(seed)
+    data = {}
+    for column in API_COLUMNS:
+        data[column] = rng.integers(1, 99, n)
+    data['player_id'] = np.arange(n) + 100_000
+    data['value_eur'] = rng.lognormal(14, 1.5, n).round(-3)
+    data['age'] = rng.integers(16, 41, n)
+    data['club_contract_valid_until_year'] = rng.integers(2025, 2031, n)
+    for column in ['long_name', 'short_name', 'player_face_url']:
+        data[column] = [f'{column}_{i}' for i in range(n)]
+    data['nationality_name'] = rng.choice([f'nation_{i}' for i in range(160)], n)
+    data['club_name'] = rng.choice([f'club_{i}' for i in range(700)], n)
+    data['league_name'] = rng.choice([f'league_{i}' for i in range(50)], n)
+    data['player_positions'] = rng.choice(['ST', 'CF, ST', 'LW, LM', 'CM, CDM', 'CB', 'LB, LWB', 'GK'], n)
+    data['preferred_foot'] = rng.choice(['Left', 'Right'], n)
+    for i in range(60):
+        data[f'stat_{i}'] = rng.integers(1, 99, n)
+    for i in range(25):
+        data[f'text_{i}'] = [f'text_{i}_{j % 997}' for j in range(n)]
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def measure(csv_path, table_path, loader):
+    code = MEASURE.format(csv=csv_path, table=table_path, loader=loader)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(n):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = "raw_data/FC26_20250921.csv"
+        if not os.path.exists(csv_path):
+            csv_path = os.path.join(tmp, 'players.csv')
+            synthetic_csv(csv_path, n)
+        table_path = os.path.join(tmp, 'players.feather')
+        build_player_table(csv_path, table_path)
+
+        print(f"{csv_path}: {os.path.getsize(csv_path) / 1e6:.1f} MB csv, "
+              f"{os.path.getsize(table_path) / 1e6:.1f} MB feather")
+        print(f"{'loader':<20}{'columns':>8}{'load s':>10}{'frame MB':>10}{'RSS MB':>10}")
+        for name, loader in LOADERS.items():
+            result = measure(csv_path, table_path, loader)
+            print(f"{name:<20}{result['columns']:>8}{result['load_s']:>10.3f}"
+                  f"{result['frame_mb']:>10.1f}{result['rss_mb']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_PLAYERS)
@@ -0,0 +1,71 @@
+# Load test of request coalescing: bursts of identical concurrent requests
+#
+# run from the project root (needs the api data and models):
+#   python -m benchmarks.bench_single_flight [n_concurrent]
+# every burst sends n_concurrent identical find_similar_players, get_player_id
+# and outfield_valuation requests for one trending player; the result cache is
+# disabled so only coalescing can save work. Each configuration runs in its own
+# interpreter and reports the CPU time the process spent.
+import json
+import os
+import subprocess
+import sys
+
+N_CONCURRENT = 32
+N_BURSTS = 40
+
+LOAD = """
+import asyncio, json, time
+import httpx
+from api.fast import app
+
+N_CONCURRENT, N_BURSTS = {n_concurrent}, {n_bursts}
+player_ids = app.state.X_index[:N_BURSTS].tolist()
+names = app.state.df.loc[player_ids, 'short_name'].tolist()
+
+async def main():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for burst, (player_id, name) in enumerate(zip(player_ids, names)):
+            valuation = dict(age=20 + burst % 15, pace=80, shooting=70, passing=70, dribbling=75,
+                             defending=40, physic=65, skill_moves=3, weak_foot=3)
+            requests = [client.get("/find_similar_players", params={{"player_id": player_id, "k": 100}})
+                        for _ in range(N_CONCURRENT)]
+            requests += [client.get("/get_player_id", params={{"name": name}}) for _ in range(N_CONCURRENT)]
+            requests += [client.get("/outfield_valuation", params=valuation) for _ in range(N_CONCURRENT)]
+            responses = await asyncio.gather(*requests)
+            assert all(response.status_code == 200 for response in responses)
+            # every copy of a request got the same body
+            for i in range(0, len(responses), N_CONCURRENT):
+                assert len({{r.content for r in responses[i:i + N_CONCURRENT]}}) == 1
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+        stats = (await client.get("/single_flight")).json()
+
+    executions = sum(endpoint['executions'] for endpoint in stats.values())
+    print(json.dumps({{'cpu_s': cpu, 'wall_s': wall, 'requests': 3 * N_CONCURRENT * N_BURSTS,
+                      'executions': executions or 3 * N_CONCURRENT * N_BURSTS}}))
+
+asyncio.run(main())
+"""
+
+
+def run(single_flight, n_concurrent):
+    env = dict(os.environ, RESULT_CACHE="0", SINGLE_FLIGHT="1" if single_flight else "0")
+    code = LOAD.format(n_concurrent=n_concurrent, n_bursts=N_BURSTS)
+    output = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main(n_concurrent):
+    print(f"{N_BURSTS} bursts of {n_concurrent} identical requests x 3 endpoints")
+    print(f"{'single flight':<15}{'requests':>10}{'computed':>10}{'CPU s':>8}{'wall s':>8}{'req/s':>8}")
+    for single_flight in [False, True]:
+        result = run(single_flight, n_concurrent)
+        print(f"{'on' if single_flight else 'off':<15}{result['requests']:>10}{result['executions']:>10}"
+              f"{result['cpu_s']:>8.2f}{result['wall_s']:>8.2f}{result['requests'] / result['wall_s']:>8.0f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_CONCURRENT)
@@ -0,0 +1,109 @@
+# Memory of uvicorn workers, each loading its own data vs the shared (memory-mapped) data
+#
+# run from the project root:
+#   python -m benchmarks.bench_workers [--players 100000] [--workers 1 4 8]
+# starts uvicorn with 1, 4 and 8 workers on an offline workspace
+# (benchmarks/workspace.py), with SHARED_DATA=0 and SHARED_DATA=1, sends some
+# requests to every worker, then reads the memory of each worker process:
+#   RSS  resident pages, counting pages shared with other processes in full
+#   USS  pages private to the worker (freed if it exits)
+#   PSS  private pages + each shared page divided by the number of processes
+#        mapping it; the sum over the workers is the memory they really use
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import httpx
+import numpy as np
+import pandas as pd
+import psutil
+from benchmarks.workspace import PLAYERS_CSV, PROJECT_ROOT, ensure_workspace
+
+MB = 2 ** 20
+
+
+def worker_processes(server, n_workers):
+    # uvicorn runs a single worker in its own process, several as spawned children
+    if n_workers == 1:
+        return [psutil.Process(server.pid)]
+    return [child for child in psutil.Process(server.pid).children()
+            if 'multiprocessing.spawn' in ' '.join(child.cmdline()) or 'spawn_main' in ' '.join(child.cmdline())]
+
+
+def measure(workspace, n_workers, shared, player_ids, names, port, timeout=600):
+    env = dict(os.environ, SHARED_DATA="1" if shared else "0",
+               PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')])))
+    server = subprocess.Popen([sys.executable, '-W', 'ignore', '-m', 'uvicorn', 'api.fast:app', '--port', str(port),
+                               '--workers', str(n_workers), '--log-level', 'warning'],
+                              cwd=workspace, env=env, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        # a new connection per request lands on any worker: ready once
+        # 8 requests per worker in a row found a loaded worker
+        deadline = time.monotonic() + timeout
+        streak = 0
+        while streak < 8 * n_workers:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"uvicorn not ready after {timeout} s")
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                ready = httpx.get(f"{url}/ready", timeout=1).status_code == 200
+            except httpx.HTTPError:
+                ready = False
+            streak = streak + 1 if ready else 0
+            if not ready:
+                time.sleep(0.5)
+
+        # some traffic on every worker, so the pages the requests touch are resident
+        for i in range(50 * n_workers):
+            httpx.get(f"{url}/find_similar_players", params={'player_id': int(player_ids[i % len(player_ids)])})
+            httpx.get(f"{url}/get_player_id", params={'name': names[i % len(names)]})
+        workers = worker_processes(server, n_workers)
+        memory = [worker.memory_full_info() for worker in workers]
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        'workers': n_workers,
+        'shared_data': shared,
+        'rss_mb_per_worker': round(float(np.mean([m.rss for m in memory])) / MB, 1),
+        'uss_mb_per_worker': round(float(np.mean([m.uss for m in memory])) / MB, 1),
+        'pss_mb_per_worker': round(float(np.mean([m.pss for m in memory])) / MB, 1),
+        'pss_mb_total': round(sum(m.pss for m in memory) / MB, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per uvicorn worker with and without shared data")
+    parser.add_argument('--players', type=int, default=100_000)
+    parser.add_argument('--workspace')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--output', help="JSON results path")
+    args = parser.parse_args()
+
+    workspace = ensure_workspace(args.workspace, args.players)
+    players = pd.read_csv(os.path.join(workspace, PLAYERS_CSV), usecols=['player_id', 'short_name'], nrows=1000)
+    player_ids, names = players['player_id'].to_numpy(), players['short_name'].tolist()
+
+    print(f"{args.players} players")
+    print(f"{'workers':>8}{'shared':>8}{'RSS MB':>10}{'USS MB':>10}{'PSS MB':>10}{'total PSS MB':>14}")
+    results = []
+    for n_workers in args.workers:
+        for shared in [False, True]:
+            result = measure(workspace, n_workers, shared, player_ids, names, args.port)
+            results.append(result)
+            print(f"{n_workers:>8}{'yes' if shared else 'no':>8}{result['rss_mb_per_worker']:>10.0f}"
+                  f"{result['uss_mb_per_worker']:>10.0f}{result['pss_mb_per_worker']:>10.0f}{result['pss_mb_total']:>14.0f}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'players': args.players, 'results': results}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
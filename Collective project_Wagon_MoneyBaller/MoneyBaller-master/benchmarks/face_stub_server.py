@@ -0,0 +1,88 @@
+# Local stand-in for the player face CDN, for tests and benchmarks without the network
+#
+# run from the project root:  python -m benchmarks.face_stub_server [port] [delay_ms] [jitter_ms]
+# serves a small PNG per path (/faces/<anything>.png, same path -> same image)
+# with ETag and Last-Modified, answers If-None-Match with 304, and waits
+# delay_ms (plus up to jitter_ms) before each answer to mimic the CDN's
+# latency. /missing/... is a 404.
+import hashlib
+import random
+import struct
+import sys
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STARTED = formatdate(time.time(), usegmt=True)
+
+
+def png(seed, size=120):
+    # solid-colour RGB PNG, the colour taken from the seed
+    r, g, b = hashlib.sha1(seed.encode()).digest()[:3]
+    raw = b''.join(b'\x00' + bytes([r, g, b]) * size for _ in range(size))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b'')
+
+
+class FaceHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    jitter = 0.0
+    requests = 0
+
+    def do_GET(self):
+        FaceHandler.requests += 1
+        time.sleep(self.delay + random.uniform(0, self.jitter))
+        if self.path.startswith('/missing/'):
+            self.send_error(404)
+            return
+
+        content = png(self.path)
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', STARTED)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    # the default backlog of 5 drops the connections of a concurrent grid (1 s SYN retries)
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_stub_server(port=0, delay_ms=0, jitter_ms=0):
+    # (server, base url), serving from a daemon thread; server.shutdown() stops it
+    handler = type('Handler', (FaceHandler,), {'delay': delay_ms / 1000, 'jitter': jitter_ms / 1000})
+    server = StubServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    delay_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    jitter_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 0
+    server, url = start_stub_server(port, delay_ms, jitter_ms)
+    print(f"face stub server on {url}/faces/<id>.png")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
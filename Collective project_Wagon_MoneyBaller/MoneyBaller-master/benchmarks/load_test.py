@@ -0,0 +1,244 @@
+# Load test of the api endpoints against a synthetic FC26 dataset
+#
+# run from the project root:
+#   python -m benchmarks.load_test --players 5000 --concurrency 32 --requests 2000 --output report.json
+# builds (or reuses) an offline workspace with generated players and trained
+# models (benchmarks/workspace.py) and drives every endpoint in turn with
+# --concurrency concurrent clients: in-process through httpx (default), a
+# local uvicorn started in the workspace (--uvicorn), or a running server (--url).
+# Writes one JSON report with throughput and latency percentiles per endpoint;
+# --baseline old_report.json prints the change against an earlier run.
+#
+# In-process, the clients share the event loop with the api, so latencies
+# include the client's own overhead; compare reports run the same way.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+import httpx
+import numpy as np
+import pandas as pd
+from benchmarks.workspace import PLAYERS_CSV, PROJECT_ROOT, ensure_workspace
+
+ENDPOINTS = ['get_player_id', 'find_similar_players', 'outfield_valuation',
+             'goalkeeper_valuation', 'outfield_position_predictor']
+# settings of the api that change the numbers, recorded in the report
+API_SETTINGS = ['SIMILARITY_INDEX', 'IVF_N_PROBE', 'MICRO_BATCHING', 'RESULT_CACHE', 'SINGLE_FLIGHT', 'PROFILING']
+
+
+def outfield_params(rng):
+    return {
+        'age': int(rng.integers(17, 38)),
+        **{attribute: int(rng.integers(35, 95))
+           for attribute in ['pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic']},
+        'skill_moves': int(rng.integers(1, 6)),
+        'weak_foot': int(rng.integers(1, 6)),
+    }
+
+
+def goalkeeper_params(rng):
+    params = {attribute: int(rng.integers(40, 92)) for attribute in [
+        'goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking', 'goalkeeping_positioning',
+        'goalkeeping_reflexes', 'goalkeeping_speed', 'mentality_penalties', 'mentality_composure']}
+    params['age'] = int(rng.integers(17, 40))
+    return params
+
+
+def request_params(endpoint, players, rng, n):
+    # n query parameter dicts for an endpoint, drawn from the workspace players
+    if endpoint == 'get_player_id':
+        return [{'name': name} for name in rng.choice(players['short_name'].to_numpy(), n)]
+    if endpoint == 'find_similar_players':
+        return [{'player_id': int(player_id), 'k': 10} for player_id in rng.choice(players['player_id'].to_numpy(), n)]
+    if endpoint == 'goalkeeper_valuation':
+        return [goalkeeper_params(rng) for _ in range(n)]
+    return [outfield_params(rng) for _ in range(n)]
+
+
+async def run_endpoint(client, endpoint, params, concurrency):
+    # concurrency workers sending the requests in params as fast as they complete
+    latencies = np.zeros(len(params))
+    statuses = Counter()
+    pending = iter(range(len(params)))
+
+    async def worker():
+        for i in pending:
+            start = time.perf_counter()
+            try:
+                status = (await client.get(f"/{endpoint}", params=params[i])).status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies[i] = time.perf_counter() - start
+            statuses[str(status)] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies *= 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'requests': len(params),
+        'errors': len(params) - statuses.get('200', 0),
+        'statuses': dict(statuses),
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(len(params) / elapsed, 1),
+        'latency_ms': {
+            'mean': round(float(latencies.mean()), 3),
+            'p50': round(float(p50), 3),
+            'p95': round(float(p95), 3),
+            'p99': round(float(p99), 3),
+            'max': round(float(latencies.max()), 3),
+        },
+    }
+
+
+async def run_load(client, players, args):
+    rng = np.random.default_rng(args.seed)
+    results = {}
+    for endpoint in args.endpoints:
+        # warmup: lazy model loading, caches of the parsing and encoding paths
+        await run_endpoint(client, endpoint, request_params(endpoint, players, rng, args.warmup), args.concurrency)
+        params = request_params(endpoint, players, rng, args.distinct or args.requests)
+        params = [params[i % len(params)] for i in range(args.requests)]
+        results[endpoint] = await run_endpoint(client, endpoint, params, args.concurrency)
+        print(f"{endpoint:<30}{results[endpoint]['throughput_rps']:>10.0f} req/s"
+              f"{results[endpoint]['latency_ms']['p50']:>10.2f}{results[endpoint]['latency_ms']['p99']:>10.2f} ms p50/p99",
+              file=sys.stderr)
+    return results
+
+
+async def load_in_process(workspace, players, args):
+    # the api resolves its data and model paths relative to the working directory
+    os.chdir(workspace)
+    from api.fast import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            return await run_load(client, players, args)
+
+
+async def load_over_http(url, players, args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        return await run_load(client, players, args)
+
+
+def start_uvicorn(workspace, port, workers):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')])))
+    server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'api.fast:app', '--port', str(port),
+                               '--workers', str(workers), '--log-level', 'warning'],
+                              cwd=workspace, env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/ready", timeout=1).status_code == 200:
+                return server, url
+        except httpx.HTTPError:
+            pass
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("uvicorn did not become ready within 120 s")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(report, baseline):
+    print(f"{'endpoint':<30}{'req/s':>18}{'p50 ms':>18}{'p99 ms':>18}")
+    for endpoint, result in report['endpoints'].items():
+        old = baseline['endpoints'].get(endpoint)
+        if old is None:
+            continue
+        columns = [(old['throughput_rps'], result['throughput_rps'])]
+        columns += [(old['latency_ms'][p], result['latency_ms'][p]) for p in ['p50', 'p99']]
+        print(f"{endpoint:<30}" + ''.join(f"{f'{a:.1f} -> {b:.1f}':>18}" for a, b in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the api endpoints on synthetic players")
+    parser.add_argument('--players', type=int, default=5000, help="players in the generated dataset")
+    parser.add_argument('--workspace', help="workspace directory (default: one per size in the temp directory)")
+    parser.add_argument('--rebuild', action='store_true', help="regenerate the workspace even if it exists")
+    parser.add_argument('--endpoints', nargs='+', default=ENDPOINTS, choices=ENDPOINTS)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000, help="measured requests per endpoint")
+    parser.add_argument('--warmup', type=int, default=100, help="unmeasured requests per endpoint first")
+    parser.add_argument('--distinct', type=int, default=0,
+                        help="cycle this many distinct inputs (0: a new random input per request)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help="load an already running server instead (request inputs come from "
+                                      "--workspace, e.g. the project root for the real data)")
+    parser.add_argument('--uvicorn', action='store_true', help="start uvicorn in the workspace and load it over HTTP")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=1, help="uvicorn workers with --uvicorn")
+    parser.add_argument('--output', help="report path (default: stdout)")
+    parser.add_argument('--baseline', help="earlier report to compare with")
+    args = parser.parse_args()
+    # the in-process api changes the working directory
+    output, baseline = [os.path.abspath(path) if path else None for path in [args.output, args.baseline]]
+
+    if args.url and args.workspace:
+        workspace = args.workspace
+    else:
+        workspace = ensure_workspace(args.workspace, args.players, rebuild=args.rebuild)
+    players = pd.read_csv(os.path.join(workspace, PLAYERS_CSV), usecols=['player_id', 'short_name'])
+
+    server = None
+    if args.url:
+        target = args.url
+        results = asyncio.run(load_over_http(args.url, players, args))
+    elif args.uvicorn:
+        server, target = start_uvicorn(workspace, args.port, args.workers)
+        try:
+            results = asyncio.run(load_over_http(target, players, args))
+        finally:
+            server.terminate()
+            server.wait()
+        target = f"uvicorn ({args.workers} workers)"
+    else:
+        target = "in-process"
+        results = asyncio.run(load_in_process(workspace, players, args))
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'machine': f"{platform.machine()} ({os.cpu_count()} cpus)",
+        'target': target,
+        'players': len(players),
+        'concurrency': args.concurrency,
+        'requests': args.requests,
+        'distinct': args.distinct,
+        'settings': {name: os.environ[name] for name in API_SETTINGS if name in os.environ},
+        'endpoints': results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    if baseline:
+        with open(baseline) as file:
+            print_comparison(report, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# Offline workspace for benchmarks: synthetic FC26 players and everything the api loads
+#
+# run from the project root:  python -m benchmarks.workspace [directory] [n_players]
+# writes raw_data/FC26_20250921.csv with players from moneyballer/synthetic_data.py
+# into the directory, then runs the project's own build scripts there (projection
+# + knn, player table, the valuation and position models with their exports),
+# so the api starts with that directory as working directory without the real data.
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from moneyballer.synthetic_data import write_players
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLAYERS_CSV = "raw_data/FC26_20250921.csv"
+MANIFEST = "workspace.json"
+
+# build scripts, in order (knn_model runs the preprocessor first); the outfield
+# random forest of Field_prep_model_pipe is not served by the api and is skipped
+BUILD_MODULES = [
+    'moneyballer.knn_model',
+    'moneyballer.player_table',
+    'moneyballer.gk_valuation_model',
+    'moneyballer.DeepL_Valuation_Fieldplayer',
+    'moneyballer.outfield_position_predictor',
+]
+
+
+def build_workspace(directory, n_players, seed=0):
+    # generate the players and run the build scripts with the directory as working directory
+    start = time.perf_counter()
+    for sub in ['raw_data', 'models']:
+        os.makedirs(os.path.join(directory, sub), exist_ok=True)
+    write_players(os.path.join(directory, PLAYERS_CSV), n_players, seed=seed)
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')])))
+    for module in BUILD_MODULES:
+        print(f"[workspace] {module}", file=sys.stderr)
+        subprocess.run([sys.executable, '-W', 'ignore', '-m', module], cwd=directory, env=env,
+                       check=True, stdout=subprocess.DEVNULL)
+
+    manifest = {'n_players': n_players, 'seed': seed, 'build_seconds': round(time.perf_counter() - start, 1)}
+    with open(os.path.join(directory, MANIFEST), 'w') as file:
+        json.dump(manifest, file)
+    return manifest
+
+
+def ensure_workspace(directory=None, n_players=5000, seed=0, rebuild=False):
+    # reuse a workspace built earlier with the same size and seed
+    directory = directory or os.path.join(tempfile.gettempdir(), f"moneyballer_bench_{n_players}_{seed}")
+    manifest_path = os.path.join(directory, MANIFEST)
+    if not rebuild and os.path.exists(manifest_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        if manifest.get('n_players') == n_players and manifest.get('seed') == seed:
+            return directory
+    build_workspace(directory, n_players, seed)
+    return directory
+
+
+if __name__ == '__main__':
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    n_players = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    print(ensure_workspace(directory, n_players, rebuild=True))
@@ -13,6 +13,7 @@ from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.neural_network import MLPRegressor
 from sklearn.compose import TransformedTargetRegressor
+from moneyballer.mlp_export import export_mlp_pipeline
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 
@@ -93,3 +94,6 @@ with open("models/DeepL_valuation_model.pkl", "wb") as file:
 #pred_value_log = loaded_model.predict(example)
 #y_pred_eur = np.exp(pred_value_log)
 #print("Predicted player value (EUR):", y_pred_eur[0])
+
+# Export the fitted parameters for the api's NumPy forward pass (see mlp_export.py)
+export_mlp_pipeline(pipe)
@@ -6,6 +6,7 @@ from sklearn.decomposition import PCA
 from sklearn.preprocessing import FunctionTransformer
 import pickle
 from sklearn.ensemble import RandomForestRegressor
+from moneyballer.forest_export import OUTFIELD_FOREST_PATH, export_forest_pipeline
 
 
 # load data (file path readable by the api app)
@@ -59,6 +60,9 @@ Pipe.fit(X, y)
 with open("models/player_value_model.pkl", "wb") as file:
     pickle.dump(Pipe, file)
 
+# Flat node arrays of the forest for the array traversal (see forest_export.py)
+export_forest_pipeline(Pipe, OUTFIELD_FOREST_PATH)
+
 # Load the saved pipeline
 #with open("player_value_model.pkl", "rb") as file:
     #loaded_model = pickle.load(file)
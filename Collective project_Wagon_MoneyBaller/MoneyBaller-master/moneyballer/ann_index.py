@@ -0,0 +1,122 @@
+import numpy as np
+from moneyballer.neighbor_table import normalize_rows
+
+# Cosine similarity indexes over X_proj.
+#
+# Both indexes take unit-norm rows (see normalize_rows) and answer
+# query(x, k, exclude, keep_fn) with (row positions, similarities) sorted by
+# decreasing similarity. `exclude` is a row never returned (the player itself),
+# `keep_fn(rows) -> bool mask` restricts the search to rows passing the filters.
+#
+#   ExactCosineIndex   brute force, one matrix-vector product over every row
+#   IVFCosineIndex     rows grouped in k-means cells, a query only scores the
+#                      rows of the n_probe cells closest to it
+
+
+def _top_k(rows, sims, k):
+    if len(rows) > k:
+        top = np.argpartition(-sims, k - 1)[:k]
+        rows, sims = rows[top], sims[top]
+    order = np.argsort(-sims, kind='stable')
+    return rows[order], sims[order].astype(np.float64)
+
+
+class ExactCosineIndex:
+
+    def __init__(self, X_unit):
+        self.X = X_unit
+
+    def query(self, x, k, exclude=None, keep_fn=None):
+        if keep_fn is None:
+            rows = np.arange(len(self.X))
+            sims = self.X @ x
+        else:
+            rows = np.flatnonzero(keep_fn(np.arange(len(self.X))))
+            sims = self.X[rows] @ x
+
+        if exclude is not None:
+            keep = rows != exclude
+            rows, sims = rows[keep], sims[keep]
+
+        return _top_k(rows, sims, k)
+
+
+class IVFCosineIndex:
+
+    def __init__(self, X_unit, n_cells=None, n_probe=16, n_iter=10, sample_size=100_000, seed=42):
+        n_rows = len(X_unit)
+        if n_rows == 0:
+            raise ValueError("IVFCosineIndex needs at least one row, use the exact index for empty embeddings")
+        # about sqrt(n) cells keeps cell scans and centroid scoring balanced, never more cells than rows
+        self.n_cells = int(min(n_cells or max(1, round(4 * np.sqrt(n_rows))), n_rows))
+        self.n_probe = n_probe
+
+        rng = np.random.default_rng(seed)
+        self.centroids = self._train(X_unit, n_iter, sample_size, rng)
+
+        # rows stored cell by cell, so a cell is one contiguous block
+        cells = self._assign(X_unit)
+        order = np.argsort(cells, kind='stable')
+        self.row_ids = order.astype(np.int64)
+        self.X = np.ascontiguousarray(X_unit[order])
+        self.offsets = np.zeros(self.n_cells + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.n_cells), out=self.offsets[1:])
+
+    def _assign(self, X, block_size=65_536):
+        cells = np.empty(len(X), dtype=np.int64)
+        for start in range(0, len(X), block_size):
+            cells[start:start + block_size] = np.argmax(X[start:start + block_size] @ self.centroids.T, axis=1)
+        return cells
+
+    def _train(self, X, n_iter, sample_size, rng):
+        # spherical k-means on a sample of the rows
+        sample = X[rng.choice(len(X), min(len(X), max(sample_size, self.n_cells)), replace=False)]
+        self.centroids = sample[rng.choice(len(sample), self.n_cells, replace=False)].copy()
+
+        for _ in range(n_iter):
+            cells = self._assign(sample)
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, cells, sample)
+            counts = np.bincount(cells, minlength=self.n_cells)
+
+            # empty cells restart from a random sample row
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            self.centroids = normalize_rows(sums)
+
+        return self.centroids
+
+    def query(self, x, k, exclude=None, keep_fn=None):
+        cell_sims = self.centroids @ x
+        cells_by_sim = np.argsort(-cell_sims)
+
+        # probe the closest cells, widening the probe when filters or
+        # small cells leave fewer than k candidates
+        n_probe = min(self.n_probe, self.n_cells)
+        while True:
+            probed = cells_by_sim[:n_probe]
+            idx = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probed])
+            rows = self.row_ids[idx]
+
+            keep = np.ones(len(rows), dtype=bool) if keep_fn is None else keep_fn(rows)
+            if exclude is not None:
+                keep &= rows != exclude
+
+            if keep.sum() >= k or n_probe >= self.n_cells:
+                break
+            n_probe = min(2 * n_probe, self.n_cells)
+
+        idx, rows = idx[keep], rows[keep]
+        return _top_k(rows, self.X[idx] @ x, k)
+
+
+SIMILARITY_INDEXES = {
+    'exact': ExactCosineIndex,
+    'ivf': IVFCosineIndex,
+}
+
+
+def build_similarity_index(kind, X_unit, **params):
+    if kind not in SIMILARITY_INDEXES:
+        raise ValueError(f"Unknown similarity index '{kind}', expected one of {sorted(SIMILARITY_INDEXES)}")
+    return SIMILARITY_INDEXES[kind](X_unit, **params)
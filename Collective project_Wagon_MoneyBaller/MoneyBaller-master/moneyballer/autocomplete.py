@@ -0,0 +1,100 @@
+import bisect
+import re
+import numpy as np
+from moneyballer.name_index import normalize_name
+
+# Prefix index for the search box autocomplete.
+#
+# Every word of a player's folded long and short name starts a key running
+# to the end of that name ('kylian mbappe lottin', 'mbappe lottin', 'lottin',
+# 'k. mbappe', 'mbappe'), so 'mbap' and 'kylian mb' both find the player. The keys
+# are sorted in one UTF-8 byte string with their offsets: the keys starting
+# with a query form a contiguous range, found with two binary searches.
+# Each key carries the rank of its player by overall (best first), so the
+# answer is the smallest distinct ranks of the range. Ranges too large to
+# rank on every call (one or two letters) are ranked once and memoized.
+# arrays() / from_arrays() let worker processes share one memory-mapped
+# copy (see shared_data.py).
+
+# longer keys are cut, queries are compared on their first MAX_KEY_BYTES bytes
+MAX_KEY_BYTES = 32
+MAX_LIMIT = 50
+# prefix ranges with more keys than this get their top players memoized
+MEMO_MIN_KEYS = 2048
+WORD_START = re.compile(r"[^\s\-'.]+")
+
+
+def prefix_keys(name):
+    # the name from each of its words to the end, folded
+    text = ' '.join(normalize_name(name).split())
+    return {text[m.start():].encode()[:MAX_KEY_BYTES] for m in WORD_START.finditer(text)}
+
+
+class _Keys:
+    # sorted keys as a sequence of bytes for bisect, without one object per key
+
+    def __init__(self, text, starts):
+        self.text, self.starts = text, starts
+
+    def __len__(self):
+        return len(self.starts) - 1
+
+    def __getitem__(self, i):
+        return self.text[self.starts[i]:self.starts[i + 1]]
+
+
+class PrefixIndex:
+
+    def __init__(self, long_names, short_names, overall):
+        # player positions by overall, best first (data order among equals)
+        order = np.argsort(-np.asarray(overall, dtype=np.float64), kind='stable')
+        rank_of_row = np.empty(len(order), dtype=np.int32)
+        rank_of_row[order] = np.arange(len(order), dtype=np.int32)
+
+        # (key, rank) of every word start, sorted by key
+        entries = sorted((key, rank)
+                         for long_name, short_name, rank in zip(long_names, short_names, rank_of_row.tolist())
+                         for key in prefix_keys(long_name) | prefix_keys(short_name))
+
+        lengths = np.fromiter((len(key) for key, _ in entries), dtype=np.int64, count=len(entries))
+        starts = np.zeros(len(entries) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=starts[1:])
+        ranks = np.fromiter((rank for _, rank in entries), dtype=np.int32, count=len(entries))
+        self._init(b''.join(key for key, _ in entries),
+                   {'starts': starts, 'ranks': ranks, 'order': order.astype(np.int64)})
+
+    def _init(self, text, arrays):
+        self._keys = _Keys(text, arrays['starts'])
+        self._ranks, self._order = arrays['ranks'], arrays['order']
+        self._memo = {}
+
+    def arrays(self):
+        # (text, {name: array}) holding the whole index
+        return self._keys.text, {'starts': self._keys.starts, 'ranks': self._ranks, 'order': self._order}
+
+    @classmethod
+    def from_arrays(cls, text, arrays):
+        # text: bytes or any buffer that slices to bytes (e.g. an mmap), arrays as returned by arrays()
+        index = cls.__new__(cls)
+        index._init(text, arrays)
+        return index
+
+    def _top_ranks(self, lo, hi):
+        # distinct ranks of the keys in [lo, hi), best first, at most MAX_LIMIT
+        if hi - lo <= MEMO_MIN_KEYS:
+            return np.unique(self._ranks[lo:hi])[:MAX_LIMIT]
+        top = self._memo.get((lo, hi))
+        if top is None:
+            top = self._memo[(lo, hi)] = np.unique(self._ranks[lo:hi])[:MAX_LIMIT]
+        return top
+
+    def complete(self, prefix, limit=10):
+        # row positions of the best players (by overall) with a name word starting with `prefix`
+        query = ' '.join(normalize_name(prefix).split()).encode()[:MAX_KEY_BYTES]
+        if not query:
+            return np.empty(0, dtype=np.int64)
+
+        # b'\xff' never appears in UTF-8, every key starting with the query sorts before query + b'\xff'
+        lo = bisect.bisect_left(self._keys, query)
+        hi = bisect.bisect_left(self._keys, query + b'\xff', lo)
+        return self._order[self._top_ranks(lo, hi)[:min(limit, MAX_LIMIT)]]
@@ -0,0 +1,54 @@
+import argparse
+import pandas as pd
+from moneyballer.client import DEFAULT_BASE_URL, MoneyBallerClient
+from moneyballer.model_features import GOALKEEPER_VALUATION_FEATURES, OUTFIELD_VALUATION_FEATURES
+
+# Values a players csv (FC26 columns) through the api's batch endpoints.
+#
+#   python -m moneyballer.batch_valuation players.csv valued.csv [--api URL] [--chunk 1000]
+# goalkeepers (first position GK) go to /goalkeeper_valuation/batch, the
+# others to /outfield_valuation/batch, `chunk` players per call over one
+# pooled connection (moneyballer/client.py); the output is the input with a
+# predicted_value_eur column. The api is MONEYBALLER_API_URL (a local api
+# when unset) unless --api is given.
+
+VALUES_KEY = 'Predicted player values (EUR):'
+
+
+def records(df, columns):
+    # JSON-ready dicts, NaN -> None
+    return df[columns].astype(object).where(df[columns].notna(), None).to_dict(orient='records')
+
+
+def value_players(df, client, chunk=1000):
+    # predicted value per row of df, NaN for goalkeepers missing a required attribute
+    values = pd.Series(float('nan'), index=df.index)
+    is_goalkeeper = df['player_positions'].fillna('').str.split(',').str[0].str.strip() == 'GK'
+    complete_goalkeeper = is_goalkeeper & df[GOALKEEPER_VALUATION_FEATURES].notna().all(axis=1)
+
+    for rows, columns, predict in [(df[~is_goalkeeper], OUTFIELD_VALUATION_FEATURES, client.outfield_valuation_batch),
+                                   (df[complete_goalkeeper], GOALKEEPER_VALUATION_FEATURES, client.goalkeeper_valuation_batch)]:
+        for first in range(0, len(rows), chunk):
+            part = rows.iloc[first:first + chunk]
+            values[part.index] = predict(records(part, columns))[VALUES_KEY]
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Value a players csv through the MoneyBaller api")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--api', default=DEFAULT_BASE_URL,
+                        help="api base url (default: %(default)s)")
+    parser.add_argument('--chunk', type=int, default=1000)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input, low_memory=False)
+    with MoneyBallerClient(args.api) as client:
+        df['predicted_value_eur'] = value_players(df, client, args.chunk)
+    df.to_csv(args.output, index=False)
+    print(f"{df['predicted_value_eur'].notna().sum()} of {len(df)} players valued -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+import httpx
+
+# Python client for the MoneyBaller api, used by the Streamlit app and batch scripts.
+#
+# One httpx client per MoneyBallerClient keeps its connections alive, so
+# calls after the first skip the TCP and TLS handshakes. Connection errors,
+# timeouts and 429/502/503/504 answers are retried with exponential backoff
+# and jitter (honouring Retry-After), never waiting more than
+# max_backoff_seconds between attempts. GET answers are kept in a TTL + LRU
+# cache keyed by endpoint and normalized parameters, so going back to
+# filters already used does not download the similar players again; POST
+# batch calls are never cached. The raw body is cached and parsed on each
+# hit, callers get their own objects.
+#
+# MoneyBallerClient is synchronous, AsyncMoneyBallerClient has the same
+# methods as coroutines; both close with close() / aclose() or as context managers.
+#
+# Without MONEYBALLER_API_URL the client talks to a local api (make run_api),
+# so a script run without options never sends its requests to production.
+DEFAULT_BASE_URL = os.environ.get("MONEYBALLER_API_URL", "http://127.0.0.1:8000")
+RETRY_STATUSES = {429, 502, 503, 504}
+MISSING = object()
+
+
+class MoneyBallerError(Exception):
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def cache_key(method, path, params):
+    # same endpoint and parameters -> same key, whatever their order ("80" and 80 are the same request)
+    normalized = []
+    for name, value in sorted((params or {}).items()):
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(str(v) for v in value))
+        else:
+            value = str(value)
+        normalized.append((name, value))
+    return method, path, tuple(normalized)
+
+
+def _parse(body):
+    return json.loads(body)
+
+
+class ResponseCache:
+    # response bodies by key, at most max_entries, each valid for ttl_seconds
+
+    def __init__(self, max_entries=1024, ttl_seconds=300):
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires at, body)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        # cached body, or MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, body):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class _ClientBase:
+    # configuration, retry policy and the endpoints; subclasses implement _call
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=60, retries=3, backoff_seconds=0.25,
+                 max_backoff_seconds=30, cache_entries=1024, cache_ttl_seconds=300, max_connections=20):
+        self.base_url = base_url.rstrip('/')
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.cache = ResponseCache(cache_entries, cache_ttl_seconds)
+        self._client_options = {
+            'base_url': self.base_url,
+            'timeout': timeout,
+            'limits': httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        }
+
+    def _retry_delay(self, attempt, response=None):
+        # Retry-After when the api sent one, else exponential backoff with full jitter,
+        # at most max_backoff_seconds either way
+        delay = None
+        if response is not None:
+            try:
+                delay = max(float(response.headers['retry-after']), 0)
+            except (KeyError, ValueError):
+                pass
+        if delay is None:
+            delay = random.uniform(0, self.backoff_seconds * 2 ** attempt)
+        return min(delay, self.max_backoff_seconds)
+
+    def _next_attempt(self, method, path, attempt, response=None, error=None):
+        # seconds to wait before retrying, None when the response is final;
+        # raises MoneyBallerError for a request error that is not retried
+        if error is not None:
+            if attempt >= self.retries or not isinstance(error, httpx.TransportError):
+                raise MoneyBallerError(f"{method} {path} failed: {error}") from error
+            return self._retry_delay(attempt)
+        if attempt >= self.retries or response.status_code not in RETRY_STATUSES:
+            return None
+        return self._retry_delay(attempt, response)
+
+    def _prepare(self, method, path, params):
+        # (params without None values, cache key or None, cached answer or MISSING)
+        params = {name: value for name, value in (params or {}).items() if value is not None}
+        key = cache_key(method, path, params) if method == 'GET' else None
+        body = self.cache.get(key) if key is not None else MISSING
+        return params, key, (MISSING if body is MISSING else _parse(body))
+
+    def _finish(self, method, path, key, response):
+        body = self._result(method, path, response)
+        if key is not None:
+            self.cache.put(key, body)
+        return _parse(body)
+
+    def _result(self, method, path, response):
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get('detail', response.text)
+            except ValueError:
+                detail = response.text
+            raise MoneyBallerError(f"{method} {path} failed ({response.status_code}): {detail}", response.status_code)
+        return response.content
+
+    # --- endpoints ---
+
+    def search_players(self, name, limit=50):
+        return self._call('GET', '/get_player_id', params={'name': name, 'limit': limit})
+
+    def autocomplete(self, q, limit=10):
+        return self._call('GET', '/autocomplete', params={'q': q, 'limit': limit})
+
+    def similar_players(self, player_id, k=100, leagues=None, nationalities=None, positions=None, feet=None,
+                        min_value=None, max_value=None, min_age=None, max_age=None):
+        return self._call('GET', '/find_similar_players', params={
+            'player_id': player_id, 'k': k, 'leagues': leagues, 'nationalities': nationalities,
+            'positions': positions, 'feet': feet, 'min_value': min_value, 'max_value': max_value,
+            'min_age': min_age, 'max_age': max_age})
+
+    def filter_options(self):
+        return self._call('GET', '/similar_players_filter_options')
+
+    def outfield_valuation(self, **attributes):
+        return self._call('GET', '/outfield_valuation', params=attributes)
+
+    def goalkeeper_valuation(self, **attributes):
+        return self._call('GET', '/goalkeeper_valuation', params=attributes)
+
+    def position(self, top_k=3, **attributes):
+        return self._call('GET', '/outfield_position_predictor', params=dict(attributes, top_k=top_k))
+
+    def outfield_valuation_batch(self, players):
+        # players: list of dicts of outfield attributes, values in the same order
+        return self._call('POST', '/outfield_valuation/batch', payload=players)
+
+    def goalkeeper_valuation_batch(self, players):
+        return self._call('POST', '/goalkeeper_valuation/batch', payload=players)
+
+
+class MoneyBallerClient(_ClientBase):
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, transport=None, **options):
+        super().__init__(base_url, **options)
+        self._client = httpx.Client(transport=transport, **self._client_options)
+
+    def _call(self, method, path, params=None, payload=None):
+        params, key, cached = self._prepare(method, path, params)
+        if cached is not MISSING:
+            return cached
+
+        attempt = 0
+        while True:
+            try:
+                response = self._client.request(method, path, params=params, json=payload)
+            except httpx.HTTPError as e:
+                delay = self._next_attempt(method, path, attempt, error=e)
+            else:
+                delay = self._next_attempt(method, path, attempt, response=response)
+                if delay is None:
+                    return self._finish(method, path, key, response)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncMoneyBallerClient(_ClientBase):
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, transport=None, **options):
+        super().__init__(base_url, **options)
+        self._client = httpx.AsyncClient(transport=transport, **self._client_options)
+
+    async def _call(self, method, path, params=None, payload=None):
+        params, key, cached = self._prepare(method, path, params)
+        if cached is not MISSING:
+            return cached
+
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.request(method, path, params=params, json=payload)
+            except httpx.HTTPError as e:
+                delay = self._next_attempt(method, path, attempt, error=e)
+            else:
+                delay = self._next_attempt(method, path, attempt, response=response)
+                if delay is None:
+                    return self._finish(method, path, key, response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
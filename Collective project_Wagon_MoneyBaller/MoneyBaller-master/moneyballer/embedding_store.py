@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+# Binary store for the PCA projections (replaces raw_data/X_proj.csv).
+#
+# Layout of one file:
+#   8 bytes   magic b'MBEMB001'
+#   8 bytes   header length (little-endian uint64)
+#   header    UTF-8 JSON: n_rows, n_dims, offsets of the arrays, fingerprint
+#             (sha1 of the vectors, computed once here), PCA metadata
+#   ids       int64[n_rows]            player_id of each row
+#   vectors   float32[n_rows, n_dims]  C order
+#   unit      float32[n_rows, n_dims]  the vectors scaled to unit norm (cosine search)
+# Arrays start on 64 byte boundaries so they can be memory-mapped directly:
+# opening the file reads only the header and every process mapping it shares
+# the same page-cache pages, the unit vectors included, so api workers do not
+# each normalize their own copy. Stores written before the unit block have no
+# unit_offset; `python -m moneyballer.embedding_store` rewrites them.
+EMBEDDINGS_PATH = "raw_data/X_proj.emb"
+
+MAGIC = b'MBEMB001'
+ALIGNMENT = 64
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def normalize_rows(X):
+    # unit rows, so a dot product is the cosine similarity
+    X = np.asarray(X, dtype=np.float32)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return X / norms
+
+
+def embeddings_fingerprint(vectors):
+    # hash of the float32 vectors, the same for the .emb store and the csv
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    digest = hashlib.sha1(repr(vectors.shape).encode())
+    digest.update(vectors.data)
+    return digest.hexdigest()
+
+
+def write_embeddings(vectors, ids, metadata=None, path=EMBEDDINGS_PATH):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    ids = np.ascontiguousarray(ids, dtype=np.int64)
+    if vectors.ndim != 2 or len(vectors) != len(ids):
+        raise ValueError(f"Expected one id per row, got {len(ids)} ids for vectors of shape {vectors.shape}")
+
+    header = {
+        'n_rows': int(vectors.shape[0]),
+        'n_dims': int(vectors.shape[1]),
+        'fingerprint': embeddings_fingerprint(vectors),
+        'metadata': metadata or {},
+    }
+    # header size depends on the offsets it holds, reserve room for them first
+    header['ids_offset'] = header['vectors_offset'] = header['unit_offset'] = 0
+    header_size = len(json.dumps(header).encode()) + 64
+    header['ids_offset'] = _align(16 + header_size)
+    header['vectors_offset'] = _align(header['ids_offset'] + ids.nbytes)
+    header['unit_offset'] = _align(header['vectors_offset'] + vectors.nbytes)
+    header_bytes = json.dumps(header).encode().ljust(header_size)
+
+    # write next to the target then rename, readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.uint64(len(header_bytes)).tobytes())
+        file.write(header_bytes)
+        file.seek(header['ids_offset'])
+        file.write(ids.tobytes())
+        file.seek(header['vectors_offset'])
+        file.write(vectors.tobytes())
+        file.seek(header['unit_offset'])
+        file.write(normalize_rows(vectors).tobytes())
+    os.replace(tmp_path, path)
+
+
+def read_header(path=EMBEDDINGS_PATH):
+    with open(path, "rb") as file:
+        if file.read(8) != MAGIC:
+            raise ValueError(f"{path} is not a MoneyBaller embedding file")
+        header_size = int(np.frombuffer(file.read(8), dtype=np.uint64)[0])
+        return json.loads(file.read(header_size))
+
+
+def open_embeddings(path=EMBEDDINGS_PATH):
+    # (ids, vectors, metadata) with ids and vectors as read-only memory maps
+    header = read_header(path)
+    n_rows, n_dims = header['n_rows'], header['n_dims']
+
+    ids = np.memmap(path, dtype=np.int64, mode='r', offset=header['ids_offset'], shape=(n_rows,))
+    vectors = np.memmap(path, dtype=np.float32, mode='r', offset=header['vectors_offset'], shape=(n_rows, n_dims))
+    return ids, vectors, header['metadata']
+
+
+def stored_fingerprint(path=EMBEDDINGS_PATH):
+    # fingerprint written with the store (header only, no hashing), None for older stores
+    return read_header(path).get('fingerprint')
+
+
+def open_unit_vectors(path=EMBEDDINGS_PATH):
+    # unit-norm vectors as a read-only memory map, None for a store written without them
+    header = read_header(path)
+    if 'unit_offset' not in header:
+        return None
+    return np.memmap(path, dtype=np.float32, mode='r', offset=header['unit_offset'],
+                     shape=(header['n_rows'], header['n_dims']))
+
+
+if __name__ == '__main__':
+    # rewrite an existing store in the current layout (adds the unit vectors and the fingerprint)
+    ids, vectors, metadata = open_embeddings()
+    write_embeddings(np.array(vectors), np.array(ids), metadata)
+    print(f"{EMBEDDINGS_PATH}: {len(ids):,} rows rewritten")
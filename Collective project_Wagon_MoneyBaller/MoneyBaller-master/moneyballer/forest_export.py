@@ -0,0 +1,277 @@
+import os
+import numpy as np
+from sklearn.dummy import DummyClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+from moneyballer.model_features import GOALKEEPER_VALUATION_FEATURES
+
+# Array-backed inference for the tree ensemble pipelines: the random forest
+# valuations (MinMaxScaler -> RandomForestRegressor, see gk_valuation_model.py
+# and Field_prep_model_pipe.py) and the gradient boosted position predictor
+# (MinMaxScaler -> GradientBoostingClassifier, see outfield_position_predictor.py).
+#
+# All trees are packed into one set of contiguous node arrays (tree t starts
+# at roots[t]); leaves point to themselves, so a batch walks every tree at
+# once, one level per step, until all rows sit on a leaf.
+#
+# Predictions match sklearn exactly: inputs are scaled in float64 and cast to
+# float32 like the pipeline does, thresholds and leaf values stay float64, and
+# the tree outputs are summed in the same order before averaging (forests) or
+# scaling by the learning rate (boosting).
+GK_FOREST_PATH = "models/gk_model.npz"
+OUTFIELD_FOREST_PATH = "models/player_value_model.npz"
+POSITION_BOOSTING_PATH = "models/outfield_position_predictor.npz"
+
+# largest position probability difference to sklearn accepted at export
+MAX_PROBA_DIFF = 1e-9
+
+
+class PackedTrees:
+
+    def __init__(self, roots, feature, threshold, left, right, missing_left, value):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+
+    @classmethod
+    def from_estimators(cls, estimators):
+        # estimators: fitted sklearn trees (or their tree_ objects), single output
+        trees = [getattr(estimator, 'tree_', estimator) for estimator in estimators]
+        sizes = np.array([tree.node_count for tree in trees])
+        roots = np.r_[0, np.cumsum(sizes)[:-1]]
+
+        feature, threshold, left, right, missing_left, value = [], [], [], [], [], []
+        for tree, root in zip(trees, roots):
+            nodes = np.arange(tree.node_count) + root
+            leaf = tree.children_left == -1
+            feature.append(np.where(leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            left.append(np.where(leaf, nodes, tree.children_left + root))
+            right.append(np.where(leaf, nodes, tree.children_right + root))
+            missing_left.append(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8)))
+            value.append(tree.value[:, 0, 0])
+
+        return cls(roots.astype(np.int32),
+                   np.concatenate(feature).astype(np.int32),
+                   np.concatenate(threshold).astype(np.float64),
+                   np.concatenate(left).astype(np.int32),
+                   np.concatenate(right).astype(np.int32),
+                   np.concatenate(missing_left).astype(bool),
+                   np.concatenate(value).astype(np.float64))
+
+    def arrays(self, prefix=''):
+        return {f'{prefix}{name}': getattr(self, name)
+                for name in ['roots', 'feature', 'threshold', 'left', 'right', 'missing_left', 'value']}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=''):
+        return cls(*(arrays[f'{prefix}{name}']
+                     for name in ['roots', 'feature', 'threshold', 'left', 'right', 'missing_left', 'value']))
+
+    def leaf_values(self, X):
+        # X: (n_rows, n_features) float32, returns the (n_trees, n_rows) leaf values
+        n_rows, n_features = X.shape
+        X_flat = X.ravel()
+        has_missing = np.isnan(X_flat).any()
+
+        # one walker per (tree, row), only the ones not yet on a leaf move each step
+        nodes = np.repeat(self.roots, n_rows)
+        row_offsets = np.tile(np.arange(n_rows) * n_features, len(self.roots))
+        active = np.flatnonzero(self.left[nodes] != nodes)
+
+        while len(active):
+            current = nodes[active]
+            x = X_flat[row_offsets[active] + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_left[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            active = active[self.left[current] != current]
+
+        return self.value[nodes].reshape(len(self.roots), n_rows)
+
+
+class ForestPredictor:
+
+    def __init__(self, trees, scaler_min, scaler_scale, features):
+        self.trees = trees
+        self.scaler_min = scaler_min
+        self.scaler_scale = scaler_scale
+        self.features = features
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(PackedTrees.from_arrays(arrays), arrays['scaler_min'], arrays['scaler_scale'],
+                       arrays['features'].tolist())
+
+    def predict(self, X):
+        # X: (n_rows, n_features) in self.features order, returns what pipe.predict returns
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        X *= self.scaler_scale
+        X += self.scaler_min
+
+        values = self.trees.leaf_values(X.astype(np.float32))
+        # sklearn adds the trees one after the other into zeros, then divides
+        prediction = np.zeros(values.shape[1])
+        for tree_values in values:
+            prediction += tree_values
+        prediction /= len(values)
+        return prediction
+
+
+class BoostedTreesClassifier:
+    # multiclass GradientBoostingClassifier: one tree per (stage, class)
+
+    def __init__(self, trees, init_raw, learning_rate, classes, scaler_min, scaler_scale, features):
+        self.trees = trees
+        self.init_raw = init_raw
+        self.learning_rate = float(learning_rate)
+        self.classes = classes
+        self.scaler_min = scaler_min
+        self.scaler_scale = scaler_scale
+        self.features = features
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as arrays:
+            return cls(PackedTrees.from_arrays(arrays), arrays['init_raw'], arrays['learning_rate'],
+                       arrays['classes'].tolist(), arrays['scaler_min'], arrays['scaler_scale'],
+                       arrays['features'].tolist())
+
+    def decision_function(self, X):
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        X *= self.scaler_scale
+        X += self.scaler_min
+
+        n_classes = len(self.classes)
+        values = self.trees.leaf_values(X.astype(np.float32))
+        values = values.reshape(-1, n_classes, len(X))
+
+        # stage by stage, like sklearn's predict_stages
+        raw = np.tile(self.init_raw, (len(X), 1))
+        for stage_values in values:
+            raw += self.learning_rate * stage_values.T
+        return raw
+
+    def predict_proba(self, X):
+        # (n_rows, n_classes) probabilities, columns in self.classes order
+        raw = self.decision_function(X)
+        proba = np.exp(raw - raw.max(axis=1, keepdims=True))
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return np.array(self.classes)[self.decision_function(X).argmax(axis=1)]
+
+
+def pipeline_steps(pipe):
+    # flatten nested pipelines into their estimators
+    for _, step in pipe.steps:
+        if isinstance(step, Pipeline):
+            yield from pipeline_steps(step)
+        else:
+            yield step
+
+
+def export_forest_pipeline(pipe, path):
+    *preprocessing, forest = pipeline_steps(pipe)
+    if len(preprocessing) != 1 or not isinstance(preprocessing[0], MinMaxScaler):
+        raise ValueError("Only a single MinMaxScaler before the forest is supported")
+    if getattr(forest, 'n_outputs_', 1) != 1 or not hasattr(forest, 'estimators_'):
+        raise ValueError("Only single output tree ensembles are supported")
+    scaler = preprocessing[0]
+
+    trees = PackedTrees.from_estimators(forest.estimators_)
+    features = np.array(pipe.feature_names_in_, dtype=str)
+
+    # write next to the target then rename, the api never reads a partial file
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, scaler_min=scaler.min_, scaler_scale=scaler.scale_, features=features, **trees.arrays())
+    os.replace(tmp_path, path)
+    return ForestPredictor(trees, scaler.min_, scaler.scale_, features.tolist())
+
+
+def export_boosting_pipeline(pipe, path=POSITION_BOOSTING_PATH):
+    *preprocessing, model = pipeline_steps(pipe)
+    if len(preprocessing) != 1 or not isinstance(preprocessing[0], MinMaxScaler):
+        raise ValueError("Only a single MinMaxScaler before the boosted trees is supported")
+    if not hasattr(model, 'estimators_') or model.estimators_.shape[1] != len(model.classes_):
+        raise ValueError("Only multiclass gradient boosting (one tree per class and stage) is supported")
+    if model.init is not None or not isinstance(model.init_, DummyClassifier) or model.init_.strategy != 'prior':
+        raise ValueError("Only the default init estimator (class priors) is supported")
+    scaler = preprocessing[0]
+
+    trees = PackedTrees.from_estimators(model.estimators_.ravel())
+    features = np.array(pipe.feature_names_in_, dtype=str)
+    classes = np.array(model.classes_, dtype=str)
+    # raw scores of the init estimator, the same for every row: log class priors
+    # centred on their mean, like sklearn's multinomial link (clipped like sklearn)
+    eps = np.finfo(np.float64).eps
+    log_priors = np.log(np.clip(model.init_.class_prior_, eps, 1 - eps, dtype=np.float64))
+    init_raw = log_priors - log_priors.mean()
+
+    # write next to the target then rename, the api never reads a partial file
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, init_raw=init_raw, learning_rate=model.learning_rate, classes=classes,
+             scaler_min=scaler.min_, scaler_scale=scaler.scale_, features=features, **trees.arrays())
+    os.replace(tmp_path, path)
+    return BoostedTreesClassifier(trees, init_raw, model.learning_rate, classes.tolist(),
+                                  scaler.min_, scaler.scale_, features.tolist())
+
+
+def load_forest(path, features, predictor_class=ForestPredictor):
+    # predictor or None when the artifact was not exported (or for other features)
+    if not os.path.exists(path):
+        print(f"[WARNING] {path} not found, using the pickled model.")
+        return None
+    predictor = predictor_class.load(path)
+    if predictor.features != list(features):
+        print(f"[WARNING] {path} was exported for {predictor.features}, using the pickled model.")
+        return None
+    return predictor
+
+
+if __name__ == '__main__':
+    # export the saved tree models and check they predict like sklearn
+    import pickle
+    import pandas as pd
+
+    for pickle_path, path in [("models/gk_model.pkl", GK_FOREST_PATH),
+                              ("models/player_value_model.pkl", OUTFIELD_FOREST_PATH),
+                              ("models/outfield_position_predictor.pkl", POSITION_BOOSTING_PATH)]:
+        if not os.path.exists(pickle_path):
+            print(f"{pickle_path} not found, skipped")
+            continue
+        with open(pickle_path, "rb") as file:
+            pipe = pickle.load(file)
+
+        rng = np.random.default_rng(0)
+        X = pd.DataFrame(rng.integers(1, 100, (10_000, len(pipe.feature_names_in_))).astype(float),
+                         columns=pipe.feature_names_in_)
+
+        if path == POSITION_BOOSTING_PATH:
+            export_boosting_pipeline(pipe, path)
+            predictor = BoostedTreesClassifier.load(path)
+            n_equal = (predictor.predict(X.values) == pipe.predict(X)).sum()
+            diff = np.abs(predictor.predict_proba(X.values) - pipe.predict_proba(X)).max()
+            print(f"{path}: {n_equal:,} / {len(X):,} classes identical to sklearn, "
+                  f"max probability difference {diff:.1e}")
+            if n_equal != len(X) or not diff <= MAX_PROBA_DIFF:
+                # without the artifact the api falls back to the pickled model
+                os.remove(path)
+                raise SystemExit(f"Exported boosting predicts differently from sklearn, {path} removed")
+        else:
+            export_forest_pipeline(pipe, path)
+            n_equal = (ForestPredictor.load(path).predict(X.values) == pipe.predict(X)).sum()
+            print(f"{path}: {n_equal:,} / {len(X):,} predictions identical to sklearn, "
+                  f"{os.path.getsize(path) / 1e6:.1f} MB vs {os.path.getsize(pickle_path) / 1e6:.1f} MB pickled")
+            if n_equal != len(X):
+                # without the artifact the api falls back to the pickled model
+                os.remove(path)
+                raise SystemExit(f"Exported forest predicts differently from sklearn, {path} removed")
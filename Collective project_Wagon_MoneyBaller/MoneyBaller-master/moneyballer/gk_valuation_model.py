@@ -3,6 +3,7 @@ from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.ensemble import RandomForestRegressor
 import pickle
+from moneyballer.forest_export import GK_FOREST_PATH, export_forest_pipeline
 
 # load data (file path readable by the api app)
 df = pd.read_csv("raw_data/FC26_20250921.csv", low_memory=False)
@@ -36,3 +37,6 @@ final_pipe.fit(X, y)
 # save knn model as pickel file
 with open("models/gk_model.pkl", "wb") as file:
     pickle.dump(final_pipe, file)
+
+# Flat node arrays of the forest for the api's array traversal (see forest_export.py)
+export_forest_pipeline(final_pipe, GK_FOREST_PATH)
@@ -0,0 +1,195 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+
+# Cache of the player face images shown by the app.
+#
+# Each face used to be downloaded and base64-encoded again on every Streamlit
+# rerun. Here a face is fetched once, then served as a ready data URI from a
+# bounded in-memory LRU, backed by a content-addressed store on disk
+# (blobs/<sha256 of the image>, plus a small record per url with its digest,
+# content type and validators), so restarts and identical images at several
+# urls cost nothing. Once an entry is older than max_age_seconds the url is
+# revalidated with If-None-Match / If-Modified-Since: a 304 only refreshes
+# the record. When the origin is unreachable the stale copy is still served,
+# and the url is not tried again for retry_after_seconds.
+#
+# data_uri() returns None when no image can be had, the caller shows its placeholder.
+FACE_CACHE_DIR = "raw_data/face_cache"
+# urls whose last fetch failed, remembered to wait before trying them again
+MAX_FAILED_URLS = 10_000
+
+
+class FaceImageCache:
+
+    def __init__(self, cache_dir=FACE_CACHE_DIR, max_memory_bytes=64 * 2 ** 20, max_age_seconds=7 * 24 * 3600,
+                 timeout=5, retry_after_seconds=60, session=None):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = int(max_memory_bytes)
+        self.max_age_seconds = max_age_seconds
+        self.timeout = timeout
+        self.retry_after_seconds = retry_after_seconds
+        if session is None:
+            # faces of a grid are fetched concurrently (parallel_fetch.py), keep a connection per thread
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_maxsize=64))
+            session.mount('http://', HTTPAdapter(pool_maxsize=64))
+        self.session = session
+
+        self._entries = OrderedDict()  # url -> (record, data uri)
+        self._memory_bytes = 0
+        self._failed_at = OrderedDict()  # url -> time of the last failed fetch
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        self.failures = 0
+
+    # --- disk store ---
+
+    def _record_path(self, url):
+        return os.path.join(self.cache_dir, "urls", f"{hashlib.sha1(url.encode()).hexdigest()}.json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    def _write(self, path, data):
+        # write next to the target then rename, readers never see a partial file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_record(self, url):
+        try:
+            with open(self._record_path(url)) as file:
+                record = json.load(file)
+            with open(self._blob_path(record['digest']), 'rb') as file:
+                return record, file.read()
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def _store(self, url, record, content=None):
+        if content is not None:
+            blob_path = self._blob_path(record['digest'])
+            if not os.path.exists(blob_path):
+                self._write(blob_path, content)
+        self._write(self._record_path(url), json.dumps(record).encode())
+
+    # --- memory LRU ---
+
+    def _remember(self, url, record, data_uri):
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[1])
+            self._entries[url] = (record, data_uri)
+            self._memory_bytes += len(data_uri)
+            while self._memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _fresh(self, record):
+        return time.time() - record['fetched_at'] < self.max_age_seconds
+
+    # --- origin ---
+
+    def _fetch(self, url, record):
+        # (record, content); content is None when the cached copy is still valid (304)
+        headers = {}
+        if record is not None:
+            if record.get('etag'):
+                headers['If-None-Match'] = record['etag']
+            if record.get('last_modified'):
+                headers['If-Modified-Since'] = record['last_modified']
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and record is not None:
+            self.revalidated += 1
+            return dict(record, fetched_at=time.time()), None
+
+        content_type = response.headers.get('content-type', '')
+        if response.status_code != 200 or not content_type.startswith('image') or not response.content:
+            raise ValueError(f"{url}: status {response.status_code}, content type '{content_type}'")
+        self.downloads += 1
+        return {
+            'digest': hashlib.sha256(response.content).hexdigest(),
+            'content_type': content_type,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'fetched_at': time.time(),
+        }, response.content
+
+    def data_uri(self, url):
+        # "data:<type>;base64,..." of the image at url, None when it cannot be fetched
+        if not url:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+        if entry is not None and self._fresh(entry[0]):
+            self.memory_hits += 1
+            return entry[1]
+
+        record, content = self._read_record(url)
+        if record is None and entry is not None:
+            # evicted from disk, the memory copy still has the validators
+            record = entry[0]
+
+        if record is not None and self._fresh(record):
+            self.disk_hits += 1
+        else:
+            new_record, new_content = None, None
+            with self._lock:
+                failed_at = self._failed_at.get(url)
+            if failed_at is None or time.time() - failed_at >= self.retry_after_seconds:
+                try:
+                    new_record, new_content = self._fetch(url, record)
+                except Exception:
+                    self.failures += 1
+                    with self._lock:
+                        self._failed_at[url] = time.time()
+                        self._failed_at.move_to_end(url)
+                        while len(self._failed_at) > MAX_FAILED_URLS:
+                            self._failed_at.popitem(last=False)
+
+            if new_record is None:
+                # serve whatever copy there is rather than nothing
+                if entry is not None:
+                    return entry[1]
+                if record is None:
+                    return None
+            else:
+                with self._lock:
+                    self._failed_at.pop(url, None)
+                self._store(url, new_record, new_content)
+                record, content = new_record, content if new_content is None else new_content
+
+        if entry is not None and entry[0]['digest'] == record['digest']:
+            data_uri = entry[1]
+        else:
+            data_uri = f"data:{record['content_type']};base64,{base64.b64encode(content).decode('ascii')}"
+        self._remember(url, record, data_uri)
+        return data_uri
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'memory_bytes': self._memory_bytes,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'revalidated': self.revalidated,
+            'downloads': self.downloads,
+            'failures': self.failures,
+        }
@@ -0,0 +1,114 @@
+import numpy as np
+import orjson
+import pandas as pd
+
+# Pre-serialized JSON objects of the player rows, per response shape.
+#
+# The search and similarity endpoints used to clean every matched frame
+# (inf / NaN -> None), convert it to records, run jsonable_encoder and then
+# orjson on each request. The rows never change while the api runs, so each
+# one is encoded once at startup with that same path: all objects of a shape
+# live in one byte string, one after the other and without their closing
+# brace, so fields computed per request (the similarity) can be appended.
+# A response is then the slices of its rows joined together.
+# arrays() / from_arrays() let worker processes share one memory-mapped
+# copy (see shared_data.py).
+
+# the options ORJSONResponse encodes with
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+BUILD_CHUNK_ROWS = 50_000
+
+# Columns returned by the player search
+PLAYER_SEARCH_COLUMNS = [
+    'long_name', 'short_name', 'nationality_name',
+    'club_name', 'player_positions', 'overall', 'player_face_url',
+    'pace', 'shooting', 'passing', 'dribbling', 'defending',
+    'physic', 'value_eur', 'preferred_foot', 'age', 'league_name', 'club_contract_valid_until_year',
+
+    'goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking',
+    'goalkeeping_positioning', 'goalkeeping_reflexes', 'goalkeeping_speed'
+]
+
+# Columns returned for similar players
+SIMILAR_GK_COLUMNS = [
+    'short_name', 'long_name', 'player_positions', 'overall', 'goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking',
+    'goalkeeping_positioning', 'goalkeeping_reflexes', 'goalkeeping_speed', 'value_eur', 'player_face_url',
+    'nationality_name','preferred_foot', 'age', 'league_name', 'club_contract_valid_until_year', 'club_name'
+]
+SIMILAR_OUTFIELD_COLUMNS = [
+    'short_name', 'long_name', 'player_positions', 'overall', 'pace', 'shooting',
+    'passing', 'dribbling', 'defending', 'physic', 'value_eur', 'player_face_url',
+    'nationality_name','preferred_foot', 'age', 'league_name', 'club_contract_valid_until_year', 'club_name'
+]
+
+# Columns returned by the name autocomplete
+AUTOCOMPLETE_COLUMNS = ['short_name', 'long_name', 'club_name', 'overall']
+
+# response shape -> its columns after player_id
+RESPONSE_SHAPES = {
+    'player_search': PLAYER_SEARCH_COLUMNS,
+    'autocomplete': AUTOCOMPLETE_COLUMNS,
+    'similar_goalkeepers': SIMILAR_GK_COLUMNS,
+    'similar_outfield': SIMILAR_OUTFIELD_COLUMNS,
+}
+
+
+def encode_records(df):
+    # the former per-request path: JSON-safe records (player_id first) encoded one by one
+    clean = df.replace([np.inf, -np.inf], np.nan)
+    records = clean.where(pd.notnull(clean), None).reset_index(names='player_id').to_dict(orient='records')
+    return [orjson.dumps(record, option=ORJSON_OPTIONS) for record in records]
+
+
+class JsonRows:
+    # JSON object of every row of `df` (indexed by player_id) restricted to `columns`;
+    # rows are addressed by position in the frame
+
+    def __init__(self, df, columns):
+        fragments = []
+        for first in range(0, len(df), BUILD_CHUNK_ROWS):
+            chunk = df.iloc[first:first + BUILD_CHUNK_ROWS][columns]
+            # drop the closing brace, added back (after any extra field) per response
+            fragments.extend(record[:-1] for record in encode_records(chunk))
+        self.n_rows = len(fragments)
+
+        lengths = np.fromiter(map(len, fragments), dtype=np.int64, count=self.n_rows)
+        self._starts = np.zeros(self.n_rows + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._starts[1:])
+        self._text = b''.join(fragments)
+
+    def arrays(self):
+        # (text, {name: array}) holding every row
+        return self._text, {'starts': self._starts}
+
+    @classmethod
+    def from_arrays(cls, text, arrays):
+        # text: bytes or any buffer that slices to bytes (e.g. an mmap), arrays as returned by arrays()
+        rows = cls.__new__(cls)
+        rows._text, rows._starts = text, arrays['starts']
+        rows.n_rows = len(rows._starts) - 1
+        return rows
+
+    def array(self, rows, **fields):
+        # JSON array of the objects at row positions `rows`; each keyword is a field
+        # appended to every object, with one value per row
+        rows = np.asarray(rows, dtype=np.int64)
+        starts, ends = self._starts[rows].tolist(), self._starts[rows + 1].tolist()
+        text = self._text
+
+        if not fields:
+            objects = [text[start:end] + b'}' for start, end in zip(starts, ends)]
+        else:
+            names = list(fields)
+            # '{"similarity":0.93}' -> ',"similarity":0.93}'
+            tails = [b',' + orjson.dumps(dict(zip(names, values)), option=ORJSON_OPTIONS)[1:]
+                     for values in zip(*fields.values())]
+            objects = [text[start:end] + tail for start, end, tail in zip(starts, ends, tails)]
+
+        return b'[' + b','.join(objects) + b']'
+
+    def lines(self, rows):
+        # the objects at row positions `rows` as NDJSON, one per line
+        rows = np.asarray(rows, dtype=np.int64)
+        starts, ends = self._starts[rows].tolist(), self._starts[rows + 1].tolist()
+        return b''.join(self._text[start:end] + b'}\n' for start, end in zip(starts, ends))
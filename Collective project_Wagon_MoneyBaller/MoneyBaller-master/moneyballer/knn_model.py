@@ -1,5 +1,7 @@
 from sklearn.neighbors import NearestNeighbors
 from moneyballer.preprocessor import X_proj
+from moneyballer.embedding_store import stored_fingerprint
+from moneyballer.neighbor_table import compute_neighbor_table, save_neighbor_table
 import pickle
 
 knn_model = NearestNeighbors(
@@ -11,3 +13,8 @@ knn_model.fit(X_proj)
 # save knn model as pickel file
 with open("models/knn_model.pkl", "wb") as file:
     pickle.dump(knn_model, file)
+
+# precompute every player's 100 nearest neighbors for the API (see neighbor_table.py)
+neighbor_ids, neighbor_sims = compute_neighbor_table(X_proj.values)
+# (X_proj.emb was just written by the preprocessor, with the fingerprint of these vectors)
+save_neighbor_table(neighbor_ids, neighbor_sims, stored_fingerprint())
@@ -0,0 +1,160 @@
+import threading
+import time
+from bisect import bisect_left
+from moneyballer.profiling import current_profile
+
+# Minimal Prometheus metrics: histograms updated on the hot path, plus
+# collectors that turn existing stats (model loader, caches, batchers, ...)
+# into gauges and counters when /metrics is scraped. Rendered in the
+# Prometheus text exposition format, no client library needed.
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def format_value(value):
+    if value is None:
+        return 'NaN'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Histogram:
+
+    def __init__(self, name, help, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._le = [format_value(float(bound)) for bound in self.buckets] + ['+Inf']
+        # per label values: [non-cumulative bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        return Timer(self, labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, [list(counts), total, count]) for labels, (counts, total, count) in self._series.items())
+        for labels, (counts, total, count) in series:
+            cumulative = 0
+            for le, bucket_count in zip(self._le, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names + ('le',), labels + (le,))} {cumulative}")
+            label_text = format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {total}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Timer:
+    # with histogram.time(labels...): observes the block's duration in seconds,
+    # and adds it to the request's Server-Timing when the request is profiled
+
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.histogram.observe(seconds, *self.labels)
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add(self.labels, seconds)
+        return False
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._histograms = []
+        self._collectors = []
+
+    def histogram(self, name, help, label_names=(), buckets=LATENCY_BUCKETS):
+        histogram = Histogram(name, help, label_names, buckets)
+        self._histograms.append(histogram)
+        return histogram
+
+    def collector(self, fn):
+        # fn() -> [(name, type, help, [(labels dict, value), ...]), ...], called on every scrape
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for histogram in self._histograms:
+            lines += histogram.render()
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{format_labels(tuple(labels), tuple(labels.values()))} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    # ASGI middleware: latency, request and response body sizes per route
+
+    def __init__(self, app, request_seconds, request_bytes, response_bytes):
+        self.app = app
+        self.request_seconds = request_seconds
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        sizes = {'request': 0, 'response': 0, 'status': 500}
+
+        async def receive_counted():
+            message = await receive()
+            if message['type'] == 'http.request':
+                sizes['request'] += len(message.get('body', b''))
+            return message
+
+        async def send_counted(message):
+            if message['type'] == 'http.response.start':
+                sizes['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                sizes['response'] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            # route template (/find_similar_players), not the raw path with its parameters
+            route = scope.get('route')
+            endpoint = route.path if route is not None else 'unmatched'
+            method = scope['method']
+            self.request_seconds.observe(time.perf_counter() - start, endpoint, method, str(sizes['status']))
+            self.request_bytes.observe(sizes['request'], endpoint, method)
+            self.response_bytes.observe(sizes['response'], endpoint, method)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import Counter
+import numpy as np
+
+# Dynamic micro-batching for single-row model calls.
+#
+# Concurrent requests for the same model wait (at most max_wait_ms after the
+# first one arrives, or until max_batch_size rows are queued) and are then
+# predicted together as one matrix in a worker pool; each request gets its own
+# row of the result back. Under load this replaces many one-row predict calls,
+# where per-call overhead dominates, by a few larger ones.
+#
+# Metrics per batcher: batch size distribution and queue wait (time from
+# arrival to the batch being dispatched).
+
+
+class MicroBatcher:
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0, executor=None):
+        # predict_fn: (n_rows, n_features) float array -> n_rows results, called in the executor
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = float(max_wait_ms)
+        self.executor = executor
+        self._pending = []
+        self._timer = None
+
+        self.requests = 0
+        self.batches = 0
+        self.batch_sizes = Counter()
+        self.queue_wait_seconds_total = 0.0
+        self.queue_wait_seconds_max = 0.0
+
+    async def predict(self, row):
+        # row: feature values in the model's order, returns that row's prediction
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        waits = [now - enqueued for _, _, enqueued in batch]
+        self.batches += 1
+        self.batch_sizes[len(batch)] += 1
+        self.queue_wait_seconds_total += sum(waits)
+        self.queue_wait_seconds_max = max(self.queue_wait_seconds_max, max(waits))
+
+        X = np.array([row for row, _, _ in batch], dtype=np.float64)
+        done = asyncio.get_running_loop().run_in_executor(self.executor, self.predict_fn, X)
+        done.add_done_callback(lambda done: self._fan_out(batch, done))
+
+    @staticmethod
+    def _fan_out(batch, done):
+        # requests whose client went away are already cancelled, skip them
+        try:
+            results = done.result()
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': round(self.requests / self.batches, 2) if self.batches else None,
+            'batch_sizes': dict(sorted(self.batch_sizes.items())),
+            'mean_queue_wait_ms': round(1000 * self.queue_wait_seconds_total / self.requests, 3) if self.requests else None,
+            'max_queue_wait_ms': round(1000 * self.queue_wait_seconds_max, 3),
+        }
+
+
+def batching_config(defaults, environ):
+    # per model (max_batch_size, max_wait_ms), overridable with MICRO_BATCH_<MODEL>="rows,ms";
+    # MICRO_BATCHING=0 turns batching off (every request predicted on its own)
+    enabled = environ.get("MICRO_BATCHING", "1") != "0"
+    config = {}
+    for name, (max_batch_size, max_wait_ms) in defaults.items():
+        override = environ.get(f"MICRO_BATCH_{name.upper()}")
+        if override:
+            max_batch_size, max_wait_ms = override.split(",")
+        config[name] = (int(max_batch_size), float(max_wait_ms)) if enabled else (1, 0.0)
+    return config
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+from moneyballer.model_features import OUTFIELD_VALUATION_FEATURES
+
+# Pure NumPy inference for the outfield valuation pipeline
+# (SimpleImputer(median) -> MinMaxScaler -> MLPRegressor(relu), see DeepL_Valuation_Fieldplayer.py).
+#
+# The fitted parameters are flattened into one float32 vector:
+#   [n_features, n_layers, layer sizes (n_layers + 1 values),
+#    imputer medians, scaler min_, scaler scale_,
+#    W_1, b_1, ..., W_n, b_n]
+# so the api loads one small .npy and predicts with a few matrix products,
+# without DataFrame construction or sklearn input validation. The forward pass
+# runs in float64: in float32 the rounding depends on the number of rows in the
+# matrix products, so a micro-batched request could get another value than the
+# same player alone (and the result cache would keep whichever came first).
+MLP_ARTIFACT_PATH = "models/DeepL_valuation_model.npy"
+
+# float32 weights, float64 forward pass; 1e-5 in log space is 0.001% of the value
+MAX_LOG_DIFF = 1e-5
+
+
+def export_mlp_pipeline(pipe, path=MLP_ARTIFACT_PATH):
+    imputer = pipe.named_steps['prep'].named_steps['imputer']
+    scaler = pipe.named_steps['prep'].named_steps['scaler']
+    mlp = pipe.named_steps['mlp']
+
+    if list(pipe.feature_names_in_) != OUTFIELD_VALUATION_FEATURES:
+        raise ValueError(f"Pipeline features {list(pipe.feature_names_in_)} do not match the api features")
+    if mlp.activation != 'relu' or mlp.out_activation_ != 'identity':
+        raise ValueError("Only relu hidden layers with an identity output are supported")
+
+    layer_sizes = [mlp.coefs_[0].shape[0]] + [coef.shape[1] for coef in mlp.coefs_]
+    parts = [[len(OUTFIELD_VALUATION_FEATURES), len(mlp.coefs_)], layer_sizes,
+             imputer.statistics_, scaler.min_, scaler.scale_]
+    for coef, intercept in zip(mlp.coefs_, mlp.intercepts_):
+        parts += [coef.ravel(), intercept]
+
+    flat = np.concatenate([np.asarray(part, dtype=np.float32).ravel() for part in parts])
+    np.save(path, flat)
+    return flat
+
+
+class NumpyMLPPredictor:
+
+    def __init__(self, flat):
+        flat = np.asarray(flat, dtype=np.float64)
+        n_features, n_layers = int(flat[0]), int(flat[1])
+        sizes = flat[2:3 + n_layers].astype(int)
+        pos = 3 + n_layers
+
+        def take(count):
+            nonlocal pos
+            part = flat[pos:pos + count]
+            pos += count
+            return part
+
+        self.medians = take(n_features)
+        self.scaler_min = take(n_features)
+        self.scaler_scale = take(n_features)
+        self.weights, self.biases = [], []
+        for n_in, n_out in zip(sizes[:-1], sizes[1:]):
+            self.weights.append(np.ascontiguousarray(take(n_in * n_out).reshape(n_in, n_out)))
+            self.biases.append(take(n_out))
+
+    @classmethod
+    def load(cls, path=MLP_ARTIFACT_PATH):
+        return cls(np.load(path))
+
+    def predict(self, X):
+        # X: (n_rows, n_features) in OUTFIELD_VALUATION_FEATURES order, NaN for missing values
+        # returns the log(value_eur) predictions, like the sklearn pipeline
+        X = np.array(X, dtype=np.float64, ndmin=2)
+        missing = np.isnan(X)
+        if missing.any():
+            X = np.where(missing, self.medians, X)
+
+        hidden = X * self.scaler_scale + self.scaler_min
+        for W, b in zip(self.weights[:-1], self.biases[:-1]):
+            hidden = np.maximum(hidden @ W + b, 0)
+        return (hidden @ self.weights[-1] + self.biases[-1]).ravel()
+
+
+def load_numpy_mlp(path=MLP_ARTIFACT_PATH):
+    # predictor or None when the artifact was not exported
+    if not os.path.exists(path):
+        print(f"[WARNING] {path} not found, outfield valuation uses the sklearn pipeline.")
+        return None
+    return NumpyMLPPredictor.load(path)
+
+
+if __name__ == '__main__':
+    # export the saved pipeline and check it against sklearn
+    import pickle
+    import pandas as pd
+
+    with open("models/DeepL_valuation_model.pkl", "rb") as file:
+        pipe = pickle.load(file)
+    export_mlp_pipeline(pipe)
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.integers(1, 100, (10_000, len(OUTFIELD_VALUATION_FEATURES))).astype(float),
+                     columns=OUTFIELD_VALUATION_FEATURES)
+    diff = np.abs(NumpyMLPPredictor.load().predict(X.values) - pipe.predict(X))
+    print(f"max |log value| difference vs sklearn: {diff.max():.2e}")
+    if not diff.max() < MAX_LOG_DIFF:
+        # without the artifact the api falls back to the sklearn pipeline
+        os.remove(MLP_ARTIFACT_PATH)
+        raise SystemExit(f"NumPy predictions diverge from the sklearn pipeline (max {MAX_LOG_DIFF:.0e}), "
+                         f"{MLP_ARTIFACT_PATH} removed")
@@ -0,0 +1,13 @@
+# Input columns of the valuation models, in the order of the fitted pipelines.
+#
+# Kept free of imports so thin clients (batch_valuation.py) can build requests
+# without numpy or scikit-learn; the exporters and the api import them from here.
+
+# outfield MLP (DeepL_Valuation_Fieldplayer.py), missing values are imputed
+OUTFIELD_VALUATION_FEATURES = ['age', 'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
+    'skill_moves', 'weak_foot']
+
+# goalkeeper forest (gk_valuation_model.py), all required
+GOALKEEPER_VALUATION_FEATURES = ['goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking',
+       'goalkeeping_positioning', 'goalkeeping_reflexes', 'goalkeeping_speed',
+       'mentality_penalties', 'mentality_composure', 'age']
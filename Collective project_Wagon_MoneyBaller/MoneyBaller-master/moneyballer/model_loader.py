@@ -0,0 +1,105 @@
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Pickled models served by the api, by the name the endpoints use
+MODEL_ARTIFACTS = {
+    'knn_model': "models/knn_model.pkl",
+    'outfield_model': "models/DeepL_valuation_model.pkl",
+    'outfield_position_predictor': "models/outfield_position_predictor.pkl",
+    'gk_model': "models/gk_model.pkl",
+}
+
+
+class ModelUnavailable(Exception):
+    pass
+
+
+# Unpickling imports sklearn modules; several threads importing the same
+# modules at once can hit Python's import deadlock detection, so files are
+# read concurrently but unpickled one at a time (it holds the GIL anyway)
+_UNPICKLE_LOCK = threading.Lock()
+
+
+class ModelLoader:
+    # Loads model artifacts concurrently in a thread pool, each file once
+    # (names sharing a path share the loaded object), and records per
+    # artifact its size, load time and status for the /ready endpoint.
+    #
+    # start() returns immediately; get(name) waits for that one artifact,
+    # so requests only block on the model they need. Artifacts of `lazy`
+    # names are only loaded by their first get() (and do not count for ready()).
+
+    def __init__(self, artifacts=MODEL_ARTIFACTS, max_workers=4, lazy=()):
+        self.artifacts = dict(artifacts)
+        self.max_workers = max_workers
+        self.lazy = {self.artifacts[name] for name in lazy}
+        self.stats = {
+            path: {'names': [name for name, p in self.artifacts.items() if p == path],
+                   'status': 'deferred' if path in self.lazy else 'pending',
+                   'size_bytes': None, 'load_seconds': None, 'error': None}
+            for path in dict.fromkeys(self.artifacts.values())
+        }
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _load(self, path):
+        stats = self.stats[path]
+        stats['status'] = 'loading'
+        start = time.perf_counter()
+        try:
+            stats['size_bytes'] = os.path.getsize(path)
+            with open(path, "rb") as file:
+                data = file.read()
+            with _UNPICKLE_LOCK:
+                model = pickle.loads(data)
+        except Exception as e:
+            stats['status'] = 'failed'
+            stats['error'] = f"{type(e).__name__}: {e}"
+            print(f"Error loading {path}: {e}")
+            raise
+        finally:
+            stats['load_seconds'] = round(time.perf_counter() - start, 4)
+        stats['status'] = 'loaded'
+        return model
+
+    def start(self):
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="model-loader")
+            self._futures = {path: self._executor.submit(self._load, path)
+                             for path in self.stats if path not in self.lazy}
+            if not self.lazy:
+                # let the threads finish, nothing else is ever submitted
+                self._executor.shutdown(wait=False)
+
+    def get(self, name, timeout=None):
+        self.start()
+        try:
+            path = self.artifacts[name]
+            with self._lock:
+                if path not in self._futures:
+                    self._futures[path] = self._executor.submit(self._load, path)
+            return self._futures[path].result(timeout=timeout)
+        except Exception as e:
+            raise ModelUnavailable(f"Model '{name}' is not available: {e}") from e
+
+    def wait(self, timeout=None):
+        # block until every artifact finished loading (or failed)
+        self.start()
+        for future in self._futures.values():
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def ready(self):
+        return self._executor is not None and all(stats['status'] in ('loaded', 'deferred')
+                                                  for stats in self.stats.values())
+
+    def report(self):
+        return {path: dict(stats) for path, stats in self.stats.items()}
@@ -0,0 +1,167 @@
+import itertools
+import unicodedata
+import numpy as np
+
+# separates long_name from short_name inside one row of the index text,
+# rows themselves are separated by '\n' (neither can appear in a folded query)
+NAME_SEP = '\x1f'
+ROW_SEP = '\n'
+
+# rows are indexed in chunks to bound the temporary memory used while hashing
+BUILD_CHUNK_ROWS = 200_000
+
+
+def normalize_name(text):
+    # lowercase and strip accents so that 'mbappe' finds 'Kylian Mbappé'
+    if not isinstance(text, str):
+        return ''
+    if text.isascii():
+        # nothing to decompose, skip the per-character pass
+        folded = text.lower()
+    else:
+        decomposed = unicodedata.normalize('NFKD', text)
+        folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return folded.replace(NAME_SEP, ' ').replace(ROW_SEP, ' ')
+
+
+def _trigram_hashes(codepoints):
+    # 32 bit hash of every window of 3 characters; collisions only add
+    # candidates, which are then rejected by the substring check
+    c = codepoints.astype(np.uint32)
+    return (c[:-2] * np.uint32(0x9E3779B1)) ^ (c[1:-1] * np.uint32(0x85EBCA77)) ^ (c[2:] * np.uint32(0xC2B2AE3D))
+
+
+def _codepoints(text):
+    return np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+
+
+def _sorted_unique(values):
+    # np.unique without the hashing pass, the sort is needed anyway
+    values = np.sort(values)
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    return values[keep]
+
+
+class NameIndex:
+    # Accent-folded substring index over long_name / short_name.
+    #
+    # All folded names live in one UTF-8 byte string (one line per row), so a
+    # candidate row is checked with a single find on its slice (UTF-8 matches
+    # never start mid-character, byte and character matches agree). A trigram posting
+    # list (trigram hash -> sorted row positions) narrows a query down to the
+    # rows containing all of its trigrams; queries shorter than 3 characters
+    # scan the joined string. Matches are produced lazily, in the original
+    # frame order, as row positions: search() stops as soon as `limit` rows
+    # matched, and `after` (the last row position already returned) resumes
+    # a search where a previous page ended.
+    # arrays() / from_arrays() let worker processes share one memory-mapped
+    # copy of the index (see shared_data.py).
+
+    def __init__(self, long_names, short_names):
+        texts = [normalize_name(l) + NAME_SEP + normalize_name(s)
+                 for l, s in zip(long_names, short_names)]
+        self.n_rows = len(texts)
+
+        encoded = [t.encode() for t in texts]
+        lengths = np.fromiter((len(t) + 1 for t in encoded), dtype=np.int64, count=self.n_rows)
+        self._starts = np.zeros(self.n_rows + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._starts[1:])
+        self._text = ROW_SEP.encode().join(encoded) + ROW_SEP.encode()
+
+        self._grams, self._offsets, self._rows = self._build_postings(texts)
+
+    def arrays(self):
+        # (text, {name: array}) holding the whole index
+        return self._text, {'starts': self._starts, 'grams': self._grams,
+                            'offsets': self._offsets, 'rows': self._rows}
+
+    @classmethod
+    def from_arrays(cls, text, arrays):
+        # text: bytes or any buffer with find() (e.g. an mmap), arrays as returned by arrays()
+        index = cls.__new__(cls)
+        index._text = text
+        index._starts, index._grams = arrays['starts'], arrays['grams']
+        index._offsets, index._rows = arrays['offsets'], arrays['rows']
+        index.n_rows = len(index._starts) - 1
+        return index
+
+    def _build_postings(self, texts):
+        keys = []
+        for first in range(0, self.n_rows, BUILD_CHUNK_ROWS):
+            chunk = texts[first:first + BUILD_CHUNK_ROWS]
+            cps = _codepoints(ROW_SEP.join(chunk) + ROW_SEP)
+            if len(cps) < 3:
+                continue
+
+            # drop windows crossing a row or long/short name boundary
+            is_sep = (cps == ord(ROW_SEP)) | (cps == ord(NAME_SEP))
+            valid = ~(is_sep[:-2] | is_sep[1:-1] | is_sep[2:])
+
+            # row of each window start, relative to the chunk
+            row_of_char = np.cumsum(cps == ord(ROW_SEP)) - (cps == ord(ROW_SEP))
+            rows = row_of_char[:-2][valid].astype(np.uint64) + np.uint64(first)
+            grams = _trigram_hashes(cps)[valid].astype(np.uint64)
+
+            # (hash, row) packed in one uint64 so a single sort orders and dedupes both
+            keys.append(_sorted_unique((grams << np.uint64(32)) | rows))
+
+        keys = _sorted_unique(np.concatenate(keys)) if keys else np.empty(0, np.uint64)
+        grams = (keys >> np.uint64(32)).astype(np.uint32)
+        postings = (keys & np.uint64(0xFFFFFFFF)).astype(np.int32)
+
+        # grams are sorted, each posting list starts where the hash changes
+        first_idx = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]]) if len(grams) else np.empty(0, np.int64)
+        unique_grams = grams[first_idx]
+        offsets = np.append(first_idx, len(grams)).astype(np.int64)
+        return unique_grams, offsets, postings
+
+    def _posting(self, gram):
+        i = np.searchsorted(self._grams, gram)
+        if i == len(self._grams) or self._grams[i] != gram:
+            return self._rows[:0]
+        return self._rows[self._offsets[i]:self._offsets[i + 1]]
+
+    def _candidates(self, query):
+        grams = np.unique(_trigram_hashes(_codepoints(query)))
+        postings = sorted((self._posting(g) for g in grams), key=len)
+
+        # start from the rarest trigram and keep rows present in every list
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) == 0:
+                break
+            idx = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+            candidates = candidates[posting[idx] == candidates]
+        return candidates
+
+    def _scan(self, query, first_row):
+        pos = self._text.find(query, self._starts[first_row])
+        while pos != -1:
+            row = int(np.searchsorted(self._starts, pos, side='right')) - 1
+            yield row
+            pos = self._text.find(query, self._starts[row + 1])
+
+    def iter_matches(self, name, after=-1):
+        # row positions after `after` whose long or short name contains `name`
+        query = normalize_name(name)
+        first_row = min(after + 1, self.n_rows)
+
+        if not query:
+            yield from range(first_row, self.n_rows)
+            return
+
+        encoded = query.encode()
+        if len(query) < 3:
+            yield from self._scan(encoded, first_row)
+            return
+
+        candidates = self._candidates(query)
+        for row in candidates[np.searchsorted(candidates, first_row):]:
+            # the trigrams may come from different places in the name,
+            # confirm the full query is a contiguous substring
+            if self._text.find(encoded, self._starts[row], self._starts[row + 1] - 1) != -1:
+                yield int(row)
+
+    def search(self, name, limit=50, after=-1):
+        return np.fromiter(itertools.islice(self.iter_matches(name, after), limit), dtype=np.int64)
@@ -0,0 +1,91 @@
+import os
+import numpy as np
+from moneyballer.embedding_store import normalize_rows, open_embeddings, stored_fingerprint
+
+# Precomputed cosine neighbors of every player in X_proj, so the API serves
+# /find_similar_players with a slice instead of a kneighbors query.
+# Row i of both arrays belongs to row i of X_proj; ids are X_proj row positions.
+# The fingerprint of the embeddings the table was computed from (written in the
+# X_proj.emb header, see embedding_store.py) is saved next to it and compared
+# at load, so a retrain with the same number of players does not serve old
+# neighbors, and no worker has to hash the embeddings at startup.
+NEIGHBOR_IDS_PATH = "raw_data/knn_neighbor_ids.npy"
+NEIGHBOR_SIMS_PATH = "raw_data/knn_neighbor_sims.npy"
+NEIGHBOR_FINGERPRINT_PATH = "raw_data/knn_neighbor_table.sha1"
+
+N_NEIGHBORS = 100
+
+# rows per matrix multiplication, bounds the (block x n_players) similarity matrix
+BLOCK_SIZE = 1024
+
+
+def compute_neighbor_table(X, n_neighbors=N_NEIGHBORS, block_size=BLOCK_SIZE):
+    X = normalize_rows(X)
+    n_players = len(X)
+    k = min(n_neighbors, n_players - 1)
+
+    neighbor_ids = np.empty((n_players, max(k, 0)), dtype=np.int32)
+    neighbor_sims = np.empty((n_players, max(k, 0)), dtype=np.float32)
+    if k <= 0:
+        return neighbor_ids, neighbor_sims
+
+    for start in range(0, n_players, block_size):
+        stop = min(start + block_size, n_players)
+        sims = X[start:stop] @ X.T
+
+        # a player is never its own alternative
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        # unordered top k per row, then sorted by decreasing similarity
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind='stable')
+
+        neighbor_ids[start:stop] = np.take_along_axis(top, order, axis=1)
+        neighbor_sims[start:stop] = np.take_along_axis(top_sims, order, axis=1)
+
+    return neighbor_ids, neighbor_sims
+
+
+def save_neighbor_table(neighbor_ids, neighbor_sims, fingerprint, ids_path=NEIGHBOR_IDS_PATH,
+                        sims_path=NEIGHBOR_SIMS_PATH, fingerprint_path=NEIGHBOR_FINGERPRINT_PATH):
+    # fingerprint: embeddings_fingerprint of the embeddings the table was computed from
+    np.save(ids_path, neighbor_ids.astype(np.int32, copy=False))
+    np.save(sims_path, neighbor_sims.astype(np.float32, copy=False))
+    with open(fingerprint_path, 'w') as file:
+        file.write(fingerprint)
+
+
+def load_neighbor_table(n_players, fingerprint, ids_path=NEIGHBOR_IDS_PATH, sims_path=NEIGHBOR_SIMS_PATH,
+                        fingerprint_path=NEIGHBOR_FINGERPRINT_PATH):
+    # memory-mapped read-only: pages are shared by every worker through the OS
+    # page cache. Returns (None, None) when the table is missing or was computed
+    # from other embeddings than the ones with this fingerprint.
+    if not all(os.path.exists(path) for path in (ids_path, sims_path, fingerprint_path)):
+        print(f"[WARNING] Neighbor table not found ({ids_path}), falling back to kneighbors.")
+        return None, None
+
+    neighbor_ids = np.load(ids_path, mmap_mode='r')
+    neighbor_sims = np.load(sims_path, mmap_mode='r')
+    with open(fingerprint_path) as file:
+        table_fingerprint = file.read().strip()
+
+    if fingerprint is None:
+        print("[WARNING] X_proj.emb has no fingerprint (run make rewrite_embeddings), falling back to kneighbors.")
+        return None, None
+    if (len(neighbor_ids) != n_players or neighbor_ids.shape != neighbor_sims.shape
+            or table_fingerprint != fingerprint):
+        print("[WARNING] Neighbor table does not match X_proj (run make build_neighbor_table), "
+              "falling back to kneighbors.")
+        return None, None
+
+    return neighbor_ids, neighbor_sims
+
+
+if __name__ == '__main__':
+    # rebuild the table from the saved projections without refitting anything
+    _, vectors, _ = open_embeddings()
+    if stored_fingerprint() is None:
+        raise SystemExit("X_proj.emb has no fingerprint, run make rewrite_embeddings first")
+    neighbor_ids, neighbor_sims = compute_neighbor_table(vectors)
+    save_neighbor_table(neighbor_ids, neighbor_sims, stored_fingerprint())
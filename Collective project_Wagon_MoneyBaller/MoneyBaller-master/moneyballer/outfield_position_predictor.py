@@ -4,6 +4,7 @@ from sklearn.preprocessing import MinMaxScaler
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.ensemble import GradientBoostingClassifier
 import pickle
+from moneyballer.forest_export import export_boosting_pipeline
 
 
 # load data (file path readable by the api app)
@@ -48,6 +49,9 @@ Pipe.fit(X, y)
 with open("models/outfield_position_predictor.pkl", "wb") as file:
     pickle.dump(Pipe, file)
 
+# Flat node arrays of the boosted trees for the api's probability scorer (see forest_export.py)
+export_boosting_pipeline(Pipe)
+
 # Load the saved pipeline
 #with open("models/oufield_position_predictor.pkl", "wb") as file:
     #pickle.dump(Pipe, file)
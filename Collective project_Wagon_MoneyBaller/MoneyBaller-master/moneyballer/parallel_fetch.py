@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Concurrent fetching for the Streamlit app.
+#
+# The app used to fetch the faces of a result grid one after the other and to
+# call independent endpoints on separate clicks, so a page took the sum of
+# its requests. fetch_all() runs a list of blocking calls (requests, image
+# cache lookups) on one shared thread pool and returns once all of them are
+# done, so a page takes about as long as its slowest request. Every call
+# keeps its own request timeout; `timeout` bounds the whole batch on top.
+
+# enough threads for a 50-face grid in one wave
+FETCH_WORKERS = 64
+
+_executor = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="moneyballer-fetch")
+
+
+def fetch_all(calls, timeout=None, default=None):
+    # results of the zero-argument callables, in order; `default` for a call that
+    # raised or was still running `timeout` seconds after the start
+    futures = [_executor.submit(call) for call in calls]
+    done, _ = wait(futures, timeout=timeout)
+
+    results = []
+    for future in futures:
+        if future not in done or future.exception() is not None:
+            # a late call still finishes in the background, its result is dropped
+            results.append(default)
+        else:
+            results.append(future.result())
+    return results
+
+
+def fetch_each(calls, timeout=None):
+    # like fetch_all, with the exception (TimeoutError when late) in place of each failed result
+    futures = [_executor.submit(call) for call in calls]
+    done, _ = wait(futures, timeout=timeout)
+    return [(future.exception() or future.result()) if future in done
+            else TimeoutError(f"no answer after {timeout} s") for future in futures]
+
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+
+def primary_positions(player_positions):
+    # first listed position, same rule as the streamlit app
+    return player_positions.str.strip().str.split(',').str[0].str.upper()
+
+
+class PlayerFilterArrays:
+    # Compact copies of the columns the similarity filters use, one entry per
+    # row of X_proj, so candidate neighbors are filtered on small numpy arrays
+    # before any DataFrame row is materialized.
+    # Categorical columns are stored as int codes, value and age as float32
+    # with missing values as 0 (like the app did client-side).
+
+    CATEGORICAL = {
+        'leagues': 'league_name',
+        'nationalities': 'nationality_name',
+        'positions': 'primary_position',
+        'feet': 'preferred_foot',
+    }
+
+    def __init__(self, df, player_ids):
+        rows = df.reindex(player_ids)
+        rows = rows.assign(primary_position=primary_positions(rows['player_positions']))
+
+        self.n_players = len(rows)
+        self.codes = {}
+        self.categories = {}
+        for name, column in self.CATEGORICAL.items():
+            categorical = pd.Categorical(rows[column])
+            self.codes[name] = categorical.codes.astype(np.int16)
+            self.categories[name] = categorical.categories
+
+        self.value_eur = rows['value_eur'].fillna(0).to_numpy(dtype=np.float32)
+        self.age = rows['age'].fillna(0).to_numpy(dtype=np.float32)
+
+    def arrays(self):
+        # ({name: array}, {filter: categories}), everything the filters need
+        arrays = {f"codes_{name}": codes for name, codes in self.codes.items()}
+        arrays.update(value_eur=self.value_eur, age=self.age)
+        return arrays, {name: categories.tolist() for name, categories in self.categories.items()}
+
+    @classmethod
+    def from_arrays(cls, arrays, categories):
+        # arrays may be read-only memory maps shared by several processes
+        filters = cls.__new__(cls)
+        filters.codes = {name: arrays[f"codes_{name}"] for name in cls.CATEGORICAL}
+        filters.categories = {name: pd.Index(categories[name]) for name in cls.CATEGORICAL}
+        filters.value_eur, filters.age = arrays['value_eur'], arrays['age']
+        filters.n_players = len(filters.age)
+        return filters
+
+    def options(self):
+        # values the filters can take, for the app's widgets
+        options = {name: sorted(categories.tolist()) for name, categories in self.categories.items()}
+        options['max_value'] = float(self.value_eur.max()) if self.n_players else 0.0
+        options['min_age'] = float(self.age.min()) if self.n_players else 0.0
+        options['max_age'] = float(self.age.max()) if self.n_players else 0.0
+        return options
+
+    def mask(self, rows, leagues=None, nationalities=None, positions=None, feet=None,
+             min_value=None, max_value=None, min_age=None, max_age=None):
+        # boolean mask over `rows` (X_proj row positions); empty or None filters are ignored
+        keep = np.ones(len(rows), dtype=bool)
+
+        wanted = {'leagues': leagues, 'nationalities': nationalities,
+                  'positions': positions, 'feet': feet}
+        for name, values in wanted.items():
+            if values:
+                if name == 'positions':
+                    values = [value.strip().upper() for value in values]
+                wanted_codes = self.categories[name].get_indexer(values)
+                keep &= np.isin(self.codes[name][rows], wanted_codes[wanted_codes >= 0])
+
+        if min_value is not None:
+            keep &= self.value_eur[rows] >= min_value
+        if max_value is not None:
+            keep &= self.value_eur[rows] <= max_value
+        if min_age is not None:
+            keep &= self.age[rows] >= min_age
+        if max_age is not None:
+            keep &= self.age[rows] <= max_age
+
+        return keep
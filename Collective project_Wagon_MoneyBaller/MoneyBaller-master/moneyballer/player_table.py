@@ -0,0 +1,81 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Column-pruned, downcast copy of the FC26 player table for the API.
+#
+# The api only serves the columns below; the build step keeps those, stores
+# 1-99 stats as int8/int16 (float32 when a column has NaNs, e.g. pace for
+# goalkeepers), repeated strings as categoricals, and writes a Feather file
+# that loads without any CSV parsing or type inference.
+PLAYER_CSV_PATH = "raw_data/FC26_20250921.csv"
+PLAYER_TABLE_PATH = "raw_data/FC26_api.feather"
+
+API_COLUMNS = [
+    'player_id', 'long_name', 'short_name', 'nationality_name',
+    'club_name', 'player_positions', 'overall', 'player_face_url',
+    'pace', 'shooting', 'passing', 'dribbling', 'defending',
+    'physic', 'value_eur', 'preferred_foot', 'age', 'league_name', 'club_contract_valid_until_year',
+    'goalkeeping_diving', 'goalkeeping_handling', 'goalkeeping_kicking',
+    'goalkeeping_positioning', 'goalkeeping_reflexes', 'goalkeeping_speed'
+]
+
+CATEGORICAL_COLUMNS = ['club_name', 'league_name', 'nationality_name', 'player_positions', 'preferred_foot']
+
+# largest integer float32 holds exactly
+FLOAT32_EXACT_MAX = 2 ** 24
+
+
+def downcast_numeric(series):
+    values = pd.to_numeric(series)
+
+    if values.isna().any():
+        # NaNs rule out plain ints; float32 as long as every value stays exact
+        if values.abs().max() <= FLOAT32_EXACT_MAX:
+            return values.astype(np.float32)
+        return values.astype(np.float64)
+
+    if (values == values.round()).all():
+        return pd.to_numeric(values.astype(np.int64), downcast='integer')
+    return pd.to_numeric(values, downcast='float')
+
+
+def prepare_player_table(df):
+    # keep API columns, downcast numbers, categorize repeated strings
+    df = df[[column for column in API_COLUMNS if column in df.columns]].copy()
+
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif column != 'player_id' and pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = downcast_numeric(df[column])
+
+    df['player_id'] = df['player_id'].astype(np.int64)
+    return df
+
+
+def build_player_table(csv_path=PLAYER_CSV_PATH, table_path=PLAYER_TABLE_PATH):
+    df = pd.read_csv(csv_path, usecols=lambda column: column in API_COLUMNS, low_memory=False)
+    df = prepare_player_table(df)
+
+    # write next to the target then rename, the api never reads a partial file
+    tmp_path = f"{table_path}.tmp"
+    df.reset_index(drop=True).to_feather(tmp_path)
+    os.replace(tmp_path, table_path)
+    return df
+
+
+def load_player_table(table_path=PLAYER_TABLE_PATH, csv_path=PLAYER_CSV_PATH):
+    # player table indexed by player_id, from the Feather cache when it exists
+    if os.path.exists(table_path):
+        df = pd.read_feather(table_path)
+    else:
+        print(f"[WARNING] {table_path} not found, building the player table from {csv_path}.")
+        df = pd.read_csv(csv_path, usecols=lambda column: column in API_COLUMNS, low_memory=False)
+        df = prepare_player_table(df)
+
+    return df.set_index('player_id')
+
+
+if __name__ == '__main__':
+    build_player_table()
@@ -4,6 +4,7 @@ from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import FunctionTransformer
+from moneyballer.embedding_store import write_embeddings
 
 # load data (file path readable by the api app)
 df = pd.read_csv("raw_data/FC26_20250921.csv", low_memory=False)
@@ -67,4 +68,11 @@ X_proj_array = projection_pipeline.fit_transform(X)
 # PLAYER ID AS INDEX FOR EASE OF SEARCHING DOWN THE LINE
 X_proj = pd.DataFrame(X_proj_array, index=X["player_id"].values)
 
-X_proj.to_csv("raw_data/X_proj.csv")
+# binary float32 store the api memory-maps at startup (see embedding_store.py)
+write_embeddings(X_proj_array, X["player_id"].values, metadata={
+    'source': "raw_data/FC26_20250921.csv",
+    'features': detailed_skill_attributes,
+    'n_components': int(pca.n_components_),
+    'explained_variance_ratio': pca.explained_variance_ratio_.tolist(),
+    'explained_variance_total': float(pca.explained_variance_ratio_.sum()),
+})
@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import cProfile
+import io
+import pstats
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import parse_qs
+
+# Opt-in profiling of single requests.
+#
+# With profiling enabled in the config, a request sent with the header
+# "X-Profile: 1" (or ?profile=1) gets a Server-Timing header listing the
+# duration of every handler stage (the same stages as /metrics) plus the total.
+# "X-Profile: cprofile" (or ?profile=cprofile) also runs cProfile over the
+# handler and keeps the call summary, readable at /profiles/<X-Profile-Id>.
+
+current_profile = contextvars.ContextVar('moneyballer_request_profile', default=None)
+
+
+class RequestProfile:
+
+    def __init__(self, cprofile=False):
+        self.stages = []
+        self.profiler = cProfile.Profile() if cprofile else None
+
+    def add(self, labels, seconds):
+        # labels of the timed stage, e.g. ('find_similar_players', 'kneighbors')
+        self.stages.append((labels, seconds))
+
+    def server_timing(self, total_seconds):
+        entries = [f'{labels[-1]};desc="{"/".join(labels[:-1])}";dur={1000 * seconds:.3f}'
+                   for labels, seconds in self.stages]
+        entries.append(f'total;dur={1000 * total_seconds:.3f}')
+        return ', '.join(entries)
+
+    def summary(self, limit=30):
+        # top functions by cumulative time
+        output = io.StringIO()
+        pstats.Stats(self.profiler, stream=output).sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+
+def profiled(fn):
+    # endpoint decorator: runs cProfile in the thread executing the handler when
+    # the request asked for it (plain def endpoints run in the threadpool, so
+    # profiling in the middleware would miss them); for async endpoints the
+    # profile also sees whatever else the event loop runs meanwhile
+    if asyncio.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            profile = current_profile.get()
+            if profile is None or profile.profiler is None:
+                return await fn(*args, **kwargs)
+            profile.profiler.enable()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                profile.profiler.disable()
+    else:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = current_profile.get()
+            if profile is None or profile.profiler is None:
+                return fn(*args, **kwargs)
+            profile.profiler.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.profiler.disable()
+    return wrapper
+
+
+class ProfileStore:
+    # call summaries of the last max_entries profiled requests
+
+    def __init__(self, max_entries=50):
+        self.max_entries = max_entries
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, summary):
+        profile_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            self._summaries[profile_id] = summary
+            while len(self._summaries) > self.max_entries:
+                self._summaries.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._summaries.get(profile_id)
+
+
+def requested_profile(scope):
+    # None, "1" or "cprofile", from the X-Profile header or the profile query parameter
+    for name, value in scope['headers']:
+        if name == b'x-profile':
+            return value.decode('latin-1').strip().lower()
+    if b'profile=' in scope.get('query_string', b''):
+        values = parse_qs(scope['query_string'].decode('latin-1')).get('profile')
+        if values:
+            return values[0].strip().lower()
+    return None
+
+
+class ProfilingMiddleware:
+    # ASGI middleware adding Server-Timing (and X-Profile-Id) to requests asking for it
+
+    def __init__(self, app, store, enabled=False):
+        self.app = app
+        self.store = store
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        mode = requested_profile(scope)
+        if mode in (None, '', '0', 'false'):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(cprofile=mode == 'cprofile')
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers', []))
+                timing = profile.server_timing(time.perf_counter() - start)
+                headers.append((b'server-timing', timing.encode('latin-1')))
+                headers.append((b'timing-allow-origin', b'*'))
+                if profile.profiler is not None:
+                    profile_id = self.store.add(profile.summary())
+                    headers.append((b'x-profile-id', profile_id.encode('latin-1')))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# In-process LRU cache of endpoint results.
+#
+# Keys are the normalized request inputs prefixed with a version hash of the
+# artifacts the endpoint reads (path, size and modification time of each
+# file, plus settings such as the similarity index). The version is taken once,
+# when the api starts, next to loading those artifacts: a retrained model or
+# rebuilt table is only served, and its results only cached, after a restart
+# or redeploy. The caches live in process memory, so a restart starts them empty;
+# the version shows in /result_cache which artifacts a process runs with.
+# Each cache holds at most max_entries results and evicts the least recently
+# used one; hits, misses and evictions are counted for /result_cache.
+
+MISSING = object()
+
+
+def artifact_version(paths, settings=()):
+    # short hash of the artifact files as they are on disk now (and of settings changing the results)
+    digest = hashlib.sha1(repr(tuple(settings)).encode())
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    return digest.hexdigest()[:12]
+
+
+def normalize_values(values):
+    # numbers as floats ("80" and 80.0 are the same request), lists as sorted tuples
+    normalized = []
+    for value in values:
+        if value is None:
+            normalized.append(None)
+        elif isinstance(value, (list, tuple, set)):
+            normalized.append(tuple(sorted(set(value))))
+        else:
+            normalized.append(float(value))
+    return tuple(normalized)
+
+
+class ResultCache:
+
+    def __init__(self, max_entries, version=''):
+        self.max_entries = int(max_entries)
+        self.version = version
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, *values):
+        return (self.version,) + normalize_values(values)
+
+    def get(self, key):
+        # cached value, or MISSING
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'version': self.version,
+            'max_entries': self.max_entries,
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
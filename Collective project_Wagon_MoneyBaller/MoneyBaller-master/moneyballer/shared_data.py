@@ -0,0 +1,175 @@
+import fcntl
+import json
+import mmap
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from moneyballer.autocomplete import PrefixIndex
+from moneyballer.embedding_store import EMBEDDINGS_PATH, open_embeddings
+from moneyballer.json_rows import RESPONSE_SHAPES, JsonRows
+from moneyballer.name_index import NameIndex
+from moneyballer.neighbor_table import normalize_rows
+from moneyballer.player_filters import PlayerFilterArrays
+from moneyballer.player_table import PLAYER_CSV_PATH, PLAYER_TABLE_PATH, load_player_table
+from moneyballer.result_cache import artifact_version
+
+# Player data shared by api worker processes through memory-mapped files.
+#
+# Every uvicorn worker is its own process and used to rebuild, and hold, its
+# own player table, name index, unit-norm embeddings and filter arrays. In
+# shared mode (SHARED_DATA=1) they are written once to raw_data/shared/<version>/
+# and every worker maps the files read-only, so their pages sit once in the
+# OS page cache whatever the number of workers:
+#
+#   players.arrow   player table as an Arrow IPC file: numeric columns become
+#                   numpy arrays and string columns Arrow strings over the
+#                   mapped pages (only categorical codes are copied, 1-2 bytes per player)
+#   names.bin       name index text (UTF-8), name_*.npy its posting arrays
+#   prefixes.bin    autocomplete keys (UTF-8), prefix_*.npy their offsets and ranks
+#   X_unit.npy      unit-norm embeddings searched by find_similar_players
+#   filter_*.npy    similarity filter arrays
+#   rows_*.bin      pre-serialized JSON rows per response shape, rows_*_starts.npy their offsets
+#   manifest.json   sizes, filter categories
+#
+# <version> hashes the source files (and the response columns), so a rebuilt
+# player table or embedding file gets a new directory. The first process needing a version builds it
+# under a file lock, the others wait for it and attach. The embeddings and the
+# neighbor table are memory-mapped from their own files already.
+SHARED_DATA_DIR = "raw_data/shared"
+SOURCE_FILES = [PLAYER_TABLE_PATH, PLAYER_CSV_PATH, EMBEDDINGS_PATH]
+MANIFEST = "manifest.json"
+
+# same dtype as pd.read_feather gives string columns, backed by the mapped Arrow buffers
+STRING_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+
+
+def write_player_table(df, path):
+    # player table indexed by player_id -> Arrow IPC file (uncompressed, so it can be mapped)
+    columns = {'player_id': pa.array(df.index.to_numpy(dtype=np.int64))}
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(column):
+            columns[name] = pa.array(column)
+        else:
+            # numpy values as they are: NaNs stay NaNs (not Arrow nulls), so reading needs no copy
+            columns[name] = pa.array(column.to_numpy())
+    table = pa.table(columns)
+    with pa.OSFile(path, 'wb') as file, pa.ipc.new_file(file, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_player_table(path):
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    # split_blocks: one block per column, pandas does not consolidate (copy) them
+    df = table.to_pandas(split_blocks=True, types_mapper={pa.string(): STRING_DTYPE, pa.large_string(): STRING_DTYPE}.get)
+    df.index = pd.Index(df.pop('player_id'), name='player_id')
+    return df
+
+
+def map_bytes(path):
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def build_shared_data(directory):
+    # derive everything from the player table and embeddings, written next to the target then renamed
+    df = load_player_table()
+    if not os.path.exists(EMBEDDINGS_PATH):
+        raise FileNotFoundError(f"Shared data needs {EMBEDDINGS_PATH}, run python -m moneyballer.preprocessor")
+    X_ids, X_vectors, _ = open_embeddings(EMBEDDINGS_PATH)
+
+    tmp_directory = f"{directory}.tmp{os.getpid()}"
+    os.makedirs(tmp_directory)
+    write_player_table(df, os.path.join(tmp_directory, "players.arrow"))
+
+    text, name_arrays = NameIndex(df['long_name'], df['short_name']).arrays()
+    with open(os.path.join(tmp_directory, "names.bin"), 'wb') as file:
+        file.write(text)
+    for name, array in name_arrays.items():
+        np.save(os.path.join(tmp_directory, f"name_{name}.npy"), array)
+
+    text, prefix_arrays = PrefixIndex(df['long_name'], df['short_name'], df['overall']).arrays()
+    with open(os.path.join(tmp_directory, "prefixes.bin"), 'wb') as file:
+        file.write(text)
+    for name, array in prefix_arrays.items():
+        np.save(os.path.join(tmp_directory, f"prefix_{name}.npy"), array)
+
+    np.save(os.path.join(tmp_directory, "X_unit.npy"), normalize_rows(X_vectors))
+
+    filter_arrays, categories = PlayerFilterArrays(df, pd.Index(np.asarray(X_ids))).arrays()
+    for name, array in filter_arrays.items():
+        np.save(os.path.join(tmp_directory, f"filter_{name}.npy"), array)
+
+    for shape, columns in RESPONSE_SHAPES.items():
+        text, row_arrays = JsonRows(df, columns).arrays()
+        with open(os.path.join(tmp_directory, f"rows_{shape}.bin"), 'wb') as file:
+            file.write(text)
+        np.save(os.path.join(tmp_directory, f"rows_{shape}_starts.npy"), row_arrays['starts'])
+
+    with open(os.path.join(tmp_directory, MANIFEST), 'w') as file:
+        json.dump({'n_players': len(df), 'n_embeddings': len(X_ids), 'filter_categories': categories}, file)
+    os.rename(tmp_directory, directory)
+
+
+class SharedData:
+    # the api's player data, attached read-only from a shared data directory
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST)) as file:
+            self.manifest = json.load(file)
+
+        def load(name):
+            return np.load(os.path.join(directory, name), mmap_mode='r')
+
+        self.df = read_player_table(os.path.join(directory, "players.arrow"))
+        self.name_index = NameIndex.from_arrays(
+            map_bytes(os.path.join(directory, "names.bin")),
+            {name: load(f"name_{name}.npy") for name in ['starts', 'grams', 'offsets', 'rows']})
+
+        self.autocomplete = PrefixIndex.from_arrays(
+            map_bytes(os.path.join(directory, "prefixes.bin")),
+            {name: load(f"prefix_{name}.npy") for name in ['starts', 'ranks', 'order']})
+
+        X_ids, self.X_vectors, self.X_metadata = open_embeddings(EMBEDDINGS_PATH)
+        self.X_index = pd.Index(np.asarray(X_ids))
+        self.X_unit = load("X_unit.npy")
+
+        filter_names = [f"codes_{name}" for name in PlayerFilterArrays.CATEGORICAL] + ['value_eur', 'age']
+        self.player_filters = PlayerFilterArrays.from_arrays(
+            {name: load(f"filter_{name}.npy") for name in filter_names}, self.manifest['filter_categories'])
+
+        self.json_rows = {
+            shape: JsonRows.from_arrays(map_bytes(os.path.join(directory, f"rows_{shape}.bin")),
+                                        {'starts': load(f"rows_{shape}_starts.npy")})
+            for shape in RESPONSE_SHAPES
+        }
+
+
+def attach_shared_data(root=SHARED_DATA_DIR):
+    # SharedData for the current source files, built by the first process that needs it
+    shapes = sorted((shape, tuple(columns)) for shape, columns in RESPONSE_SHAPES.items())
+    version = artifact_version(SOURCE_FILES, settings=shapes)
+    directory = os.path.join(root, version)
+    os.makedirs(root, exist_ok=True)
+
+    with open(os.path.join(root, ".lock"), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(os.path.join(directory, MANIFEST)):
+            build_shared_data(directory)
+            # older versions (and leftovers of interrupted builds); processes
+            # still mapping their files keep them until they exit
+            for name in os.listdir(root):
+                if name not in (version, ".lock"):
+                    shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    return SharedData(directory)
+
+
+if __name__ == '__main__':
+    # build (or reuse) the shared data of the current files before starting the workers
+    shared = attach_shared_data()
+    print(f"{shared.directory}: {shared.manifest['n_players']} players, {shared.manifest['n_embeddings']} embeddings")
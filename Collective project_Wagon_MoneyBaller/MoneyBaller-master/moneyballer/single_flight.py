@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+# Single-flight coalescing of identical in-flight requests.
+#
+# The first request for a key (the leader) runs the computation; requests for
+# the same key arriving before it finishes wait for that result instead of
+# computing it again, and get its exception if it fails. Nothing is kept once
+# the computation is done, repeated requests after that are the result cache's job.
+#
+# do() is for handlers running in the threadpool (plain def endpoints),
+# do_async() for async handlers; the async computation runs as its own task,
+# so a client going away does not cancel it for the others.
+
+
+class SingleFlight:
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        if not self.enabled:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key, coroutine_fn):
+        if not self.enabled:
+            return await coroutine_fn()
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(coroutine_fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        requests = self.executions + self.coalesced
+        return {
+            'enabled': self.enabled,
+            'in_flight': len(self._calls) + len(self._tasks),
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'coalesced_rate': round(self.coalesced / requests, 4) if requests else None,
+        }
@@ -1,10 +1,11 @@
 import streamlit as st
-import requests
 import pandas as pd
-from io import BytesIO
-import base64
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from functools import partial
+from moneyballer.client import MoneyBallerClient, MoneyBallerError
+from moneyballer.image_cache import FaceImageCache
+from moneyballer.parallel_fetch import fetch_all, fetch_each
 
 # ==============================
 # CONFIG
@@ -16,17 +17,12 @@ st.set_page_config(page_title="🚶‍➡️💚 Select a talent", layout="wide"
 # local host: http://127.0.0.1:PORT (change PORT to your local port)
 
 
-GET_PLAYER_ID_API_URL = "https://apihr-974875114263.europe-west1.run.app/get_player_id"
-SIMILAR_ALTERNATIVES_API_URL = "https://apihr-974875114263.europe-west1.run.app/find_similar_players"
-OUTFIELD_VALUATION_API_URL = "https://apihr-974875114263.europe-west1.run.app/outfield_valuation"
-GOALKEEPER_VALUATION_API_URL = "https://apihr-974875114263.europe-west1.run.app/goalkeeper_valuation"
-POSITION_PREDICTOR_API_URL = "https://apihr-974875114263.europe-west1.run.app/outfield_position_predictor"
+API_URL = "https://apihr-974875114263.europe-west1.run.app"
+# API_URL = "http://127.0.0.1:1234"
 
-# GET_PLAYER_ID_API_URL = "http://127.0.0.1:1234/get_player_id"
-# SIMILAR_ALTERNATIVES_API_URL = "http://127.0.0.1:1234/find_similar_players"
-# OUTFIELD_VALUATION_API_URL = "http://127.0.0.1:1234/outfield_valuation"
-# GOALKEEPER_VALUATION_API_URL = "http://127.0.0.1:1234/goalkeeper_valuation"
-# POSITION_PREDICTOR_API_URL = "http://127.0.0.1:1234/outfield_position_predictor"
+
+# number of similar alternatives displayed
+TOP_K_ALTERNATIVES = 5
 
 # --- Session State Initialization ---
 if 'selected_player_id' not in st.session_state:
@@ -55,27 +51,45 @@ def clear_selected_on_search():
 
 
 
+# One pooled, cached API client for every session (moneyballer/client.py)
+@st.cache_resource(show_spinner=False)
+def api_client():
+    return MoneyBallerClient(API_URL)
+
+
+# Faces fetched once, then served as data URIs from memory / disk (moneyballer/image_cache.py)
+@st.cache_resource(show_spinner=False)
+def face_image_cache():
+    return FaceImageCache()
+
+
+# Fallback SVG placeholder (embedded data URI) if image not available
+NO_IMAGE_SRC = "data:image/svg+xml;utf8," + (
+    "<svg xmlns='http://www.w3.org/2000/svg' width='100' height='100'>"
+    "<rect width='100%' height='100%' fill='%23161b22'/>"
+    "<text x='50%' y='50%' fill='%239aa0a6' font-size='10' font-family='Arial' "
+    "dominant-baseline='middle' text-anchor='middle'>No Image</text>"
+    "</svg>"
+)
+
+
 # Return image
 def get_image_base64(image_url):
-    try:
-        resp_img = requests.get(image_url, timeout=5)
-        content_type = resp_img.headers.get('content-type', '')
-        if resp_img.status_code == 200 and content_type.startswith('image') and resp_img.content:
-            image_bytes = BytesIO(resp_img.content)
-            b64 = base64.b64encode(image_bytes.getvalue()).decode('utf-8')
-            img_src = f"data:{content_type};base64,{b64}"
-            return img_src
-    except Exception:
-        pass
-    # Fallback SVG placeholder (embedded data URI) if image not available
-    svg = (
-        "<svg xmlns='http://www.w3.org/2000/svg' width='100' height='100'>"
-        "<rect width='100%' height='100%' fill='%23161b22'/>"
-        "<text x='50%' y='50%' fill='%239aa0a6' font-size='10' font-family='Arial' "
-        "dominant-baseline='middle' text-anchor='middle'>No Image</text>"
-        "</svg>"
-    )
-    return "data:image/svg+xml;utf8," + svg
+    return face_image_cache().data_uri(image_url) or NO_IMAGE_SRC
+
+
+# Images of a whole grid of cards, fetched concurrently
+FACE_GRID_TIMEOUT = 10
+
+def get_images_base64(image_urls):
+    cache = face_image_cache()
+    calls = [partial(cache.data_uri, url if isinstance(url, str) else '') for url in image_urls]
+    return [img_src or NO_IMAGE_SRC for img_src in fetch_all(calls, timeout=FACE_GRID_TIMEOUT)]
+
+# Filter values (leagues, nationalities, ...) only change when the API data changes
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_filter_options():
+    return api_client().filter_options()
 
 # Map positions to pitch coordinates
 position_to_coords = {
@@ -276,56 +290,60 @@ player_name = st.text_input(
 if player_name and not st.session_state.get('selected_player_id'):
     try:
         with st.spinner(f"🔎 Searching for '{player_name}'..."):
-            response = requests.get(GET_PLAYER_ID_API_URL, params={"name": player_name})
+            data = api_client().search_players(player_name)
 
 
-        if response.status_code == 200:
-            data = response.json()
-            if len(data) > 0:
-                df = pd.DataFrame(data)
+        if len(data) > 0:
+            df = pd.DataFrame(data)
 
 
-                # limit displayed results to top N matches to keep cards aligned
-                TOP_N = 9
-                total_matches = len(df)
-                df = df.head(TOP_N)
-                st.markdown(f"### 🧩 Matching Players Found — showing top {len(df)} of {total_matches} matches")
+            # limit displayed results to top N matches to keep cards aligned
+            TOP_N = 9
+            total_matches = len(df)
+            df = df.head(TOP_N)
+            st.markdown(f"### 🧩 Matching Players Found — showing top {len(df)} of {total_matches} matches")
 
 
-                cols = st.columns(3) # Display search results in columns
-                for i, row in df.iterrows():
-                    with cols[i % 3]:
-                        # Card structure for search results
-                        img_src = get_image_base64(row.get('player_face_url') or '')
+            # every card's face requested at once
+            img_srcs = get_images_base64(df['player_face_url'].tolist())
 
+            cols = st.columns(3) # Display search results in columns
+            for i, row in df.iterrows():
+                with cols[i % 3]:
+                    # Card structure for search results
+                    img_src = img_srcs[i]
 
-                        st.markdown(f"""
-                        <div class="player-card small" style="border-left: 8px solid #FF5252; display:flex; align-items:center; gap:1rem;">
-                        <img src="{img_src}" alt="player" />
-                        <div style="flex:1 1 auto; text-align:left;">
-                            <h3 class="title">{row.get('short_name')} ({row.get('overall')})</h3>
-                            <div class="info-text" style="margin-top:0.25rem;">
-                                <b>ID:</b> {row['player_id']} | <b>Club:</b> {row['club_name']}<br>
-                                <b>Position(s):</b> {row['player_positions']}
-                            </div>
+
+                    st.markdown(f"""
+                    <div class="player-card small" style="border-left: 8px solid #FF5252; display:flex; align-items:center; gap:1rem;">
+                    <img src="{img_src}" alt="player" />
+                    <div style="flex:1 1 auto; text-align:left;">
+                        <h3 class="title">{row.get('short_name')} ({row.get('overall')})</h3>
+                        <div class="info-text" style="margin-top:0.25rem;">
+                            <b>ID:</b> {row['player_id']} | <b>Club:</b> {row['club_name']}<br>
+                            <b>Position(s):</b> {row['player_positions']}
                         </div>
                     </div>
-                        """, unsafe_allow_html=True)
+                </div>
+                    """, unsafe_allow_html=True)
 
 
-                        # Select button logic
-                        if st.button("Select Player", key=f"select_{int(row['player_id'])}"):
-                            player_id_int = int(row['player_id'])
-                            st.session_state['selected_player_id'] = player_id_int
-                            st.session_state['selected_player_details'] = row.to_dict()
-                            st.toast(f"✅ Selected {row['long_name']}!", icon="⚽")
-                            st.rerun()
+                    # Select button logic
+                    if st.button("Select Player", key=f"select_{int(row['player_id'])}"):
+                        player_id_int = int(row['player_id'])
+                        st.session_state['selected_player_id'] = player_id_int
+                        st.session_state['selected_player_details'] = row.to_dict()
+                        st.toast(f"✅ Selected {row['long_name']}!", icon="⚽")
+                        st.rerun()
 
 
-            else:
-                st.warning(f"No players found for: **{player_name}**")
         else:
-            st.error(f"API Error ({response.status_code}): Could not fetch players.")
+            st.warning(f"No players found for: **{player_name}**")
+    except MoneyBallerError as e:
+        if e.status_code is None:
+            st.error(f"Error connecting to API: {e}")
+        else:
+            st.error(f"API Error ({e.status_code}): Could not fetch players.")
     except Exception as e:
         st.error(f"Error connecting to API: {e}")
 
@@ -414,202 +432,172 @@ if selected_id and selected_details:
     # SIMILAR PLAYER RECOMMENDATIONS
     # ==============================
     try:
+        filter_options = get_filter_options()
+
+        # Value bounds - min_val set to 0 forcibly
+        min_val = 0
+        max_val = int(filter_options.get('max_value') or 0)
+
+        # Age bounds
+        min_age = int(filter_options.get('min_age') or 0)
+        max_age = int(filter_options.get('max_age') or 0)
+
+        # --- Filters (Nationality + Value + Position + Preferred Foot), applied by the API ---
+        # Show filters inside an expander with enhanced heading styling
+        with st.expander("⚽ Player Filters 🎯", expanded=True):
+            cols_f = st.columns([2, 1, 1, 1])
+            with cols_f[0]:
+                selected_leagues = st.multiselect("🏆 League", options=filter_options['leagues'], default=[])
+            with cols_f[1]:
+                selected_nationalities = st.multiselect("🌍 Nationality", options=filter_options['nationalities'], default=[])
+            with cols_f[2]:
+                selected_positions = st.multiselect("📌 Primary Position", options=filter_options['positions'], default=[])
+            with cols_f[3]:
+                selected_feet = st.multiselect("🦶 Preferred Foot", options=filter_options['feet'], default=[])
+            with cols_f[0]:
+                # value slider; step is coarse so we use an approximate step
+                step = max(1, (max_val - min_val) // 50) if max_val > min_val else 1
+                value_range = st.slider("💶 Player value (EUR)", min_val, max_val, (min_val, max_val), step=step)
+            with cols_f[1]:
+                # show the readable min/max next to the slider
+                st.markdown(f"**Min:** {eur(value_range[0]) if 'eur' in globals() else f'€{value_range[0]:,}'}  ")
+                st.markdown(f"**Max:** {eur(value_range[1]) if 'eur' in globals() else f'€{value_range[1]:,}'}  ")
+            with cols_f[3]:
+                # value slider; step is coarse so we use an approximate step
+                age_range = st.slider("📅 Player age", min_age, max_age, (min_age, max_age), step=1)
+
+        # The API filters, sorts by similarity and keeps the top 5
+        similar_params = {
+            "player_id": selected_id, "k": TOP_K_ALTERNATIVES,
+            "leagues": selected_leagues, "nationalities": selected_nationalities,
+            "positions": selected_positions, "feet": selected_feet,
+            "min_value": value_range[0], "max_value": value_range[1],
+            "min_age": age_range[0], "max_age": age_range[1],
+        }
+
         with st.spinner("⚙️ Analyzing player embeddings..."):
-            response = requests.get(SIMILAR_ALTERNATIVES_API_URL, params={"player_id": selected_id})
-
-
-        if response.status_code == 200:
-            data = response.json()
-            if len(data) > 0:
-                df = pd.DataFrame(data) # similar players (usually up to 100)
-
-
-                # Check whether the selected player is a goalkeeper (use selected details to be safe)
-                sel_pos = selected_details.get('player_positions') if selected_details else ''
-                player_is_goalkeeper = (sel_pos or '').split(',')[0] == 'GK'
-
-
-                # Format Value for display and format similarity to percentage
-                df['value_display'] = df['value_eur'].apply(lambda x: f'€{int(x):,}')
-                df['similarity_pct'] = df['similarity'].apply(lambda x: f'{x:.2%}')
-
-
-                # Take the first given position as a player's primary position (new column)
-                df['primary_position'] = df['player_positions'].str.strip().str.split(',').str[0].str.upper()
-
-
-                # --- Filters (Nationality + Value + Position + Preferred Foot) ---
-                # Prepare options for nationality, position, and preferred foot
-                nat_options = sorted(df['nationality_name'].dropna().unique().tolist())
-                league_options = sorted(df['league_name'].dropna().unique().tolist())
-                pos_options = sorted(df['primary_position'].dropna().unique().tolist())
-                foot_options = sorted(df['preferred_foot'].dropna().unique().tolist())
-
-                # Compute value bounds - min_val set to 0 forcibly
-                try:
-                    min_val = 0
-                    max_val = int(df['value_eur'].max()) if pd.notnull(df['value_eur'].max()) else 0
-                except Exception:
-                    min_val, max_val = 0, 0
-
-                # Compute age bounds - min_val set to 0 forcibly
-                try:
-                    min_age = int(df['age'].min()) if pd.notnull(df['age'].min()) else 0
-                    max_age = int(df['age'].max()) if pd.notnull(df['age'].max()) else 0
-                except Exception:
-                    min_age, max_age = 0, 0
-
-                # Show filters inside an expander with enhanced heading styling
-                with st.expander("⚽ Player Filters 🎯", expanded=True):
-                    cols_f = st.columns([2, 1, 1, 1])
-                    with cols_f[0]:
-                        selected_leagues = st.multiselect("🏆 League", options=league_options, default=[])
-                    with cols_f[1]:
-                        selected_nationalities = st.multiselect("🌍 Nationality", options=nat_options, default=[])
-                    with cols_f[2]:
-                        selected_positions = st.multiselect("📌 Primary Position", options=pos_options, default=[])
-                    with cols_f[3]:
-                        selected_feet = st.multiselect("🦶 Preferred Foot", options=foot_options, default=[])
-                    with cols_f[0]:
-                        # value slider; step is coarse so we use an approximate step
-                        step = max(1, (max_val - min_val) // 50) if max_val > min_val else 1
-                        value_range = st.slider("💶 Player value (EUR)", min_val, max_val, (min_val, max_val), step=step)
-                    with cols_f[1]:
-                        # show the readable min/max next to the slider
-                        st.markdown(f"**Min:** {eur(value_range[0]) if 'eur' in globals() else f'€{value_range[0]:,}'}  ")
-                        st.markdown(f"**Max:** {eur(value_range[1]) if 'eur' in globals() else f'€{value_range[1]:,}'}  ")
-                    with cols_f[3]:
-                        # value slider; step is coarse so we use an approximate step
-                        age_range = st.slider("📅 Player age", min_age, max_age, (min_age, max_age), step=1)
-
-
-                # Apply filters to the dataframe
-                filtered_df = df.copy()
-                if selected_nationalities:
-                    filtered_df = filtered_df[filtered_df['nationality_name'].isin(selected_nationalities)]
-                if selected_leagues:
-                    filtered_df = filtered_df[filtered_df['league_name'].isin(selected_leagues)]
-                if selected_positions:
-                    filtered_df = filtered_df[filtered_df['primary_position'].isin(selected_positions)]
-                if selected_feet:
-                    filtered_df = filtered_df[filtered_df['preferred_foot'].isin(selected_feet)]
-                # ensure numeric comparison
-                filtered_df['value_eur'] = filtered_df['value_eur'].fillna(0)
-                filtered_df = filtered_df[
-                    (filtered_df['value_eur'] >= value_range[0]) & (filtered_df['value_eur'] <= value_range[1])
-                ]
-
-                # ensure numeric comparison
-                filtered_df['age'] = filtered_df['age'].fillna(0)
-                filtered_df = filtered_df[
-                    (filtered_df['age'] >= age_range[0]) & (filtered_df['age'] <= age_range[1])
-                ]
-
-
-                # After filtering, sort by similarity and keep top 5
-                filtered_df = filtered_df.sort_values(by='similarity', ascending=False).head(5).reset_index(drop=True)
-
-
-
-                if player_is_goalkeeper:
-
-
-                    # Display alternatives in columns
-                    alt_cols = st.columns(5)
-                    for i, row in filtered_df.iterrows():
-                        with alt_cols[i % 5]:
-                            # Dynamically change card color based on similarity score
-                            sim_color = '#00E676' if row['similarity'] >= 0.95 else ('#FFC107' if row['similarity'] >= 0.9 else '#FF5252')
-
-
-                            img_src = get_image_base64(row.get('player_face_url') or '')
-
-
-                            # Card structure for similar players
-                            st.markdown(f"""
-                            <div class="player-card large" style="border-left: 5px solid {sim_color}; min-height: 400px;">
-                                <div class="player-header">{row['short_name']}</div>
-                                <img src="{img_src}" alt="player" />
-                                <div class="info-text" style="margin-top: 0.5rem;"></
-                                <div class="info-text">🎯 <b>Similarity:</b> {row['similarity_pct']}</div>
-                                <div class="info-text" style="margin-top: 0.5rem;"></
-                                <div class="info-text">📊 <b>OVR:</b> {row['overall']} | <b>POS:</b> {row['player_positions']}</div>
-                                <div class="info-text">💶 <b>Value:</b> {row['value_display']} | <b>Age:</b> {row['age']}</div>
-                                <div class="info-text" style="margin-top: 0.5rem;"></
-                                <div class="info-text">🌍 <b>Nationality:</b> {row['nationality_name']}</div>
-                                <div class="info-text">🏆 <b>League:</b> {row['league_name']}</div>
-                                <div class="info-text">🏟️ <b>Club:</b> {row['club_name']}</div>
-                                <div class="info-text">🦶 <b>Preferred Foot:</b> {row['preferred_foot']}</div>
-                                <div style="margin-top: 0.5rem;">
-                                    <div class="info-text">🤾 Diving: {int(row['goalkeeping_diving'])} | 🤲 Handling: {int(row['goalkeeping_handling'])}</div>
-                                    <div class="info-text">👟 Kicking: {int(row['goalkeeping_kicking'])} | 📍 Positioning: {int(row['goalkeeping_positioning'])}</div>
-                                    <div class="info-text">⚡ Reflexes: {int(row['goalkeeping_reflexes'])} | 🏃‍♂️ Speed: {int(row['goalkeeping_speed'])}</div>
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-
-                            # Allow selecting this similar player as the chosen alternative for comparison
-                            try:
-                                if st.button("Select Alternative", key=f"select_alt_{int(row['player_id'])}"):
-                                    st.session_state['selected_alternative_id'] = int(row['player_id'])
-                                    st.session_state['selected_alternative_details'] = row.to_dict()
-                                    st.toast(f"✅ Selected alternative {row.get('short_name')}!", icon="🧾")
-                                    st.rerun()
-                            except Exception:
-                                # defensive: ignore selection if player_id can't be parsed
-                                pass
+            data = api_client().similar_players(**similar_params)
 
-                else:
+
+        if len(data) > 0:
+            filtered_df = pd.DataFrame(data) # similar players, already filtered (up to 5)
+
+
+            # Check whether the selected player is a goalkeeper (use selected details to be safe)
+            sel_pos = selected_details.get('player_positions') if selected_details else ''
+            player_is_goalkeeper = (sel_pos or '').split(',')[0] == 'GK'
 
 
-                    # Display alternatives in columns (5 columns to show top 5 in one row)
-                    alt_cols = st.columns(5)
-                    for i, row in filtered_df.iterrows():
-                        with alt_cols[i % 5]:
-                            # Dynamically change card color based on similarity score
-                            sim_color = '#00E676' if row['similarity'] >= 0.95 else ('#FFC107' if row['similarity'] >= 0.9 else '#FF5252')
-
-
-                            img_src = get_image_base64(row.get('player_face_url') or '')
-
-
-                            # Card structure for similar players
-                            st.markdown(f"""
-                            <div class="player-card large" style="border-left: 5px solid {sim_color}; min-height: 400px;">
-                                <div class="player-header">{row['short_name']}</div>
-                                <img src="{img_src}" alt="player" />
-                                <div class="info-text" style="margin-top: 0.5rem;"></
-                                <div class="info-text">🎯 <b>Similarity:</b> {row['similarity_pct']}</div>
-                                <div class="info-text" style="margin-top: 0.5rem;"></
-                                <div class="info-text">📊 <b>OVR:</b> {row['overall']} | <b>POS:</b> {row['player_positions']}</div>
-                                <div class="info-text">💶 <b>Value:</b> {row['value_display']} | <b>Age:</b> {row['age']}</div>
-                                <div class="info-text" style="margin-top: 0.5rem;"></
-                                <div class="info-text">🌍 <b>Nationality:</b> {row['nationality_name']}</div>
-                                <div class="info-text">🏆 <b>League:</b> {row['league_name']}</div>
-                                <div class="info-text">🏟️ <b>Club:</b> {row['club_name']}</div>
-                                <div class="info-text">🦶 <b>Preferred Foot:</b> {row['preferred_foot']}</div>
-                                <div style="margin-top: 0.5rem;">
-                                    <div class="info-text">⚡ Pace: {int(row['pace'])} | 👟 Shooting: {int(row['shooting'])}</div>
-                                    <div class="info-text">🎯 Passing: {int(row['passing'])} | 🏃 Dribbling: {int(row['dribbling'])}</div>
-                                    <div class="info-text">🛡️ Defending: {int(row['defending'])} | 💪 Physic: {int(row['physic'])}</div>
-                                </div>
+            # every alternative's face requested at once
+            img_srcs = get_images_base64(filtered_df['player_face_url'].tolist())
+
+            # Format Value for display and format similarity to percentage
+            filtered_df['value_display'] = filtered_df['value_eur'].apply(lambda x: f'€{int(x or 0):,}')
+            filtered_df['similarity_pct'] = filtered_df['similarity'].apply(lambda x: f'{x:.2%}')
+
+
+            if player_is_goalkeeper:
+
+
+                # Display alternatives in columns
+                alt_cols = st.columns(5)
+                for i, row in filtered_df.iterrows():
+                    with alt_cols[i % 5]:
+                        # Dynamically change card color based on similarity score
+                        sim_color = '#00E676' if row['similarity'] >= 0.95 else ('#FFC107' if row['similarity'] >= 0.9 else '#FF5252')
+
+
+                        img_src = img_srcs[i]
+
+
+                        # Card structure for similar players
+                        st.markdown(f"""
+                        <div class="player-card large" style="border-left: 5px solid {sim_color}; min-height: 400px;">
+                            <div class="player-header">{row['short_name']}</div>
+                            <img src="{img_src}" alt="player" />
+                            <div class="info-text" style="margin-top: 0.5rem;"></
+                            <div class="info-text">🎯 <b>Similarity:</b> {row['similarity_pct']}</div>
+                            <div class="info-text" style="margin-top: 0.5rem;"></
+                            <div class="info-text">📊 <b>OVR:</b> {row['overall']} | <b>POS:</b> {row['player_positions']}</div>
+                            <div class="info-text">💶 <b>Value:</b> {row['value_display']} | <b>Age:</b> {row['age']}</div>
+                            <div class="info-text" style="margin-top: 0.5rem;"></
+                            <div class="info-text">🌍 <b>Nationality:</b> {row['nationality_name']}</div>
+                            <div class="info-text">🏆 <b>League:</b> {row['league_name']}</div>
+                            <div class="info-text">🏟️ <b>Club:</b> {row['club_name']}</div>
+                            <div class="info-text">🦶 <b>Preferred Foot:</b> {row['preferred_foot']}</div>
+                            <div style="margin-top: 0.5rem;">
+                                <div class="info-text">🤾 Diving: {int(row['goalkeeping_diving'])} | 🤲 Handling: {int(row['goalkeeping_handling'])}</div>
+                                <div class="info-text">👟 Kicking: {int(row['goalkeeping_kicking'])} | 📍 Positioning: {int(row['goalkeeping_positioning'])}</div>
+                                <div class="info-text">⚡ Reflexes: {int(row['goalkeeping_reflexes'])} | 🏃‍♂️ Speed: {int(row['goalkeeping_speed'])}</div>
                             </div>
-                            """, unsafe_allow_html=True)
-
-                            # Allow selecting this similar player as the chosen alternative for comparison
-                            try:
-                                if st.button("Select Alternative", key=f"select_alt_{int(row['player_id'])}"):
-                                    st.session_state['selected_alternative_id'] = int(row['player_id'])
-                                    st.session_state['selected_alternative_details'] = row.to_dict()
-                                    st.toast(f"✅ Selected alternative {row.get('short_name')}!", icon="🧾")
-                                    st.rerun()
-                            except Exception:
-                                pass
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                        # Allow selecting this similar player as the chosen alternative for comparison
+                        try:
+                            if st.button("Select Alternative", key=f"select_alt_{int(row['player_id'])}"):
+                                st.session_state['selected_alternative_id'] = int(row['player_id'])
+                                st.session_state['selected_alternative_details'] = row.to_dict()
+                                st.toast(f"✅ Selected alternative {row.get('short_name')}!", icon="🧾")
+                                st.rerun()
+                        except Exception:
+                            # defensive: ignore selection if player_id can't be parsed
+                            pass
 
             else:
-                st.warning("No similar alternatives found for this player.")
+
+
+                # Display alternatives in columns (5 columns to show top 5 in one row)
+                alt_cols = st.columns(5)
+                for i, row in filtered_df.iterrows():
+                    with alt_cols[i % 5]:
+                        # Dynamically change card color based on similarity score
+                        sim_color = '#00E676' if row['similarity'] >= 0.95 else ('#FFC107' if row['similarity'] >= 0.9 else '#FF5252')
+
+
+                        img_src = img_srcs[i]
+
+
+                        # Card structure for similar players
+                        st.markdown(f"""
+                        <div class="player-card large" style="border-left: 5px solid {sim_color}; min-height: 400px;">
+                            <div class="player-header">{row['short_name']}</div>
+                            <img src="{img_src}" alt="player" />
+                            <div class="info-text" style="margin-top: 0.5rem;"></
+                            <div class="info-text">🎯 <b>Similarity:</b> {row['similarity_pct']}</div>
+                            <div class="info-text" style="margin-top: 0.5rem;"></
+                            <div class="info-text">📊 <b>OVR:</b> {row['overall']} | <b>POS:</b> {row['player_positions']}</div>
+                            <div class="info-text">💶 <b>Value:</b> {row['value_display']} | <b>Age:</b> {row['age']}</div>
+                            <div class="info-text" style="margin-top: 0.5rem;"></
+                            <div class="info-text">🌍 <b>Nationality:</b> {row['nationality_name']}</div>
+                            <div class="info-text">🏆 <b>League:</b> {row['league_name']}</div>
+                            <div class="info-text">🏟️ <b>Club:</b> {row['club_name']}</div>
+                            <div class="info-text">🦶 <b>Preferred Foot:</b> {row['preferred_foot']}</div>
+                            <div style="margin-top: 0.5rem;">
+                                <div class="info-text">⚡ Pace: {int(row['pace'])} | 👟 Shooting: {int(row['shooting'])}</div>
+                                <div class="info-text">🎯 Passing: {int(row['passing'])} | 🏃 Dribbling: {int(row['dribbling'])}</div>
+                                <div class="info-text">🛡️ Defending: {int(row['defending'])} | 💪 Physic: {int(row['physic'])}</div>
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                        # Allow selecting this similar player as the chosen alternative for comparison
+                        try:
+                            if st.button("Select Alternative", key=f"select_alt_{int(row['player_id'])}"):
+                                st.session_state['selected_alternative_id'] = int(row['player_id'])
+                                st.session_state['selected_alternative_details'] = row.to_dict()
+                                st.toast(f"✅ Selected alternative {row.get('short_name')}!", icon="🧾")
+                                st.rerun()
+                        except Exception:
+                            pass
+
+        else:
+            st.warning("No similar alternatives found for this player and filters.")
+    except MoneyBallerError as e:
+        if e.status_code is None:
+            st.error(f"Error connecting to the similarity API: {e}")
         else:
-            st.error(f"API Error ({response.status_code}): Failed to find similar players.")
+            st.error(f"API Error ({e.status_code}): Failed to find similar players.")
     except Exception as e:
         st.error(f"Error connecting to the similarity API: {e}")
 
@@ -683,14 +671,17 @@ if selected_alt and selected_details:
         except Exception:
             return "—"
 
+    # both faces requested at once
+    sel_img_src, alt_img_src = get_images_base64([selected_details.get('player_face_url'),
+                                                  selected_alt.get('player_face_url')])
+
     # Set up the three-column layout for all cases
     left, middle, right = st.columns([1, 1, 1])
 
     # Left column: original player (left-aligned)
     with left:
-        img_src = get_image_base64(selected_details.get('player_face_url') or '')
         st.markdown(f"<div style='text-align:left;'>"
-                    f"<img src=\"{img_src}\" style=\"width:140px; display:block; margin:0 0 8px 0; border-radius:8px;\"/>"
+                    f"<img src=\"{sel_img_src}\" style=\"width:140px; display:block; margin:0 0 8px 0; border-radius:8px;\"/>"
                     f"</div>", unsafe_allow_html=True)
         st.markdown(
             f"<div style='text-align:left; color:#ffffff; padding-right:6px;'>"
@@ -733,11 +724,10 @@ if selected_alt and selected_details:
 
     # Right column (alternative player) - align image to right and show name/stats in white on separate lines
     with right:
-        img_src = get_image_base64(selected_alt.get('player_face_url') or '')
         # Use HTML to control right alignment for the image and ensure consistent styling
         st.markdown(
             f"<div style=\"text-align:right;\">"
-            f"<img src=\"{img_src}\" width=\"140\" style=\"display:block; margin:0 0 8px auto; border-radius:8px;\">"
+            f"<img src=\"{alt_img_src}\" width=\"140\" style=\"display:block; margin:0 0 8px auto; border-radius:8px;\">"
             f"</div>"
             f"<div style=\"text-align:right; color:#ffffff; padding-left:6px;\">"
             f"<div style='font-weight:700; font-size:1.02rem;'>{selected_alt.get('long_name','—')}</div>"
@@ -756,6 +746,13 @@ if selected_alt and selected_details:
 st.markdown("<br><br><hr style='border:2px solid #bbb'><br><br>", unsafe_allow_html=True)
 
 
+# === answer of a call from fetch_each, raising its error if the call failed ===
+def response_json(result):
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
 # === small helper to format money nicely ===
 def eur(x):
     try:
@@ -802,13 +799,16 @@ if ptype == "Outfield":
         shooting=shooting, passing=passing, dribbling=dribbling,
         defending=defending, physic=physic
     )
-    col_val, col_pos = st.columns(2)
-    with col_val:
-        if st.button("💰 Get Valuation"):
+    if st.button("💰🎯 Get Valuation & Position"):
+        # both endpoints requested at once, each answer shown in its column
+        valuation, position = fetch_each([
+            partial(api_client().outfield_valuation, **params),
+            partial(api_client().position, **params),
+        ])
+        col_val, col_pos = st.columns(2)
+        with col_val:
             try:
-                r = requests.get(OUTFIELD_VALUATION_API_URL, params=params, timeout=60)
-                r.raise_for_status()
-                data = r.json()
+                data = response_json(valuation)
                 val = data.get("Predicted player value (EUR):")
                 if val is not None:
                     st.markdown("<hr>", unsafe_allow_html=True)
@@ -822,16 +822,16 @@ if ptype == "Outfield":
             except Exception as e:
                 st.error(f"❌ Request failed: {e}")
 
-    with col_pos:
-        if st.button("🎯 Predict Position"):
+        with col_pos:
             try:
-                r = requests.get(POSITION_PREDICTOR_API_URL, params=params, timeout=60)
-                r.raise_for_status()
-                data = r.json()
+                data = response_json(position)
                 pos = data.get("Suggested Position")
                 if pos:
                     st.markdown("<hr>", unsafe_allow_html=True)
                     st.success(f"Suggested Position: **{pos}**")
+                    # alternatives with their probabilities, from the same call
+                    for alt in data.get("Top positions", [])[1:]:
+                        st.caption(f"{alt['position']}: {alt['probability']:.0%}")
                     fig = plot_pitch_with_position(pos)
                     st.pyplot(fig)
                 else:
@@ -867,9 +867,7 @@ else:
     with col_val:
         if st.button("💰 Get Valuation (Goalkeeper)"):
             try:
-                r = requests.get(GOALKEEPER_VALUATION_API_URL, params=params, timeout=60)
-                r.raise_for_status()
-                data = r.json()
+                data = api_client().goalkeeper_valuation(**params)
                 val = data.get("Predicted player value (EUR):")
                 if val is not None:
                     st.markdown("<hr>", unsafe_allow_html=True)
@@ -0,0 +1,65 @@
+import asyncio
+import httpx
+import pytest
+from moneyballer import client as client_module
+from moneyballer.client import AsyncMoneyBallerClient, MoneyBallerClient, MoneyBallerError
+
+
+def flaky_api(failures, status=503, headers=None):
+    # answers `failures` times with `status`, then 200
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= failures:
+            return httpx.Response(status, headers=headers or {})
+        return httpx.Response(200, json=[{'player_id': 1}])
+
+    return httpx.MockTransport(handler), calls
+
+
+def test_retry_after_is_capped(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(client_module.time, 'sleep', sleeps.append)
+    transport, calls = flaky_api(2, headers={'retry-after': '86400'})
+
+    with MoneyBallerClient('http://api', transport=transport, max_backoff_seconds=5) as api:
+        assert api.search_players('mbappe') == [{'player_id': 1}]
+    assert sleeps == [5, 5]
+    assert len(calls) == 3
+
+
+def test_gives_up_after_retries(monkeypatch):
+    monkeypatch.setattr(client_module.time, 'sleep', lambda seconds: None)
+    transport, calls = flaky_api(10)
+
+    with MoneyBallerClient('http://api', transport=transport, retries=2) as api:
+        with pytest.raises(MoneyBallerError) as error:
+            api.search_players('mbappe')
+    assert error.value.status_code == 503
+    assert len(calls) == 3
+
+
+def test_get_answers_are_cached():
+    transport, calls = flaky_api(0)
+    with MoneyBallerClient('http://api', transport=transport) as api:
+        first = api.similar_players(7, leagues=['b', 'a'])
+        assert api.similar_players(7, leagues=['a', 'b']) == first
+    assert len(calls) == 1
+
+
+def test_async_client_retries_like_the_sync_one(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(client_module.asyncio, 'sleep', fake_sleep)
+    transport, calls = flaky_api(1, status=429, headers={'retry-after': '3600'})
+
+    async def search():
+        async with AsyncMoneyBallerClient('http://api', transport=transport, max_backoff_seconds=2) as api:
+            return await api.search_players('mbappe')
+
+    assert asyncio.run(search()) == [{'player_id': 1}]
+    assert sleeps == [2]
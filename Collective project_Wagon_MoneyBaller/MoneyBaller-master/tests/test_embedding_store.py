@@ -0,0 +1,22 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+from moneyballer.embedding_store import normalize_rows, open_embeddings, open_unit_vectors, write_embeddings
+
+
+def test_store_round_trip_with_unit_vectors(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(300, 12))
+    vectors[5] = 0
+    ids = rng.permutation(1_000)[:300]
+    path = tmp_path / "X_proj.emb"
+
+    write_embeddings(vectors, ids, {'n_components': 12}, path)
+    stored_ids, stored_vectors, metadata = open_embeddings(path)
+    unit = open_unit_vectors(path)
+
+    assert_array_equal(stored_ids, ids)
+    assert_array_equal(stored_vectors, vectors.astype(np.float32))
+    assert metadata == {'n_components': 12}
+    # mapped from the file, the same values the api used to compute per worker
+    assert isinstance(unit, np.memmap)
+    assert_array_equal(unit, normalize_rows(vectors))
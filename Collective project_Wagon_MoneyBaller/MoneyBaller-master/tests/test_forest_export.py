@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.testing import assert_array_equal
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+from moneyballer.forest_export import (MAX_PROBA_DIFF, BoostedTreesClassifier, ForestPredictor,
+                                       export_boosting_pipeline, export_forest_pipeline)
+
+FEATURES = ['a', 'b', 'c', 'd']
+
+
+def players(n, seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(1, 100, (n, len(FEATURES))).astype(float), columns=FEATURES)
+    # missing values exercise the trees' missing_left branches
+    return X.mask(rng.random(X.shape) < 0.05)
+
+
+def test_forest_predictions_match_sklearn(tmp_path):
+    X = players(2_000, seed=0)
+    y = X['a'].fillna(50) * 3 + X['b'].fillna(20) ** 1.5 - X['c'].fillna(0)
+    pipe = Pipeline([("scaler", MinMaxScaler()),
+                     ("forest", RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0))])
+    pipe.fit(X, y)
+
+    path = tmp_path / "forest.npz"
+    export_forest_pipeline(pipe, path)
+    X_test = players(1_000, seed=1)
+
+    assert_array_equal(ForestPredictor.load(path).predict(X_test.values), pipe.predict(X_test))
+
+
+def test_boosting_predictions_match_sklearn(tmp_path):
+    X = players(2_000, seed=2).fillna(50)
+    y = np.select([X['a'] > 70, X['b'] > 60, X['c'] < 30], ['Forward', 'Winger', 'Full Back'], 'Central Midfielder')
+    pipe = Pipeline([("scaler", MinMaxScaler()),
+                     ("boosting", GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=0))])
+    pipe.fit(X, y)
+
+    path = tmp_path / "boosting.npz"
+    export_boosting_pipeline(pipe, path)
+    predictor = BoostedTreesClassifier.load(path)
+    X_test = players(1_000, seed=3).fillna(50)
+
+    assert predictor.classes == pipe.classes_.tolist()
+    assert_array_equal(predictor.predict(X_test.values), pipe.predict(X_test))
+    assert np.abs(predictor.predict_proba(X_test.values) - pipe.predict_proba(X_test)).max() <= MAX_PROBA_DIFF
+
+
+def test_boosting_export_rejects_custom_init(tmp_path):
+    X = players(200, seed=4).fillna(50)
+    y = np.where(X['a'] > 50, 'Forward', 'Winger')
+    y[:50] = 'Full Back'
+    pipe = Pipeline([("scaler", MinMaxScaler()),
+                     ("boosting", GradientBoostingClassifier(n_estimators=5, init='zero', random_state=0))])
+    pipe.fit(X, y)
+
+    with pytest.raises(ValueError, match="init estimator"):
+        export_boosting_pipeline(pipe, tmp_path / "boosting.npz")
@@ -0,0 +1,52 @@
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.impute import SimpleImputer
+from sklearn.neural_network import MLPRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+from moneyballer.mlp_export import MAX_LOG_DIFF, NumpyMLPPredictor, export_mlp_pipeline
+from moneyballer.model_features import OUTFIELD_VALUATION_FEATURES
+
+
+def players(n, seed):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.integers(20, 99, (n, len(OUTFIELD_VALUATION_FEATURES))).astype(float),
+                     columns=OUTFIELD_VALUATION_FEATURES)
+    # missing values exercise the median imputation
+    return X.mask(rng.random(X.shape) < 0.02)
+
+
+@pytest.fixture(scope='module')
+def pipe():
+    # same architecture as DeepL_Valuation_Fieldplayer.py, smaller
+    X = players(1_000, seed=0)
+    y = 10 + X[['pace', 'shooting', 'passing']].fillna(60).mean(axis=1) / 15 - X['age'].fillna(25) / 20
+    pipe = Pipeline([
+        ("prep", Pipeline([("imputer", SimpleImputer(strategy="median")), ("scaler", MinMaxScaler())])),
+        ("mlp", MLPRegressor(hidden_layer_sizes=(32, 16), max_iter=30, random_state=0)),
+    ])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', ConvergenceWarning)
+        return pipe.fit(X, y)
+
+
+def test_numpy_forward_pass_matches_sklearn(pipe, tmp_path):
+    path = tmp_path / "mlp.npy"
+    export_mlp_pipeline(pipe, path)
+    X = players(2_000, seed=1)
+
+    diff = np.abs(NumpyMLPPredictor.load(path).predict(X.values) - pipe.predict(X))
+    assert diff.max() < MAX_LOG_DIFF
+
+
+def test_predictions_do_not_depend_on_batch_size(pipe, tmp_path):
+    path = tmp_path / "mlp.npy"
+    export_mlp_pipeline(pipe, path)
+    predictor = NumpyMLPPredictor.load(path)
+    X = players(500, seed=2).to_numpy()
+
+    alone = [predictor.predict(row)[0] for row in X]
+    np.testing.assert_allclose(predictor.predict(X), alone, rtol=0, atol=1e-12)
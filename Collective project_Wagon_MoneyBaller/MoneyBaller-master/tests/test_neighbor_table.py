@@ -0,0 +1,33 @@
+import numpy as np
+from moneyballer.embedding_store import embeddings_fingerprint, stored_fingerprint, write_embeddings
+from moneyballer.neighbor_table import compute_neighbor_table, load_neighbor_table, save_neighbor_table
+
+
+def table_paths(tmp_path):
+    return {'ids_path': tmp_path / "ids.npy", 'sims_path': tmp_path / "sims.npy",
+            'fingerprint_path': tmp_path / "table.sha1"}
+
+
+def test_table_is_served_for_the_embeddings_it_was_computed_from(tmp_path):
+    vectors = np.random.default_rng(0).normal(size=(200, 8))
+    write_embeddings(vectors, np.arange(200), path=tmp_path / "X_proj.emb")
+    fingerprint = stored_fingerprint(tmp_path / "X_proj.emb")
+    # the header value is the hash the csv fallback computes
+    assert fingerprint == embeddings_fingerprint(vectors)
+
+    paths = table_paths(tmp_path)
+    save_neighbor_table(*compute_neighbor_table(vectors), fingerprint, **paths)
+    neighbor_ids, neighbor_sims = load_neighbor_table(200, fingerprint, **paths)
+
+    assert neighbor_ids.shape == neighbor_sims.shape == (200, 100)
+    assert neighbor_ids[0, 0] != 0
+
+
+def test_retrained_embeddings_with_the_same_rows_reject_the_table(tmp_path):
+    rng = np.random.default_rng(1)
+    old, new = rng.normal(size=(200, 8)), rng.normal(size=(200, 8))
+    paths = table_paths(tmp_path)
+    save_neighbor_table(*compute_neighbor_table(old), embeddings_fingerprint(old), **paths)
+
+    assert load_neighbor_table(200, embeddings_fingerprint(new), **paths) == (None, None)
+    assert load_neighbor_table(200, None, **paths) == (None, None)